@@ -421,6 +421,10 @@ def create_app(config_name: str | None = None) -> Flask:
     if api_v1_bp is not None:
         csrf.exempt(api_v1_bp)
 
+    sync_v1_bp = blueprints.get("sync_v1")
+    if sync_v1_bp is not None:
+        csrf.exempt(sync_v1_bp)
+
     auth_api_bp = blueprints.get("auth_api")
     if auth_api_bp is not None:
         csrf.exempt(auth_api_bp)
@@ -472,6 +476,26 @@ def create_app(config_name: str | None = None) -> Flask:
             max_instances=1,
             coalesce=True,
         )
+        gc_hours = int(os.getenv("STORAGE_GC_INTERVAL_HOURS", "24") or 0)
+        if gc_hours > 0:
+
+            def storage_gc_job() -> None:
+                # El worker hace la recolección; aquí sólo se encola.
+                from app.services.jobs import enqueue
+
+                with app.app_context():
+                    enqueue("storage.gc", unique=True)
+                    extensions_db.session.commit()
+
+            scheduler.add_job(
+                storage_gc_job,
+                "interval",
+                hours=gc_hours,
+                id="storage_gc",
+                max_instances=1,
+                coalesce=True,
+            )
+
         scheduler.start()
         app.extensions.setdefault("apscheduler", scheduler)
         app.logger.info("Scheduler ON cada %s min (TZ=%s)", interval_min, tz)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 
-from flask import Blueprint, Response
+from flask import Blueprint, Response, current_app
 from prometheus_client import (
     CONTENT_TYPE_LATEST,
     CollectorRegistry,
@@ -16,6 +16,13 @@ bp = Blueprint("metrics", __name__)
 
 @bp.get("/metrics")
 def metrics() -> Response:
+    try:
+        from app.services.storage_usage import refresh_gauges
+
+        refresh_gauges()
+    except Exception as exc:  # pragma: no cover - sin tabla o sin base de datos
+        current_app.logger.warning("No se pudieron actualizar métricas de almacenamiento: %s", exc)
+
     try:
         registry = None
         if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
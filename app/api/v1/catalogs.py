@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from flask import abort, jsonify, request
+from flask_login import login_required
+
+from app.services.catalogs import CATALOGS, catalog_payload
+
+from . import bp
+
+# El navegador reutiliza su copia este tiempo y luego revalida con el ETag.
+CATALOG_MAX_AGE = 60
+
+
+@bp.get("/catalogs/<name>")
+@login_required
+def catalog(name: str):
+    if name not in CATALOGS:
+        abort(404)
+    payload, etag = catalog_payload(name)
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = CATALOG_MAX_AGE
+    return response.make_conditional(request)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from flask import Blueprint, current_app, jsonify, request
+
+from app.security.guards import requires_auth
+from app.services.sync_service import SyncConflict, SyncError, sync_batch
+
+bp = Blueprint("sync_v1", __name__, url_prefix="/api/v1")
+
+
+@bp.post("/sync")
+@requires_auth
+def sync():
+    """Recibe un lote de partes y checklists capturados sin conexión."""
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"detail": "Se esperaba un objeto JSON"}), 400
+    try:
+        result = sync_batch(data, max_records=int(current_app.config.get("SYNC_BATCH_MAX", 500)))
+    except SyncError as exc:
+        return jsonify({"detail": str(exc)}), 400
+    except SyncConflict as exc:
+        return jsonify({"detail": str(exc)}), 409
+    return jsonify(result), 200
@@ -35,6 +35,24 @@ def _normalize_allowed_roles(allowed_roles: Iterable[str]) -> set[str]:
     return normalized
 
 
+def has_role(*allowed_roles: str) -> bool:
+    """Indica si el usuario actual tiene uno de los roles, sin abortar la petición.
+
+    Sigue las mismas reglas que ``role_required``: con la seguridad o el login
+    desactivados siempre es ``True``.
+    """
+
+    if current_app.config.get("SECURITY_DISABLED") or current_app.config.get("LOGIN_DISABLED"):
+        return True
+    if current_app.config.get("AUTH_SIMPLE", False):
+        role = _resolve_role_from_session()
+    elif current_user.is_authenticated:
+        role = _resolve_role_from_user()
+    else:
+        role = None
+    return role is not None and role in _normalize_allowed_roles(allowed_roles)
+
+
 def role_required(*allowed_roles: str):
     """Protege una vista: el usuario debe tener uno de los roles permitidos."""
 
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import io
 import os
 import secrets
 from datetime import date, datetime, timedelta, timezone
 from functools import wraps
-from pathlib import Path
 
 from flask import (
     Blueprint,
@@ -24,15 +24,26 @@ flask_login_required = login_required
 from sqlalchemy.exc import IntegrityError
 
 from app.db import db
-from app.models import Bitacora, Folder, MetricDaily, Project, User
+from app.models import Bitacora, Folder, Project, User
 from app.auth.roles import ROLES, admin_required, role_required
 from app.utils.rbac import require_roles, require_approved
+from app.utils.filters import parse_date
 from app.utils.validators import is_valid_email
 from app.security import generate_reset_token
+from app.services import file_browser
+from app.services.csv_import import ENTITIES as IMPORT_ENTITIES, CsvImportError, import_csv
+from app.services.metric_series import MODES as SERIES_MODES, kpi_series, load_series
+from app.services.project_kpis import project_kpis, projects_page
+from app.services.storage_usage import usage_summary
 from app.services.user_service import list_users as service_list_users
 
 bp_admin = Blueprint("admin", __name__, template_folder="templates", url_prefix="/admin")
 
+FILES_PER_PAGE = 100
+PROJECTS_PER_PAGE = 25
+SERIES_DEFAULT_POINTS = 500
+SERIES_MAX_POINTS = 2000
+
 @bp_admin.app_context_processor
 def _admin_template_helpers():
     def admin_url(primary: str, fallback: str | None = None) -> str:
@@ -67,26 +78,23 @@ def login_required(view):
 @bp_admin.get("/")
 @login_required
 def index():
-    projects = Project.query.all()
-    total_projects = len(projects)
-    avg_progress = (
-        round(sum(p.progress for p in projects) / total_projects, 1)
-        if total_projects
-        else 0.0
+    kpis = project_kpis()
+    projects, pagination = projects_page(
+        request.args.get("page", 1, type=int), PROJECTS_PER_PAGE
     )
-    budget = sum(p.budget for p in projects)
-    spent = sum(p.spent for p in projects)
     ultimas_logs = (
         Bitacora.query.order_by(Bitacora.created_at.desc()).limit(5).all()
     )
     return render_template(
         "admin/index.html",
-        total_projects=total_projects,
-        avg_progress=avg_progress,
-        budget=budget,
-        spent=spent,
+        storage=usage_summary(),
+        total_projects=kpis.total,
+        avg_progress=kpis.avg_progress,
+        budget=kpis.budget,
+        spent=kpis.spent,
         ultimas=ultimas_logs,
         projects=projects,
+        pagination=pagination,
     )
 
 
@@ -97,15 +105,44 @@ bp_admin.add_url_rule("/", view_func=index, endpoint="dashboard")
 @login_required
 @admin_required
 def kpi_json(project_id: int):
-    rows = (
-        MetricDaily.query.filter_by(project_id=project_id)
-        .order_by(MetricDaily.date)
-        .all()
+    # Contrato original: ``labels`` son las fechas de progreso y cada serie
+    # trae sólo sus días con dato. La versión alineada es ``series.json``.
+    labels, series = load_series(project_id, ("progreso", "gasto"))
+    progreso = [(day, v) for day, v in zip(labels, series["progreso"]) if v is not None]
+    return jsonify(
+        {
+            "labels": [day.isoformat() for day, _ in progreso],
+            "progreso": [v for _, v in progreso],
+            "gasto": [v for v in series["gasto"] if v is not None],
+        }
+    )
+
+
+@bp_admin.get("/kpi/<int:project_id>/series.json")
+@login_required
+@admin_required
+def kpi_series_json(project_id: int):
+    kpis = [
+        name.strip()
+        for raw in request.args.getlist("kpi")
+        for name in raw.split(",")
+        if name.strip()
+    ] or ["progreso", "gasto"]
+    mode = request.args.get("mode", "lttb")
+    if mode not in SERIES_MODES:
+        return jsonify({"error": f"mode debe ser uno de: {', '.join(SERIES_MODES)}"}), 400
+    points = request.args.get("points", SERIES_DEFAULT_POINTS, type=int)
+    points = min(max(points, 3), SERIES_MAX_POINTS)
+    return jsonify(
+        kpi_series(
+            project_id,
+            list(dict.fromkeys(kpis)),
+            desde=parse_date(request.args.get("desde")),
+            hasta=parse_date(request.args.get("hasta")),
+            points=points,
+            mode=mode,
+        )
     )
-    labels = [r.date.isoformat() for r in rows if r.kpi_name == "progreso"]
-    progreso = [r.value for r in rows if r.kpi_name == "progreso"]
-    gasto = [r.value for r in rows if r.kpi_name == "gasto"]
-    return jsonify({"labels": labels, "progreso": progreso, "gasto": gasto})
 
 
 # PROYECTOS (listar/crear rápido)
@@ -232,6 +269,41 @@ def bitacoras_create():
     return redirect(url_for("admin.bitacoras"))
 
 
+# IMPORTACIÓN CSV
+@bp_admin.get("/import")
+@login_required
+@admin_required
+def import_form():
+    return render_template("admin/import.html", entities=IMPORT_ENTITIES, report=None)
+
+
+@bp_admin.post("/import")
+@login_required
+@admin_required
+def import_upload():
+    entity = request.form.get("entity", "")
+    upload = request.files.get("file")
+    wants_json = request.args.get("format") == "json"
+    if not upload or not upload.filename:
+        error = "Selecciona un archivo CSV"
+    else:
+        stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        try:
+            report = import_csv(entity, stream, dry_run=bool(request.form.get("dry_run")))
+        except CsvImportError as exc:
+            error = str(exc)
+        except UnicodeDecodeError:
+            error = "El archivo debe estar codificado en UTF-8"
+        else:
+            if wants_json:
+                return jsonify(report)
+            return render_template("admin/import.html", entities=IMPORT_ENTITIES, report=report)
+    if wants_json:
+        return jsonify({"error": error}), 400
+    flash(error, "warning")
+    return redirect(url_for("admin.import_form"))
+
+
 @bp_admin.get("/folders")
 @login_required
 @admin_required
@@ -277,20 +349,29 @@ def folders_create():
 @login_required
 @admin_required
 def list_files():
-    data_dir = Path(current_app.config["DATA_DIR"])
-    items: list[dict[str, object]] = []
-
-    for path in sorted(data_dir.glob("**/*")):
-        relative = path.relative_to(data_dir).as_posix()
-        items.append(
-            {
-                "name": relative,
-                "is_dir": path.is_dir(),
-                "size": path.stat().st_size if path.is_file() else None,
-            }
-        )
+    rel = request.args.get("path", "")
+    page = request.args.get("page", 1, type=int)
+    try:
+        listing = file_browser.list_directory(rel, page=page, per_page=FILES_PER_PAGE)
+    except file_browser.BrowserError as exc:
+        flash(str(exc), "warning")
+        if rel:
+            return redirect(url_for("admin.list_files"))
+        return render_template("admin/files.html", listing=None, base=current_app.config["DATA_DIR"])
+    return render_template("admin/files.html", listing=listing, base=listing["base"])
 
-    return render_template("admin/files.html", items=items, base=str(data_dir))
+
+@bp_admin.post("/files/reindex")
+@login_required
+@admin_required
+def reindex_files():
+    queued = file_browser.request_size_index()
+    db.session.commit()
+    flash(
+        "Recálculo de tamaños encolado." if queued else "Ya hay un recálculo pendiente.",
+        "success" if queued else "info",
+    )
+    return redirect(url_for("admin.list_files", path=request.form.get("path") or None))
 @bp_admin.get("/users/new")
 @login_required
 @require_approved
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import and_, case, func, or_
 
 from app.extensions import db
+from app.utils.files import IMG_EXTENSIONS, PDF_EXTENSIONS
+
+PARTES_TABLA = "partes_diarias"
+RUNS_TABLA = "checklist_runs"
 
 
 def _get_model():
@@ -57,16 +63,10 @@ def _attachment_name(record) -> str:
 
 
 def _attachment_size(record) -> int:
+    # ``size`` se guarda al subir (y ``flask archivos-backfill`` lo completa);
+    # no se consulta el disco por cada evidencia.
     size = getattr(record, "size", None)
-    if isinstance(size, int) and size >= 0:
-        return size
-    path = _attachment_path(record)
-    if path and os.path.exists(path):
-        try:
-            return os.path.getsize(path)
-        except OSError:
-            return 0
-    return 0
+    return size if isinstance(size, int) and size >= 0 else 0
 
 
 def count_evidencias(parte_id: Optional[int] = None, run_id: Optional[int] = None) -> int:
@@ -105,12 +105,79 @@ def human_size(n: int) -> str:
     return f"{size_str} {units[idx]}"
 
 
+def _summary(total: int = 0, pdf: int = 0, img: int = 0, bytes_sum: int = 0) -> Dict[str, Any]:
+    return {
+        "total": int(total or 0),
+        "by_ext": {"pdf": int(pdf or 0), "img": int(img or 0)},
+        "bytes": int(bytes_sum or 0),
+        "size_h": human_size(bytes_sum or 0),
+    }
+
+
+def _categoria_count(model, categoria: str, extensions: Iterable[str]):
+    lowered = func.lower(model.filename)
+    by_name = or_(*(lowered.like(f"%{ext}") for ext in extensions))
+    stored = getattr(model, "categoria", None)
+    condition = (
+        by_name
+        if stored is None
+        else or_(stored == categoria, and_(stored.is_(None), by_name))
+    )
+    return func.sum(case((condition, 1), else_=0))
+
+
+def evidencias_summaries(tabla: str, registro_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Resúmenes de evidencias para varios registros con una sola consulta.
+
+    Agrupa por ``tabla, registro_id`` y devuelve ``{registro_id: resumen}``
+    con la misma forma que :func:`evidencias_summary`; los ids sin adjuntos
+    reciben un resumen vacío.
+    """
+
+    ids = sorted({int(i) for i in registro_ids if i})
+    summaries: Dict[int, Dict[str, Any]] = {i: _summary() for i in ids}
+    ArchivoAdjunto = _get_model()
+    if not ids or not ArchivoAdjunto or not hasattr(ArchivoAdjunto, "registro_id"):
+        return summaries
+
+    size_col = getattr(ArchivoAdjunto, "size", None)
+    columns = [
+        ArchivoAdjunto.registro_id,
+        func.count(ArchivoAdjunto.id),
+        _categoria_count(ArchivoAdjunto, "pdf", PDF_EXTENSIONS),
+        _categoria_count(ArchivoAdjunto, "img", IMG_EXTENSIONS),
+    ]
+    if size_col is not None:
+        columns.append(func.coalesce(func.sum(size_col), 0))
+
+    try:
+        rows = (
+            db.session.query(*columns)
+            .filter(ArchivoAdjunto.tabla == tabla, ArchivoAdjunto.registro_id.in_(ids))
+            .group_by(ArchivoAdjunto.tabla, ArchivoAdjunto.registro_id)
+            .all()
+        )
+    except Exception:
+        return summaries
+
+    for row in rows:
+        registro_id, total, pdf, img = row[:4]
+        bytes_sum = row[4] if size_col is not None else 0
+        summaries[int(registro_id)] = _summary(total, pdf, img, bytes_sum)
+
+    return summaries
+
+
 def evidencias_summary(parte_id: Optional[int] = None, run_id: Optional[int] = None) -> Dict[str, Any]:
     """Resumen de evidencias por tipo y tamaño total."""
 
     ArchivoAdjunto = _get_model()
     if not ArchivoAdjunto:
-        return {"total": 0, "by_ext": {"pdf": 0, "img": 0}, "bytes": 0, "size_h": "0 B"}
+        return _summary()
+
+    if hasattr(ArchivoAdjunto, "registro_id") and bool(parte_id) != bool(run_id):
+        tabla, registro_id = (PARTES_TABLA, parte_id) if parte_id else (RUNS_TABLA, run_id)
+        return evidencias_summaries(tabla, [registro_id])[int(registro_id)]
 
     try:
         query = _build_query(ArchivoAdjunto, parte_id=parte_id, run_id=run_id)
@@ -130,14 +197,62 @@ def evidencias_summary(parte_id: Optional[int] = None, run_id: Optional[int] = N
         if not ext:
             path = _attachment_path(record) or ""
             ext = os.path.splitext(path.lower())[1]
-        if ext == ".pdf":
+        if ext in PDF_EXTENSIONS:
             pdf += 1
-        elif ext in {".jpg", ".jpeg", ".png"}:
+        elif ext in IMG_EXTENSIONS:
             img += 1
 
-    return {
-        "total": int(total or 0),
-        "by_ext": {"pdf": int(pdf or 0), "img": int(img or 0)},
-        "bytes": int(bytes_sum or 0),
-        "size_h": human_size(bytes_sum or 0),
-    }
+    return _summary(total, pdf, img, bytes_sum)
+
+
+def evidencias_zip_entries(
+    *,
+    parte_id: Optional[int] = None,
+    run_id: Optional[int] = None,
+    desde=None,
+    hasta=None,
+    equipo_id: Optional[int] = None,
+) -> list[tuple[str, str]]:
+    """``(nombre_en_zip, ruta)`` de las evidencias de un parte, un run o un rango.
+
+    Sin ``parte_id`` ni ``run_id`` se incluyen las evidencias de los partes y
+    runs cuya ``fecha`` cae en el rango (y del equipo, si se indica). Cada
+    registro va en su carpeta (``parte_12/``, ``run_5/``).
+    """
+
+    from app.models.checklist import ChecklistRun
+    from app.models.parte_diaria import ArchivoAdjunto, ParteDiaria
+    from app.utils.filters import apply_filters
+    from app.utils.zipstream import unique_arcname
+
+    query = db.session.query(
+        ArchivoAdjunto.tabla,
+        ArchivoAdjunto.registro_id,
+        ArchivoAdjunto.filename,
+        ArchivoAdjunto.path,
+    )
+    if parte_id:
+        query = query.filter(ArchivoAdjunto.tabla == PARTES_TABLA, ArchivoAdjunto.registro_id == parte_id)
+    elif run_id:
+        query = query.filter(ArchivoAdjunto.tabla == RUNS_TABLA, ArchivoAdjunto.registro_id == run_id)
+    else:
+        filtros = {"desde": desde, "hasta": hasta, "equipo_id": equipo_id}
+        partes = apply_filters(db.session.query(ParteDiaria.id), ParteDiaria, **filtros)
+        runs = apply_filters(db.session.query(ChecklistRun.id), ChecklistRun, **filtros)
+        query = query.filter(
+            or_(
+                and_(ArchivoAdjunto.tabla == PARTES_TABLA, ArchivoAdjunto.registro_id.in_(partes)),
+                and_(ArchivoAdjunto.tabla == RUNS_TABLA, ArchivoAdjunto.registro_id.in_(runs)),
+            )
+        )
+
+    folders = {PARTES_TABLA: "parte", RUNS_TABLA: "run"}
+    used: set[str] = set()
+    entries = []
+    for tabla, registro_id, filename, path in query.order_by(
+        ArchivoAdjunto.tabla, ArchivoAdjunto.registro_id, ArchivoAdjunto.id
+    ):
+        folder = f"{folders.get(tabla, tabla)}_{registro_id}"
+        name = os.path.basename(filename or path or "") or "archivo"
+        entries.append((unique_arcname(f"{folder}/{name}", used), path))
+    return entries
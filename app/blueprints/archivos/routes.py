@@ -2,25 +2,34 @@ from __future__ import annotations
 
 import mimetypes
 import os
-import uuid
 from types import SimpleNamespace
 from typing import Iterable
 
 from flask import (
     Blueprint,
+    Response,
     abort,
     current_app,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
-    send_file,
     url_for,
 )
 from flask_login import login_required
 from werkzeug.utils import secure_filename
 
+from app.blueprints.archivos.helpers import evidencias_zip_entries
 from app.extensions import db
+from app.services import uploads
+from app.services.storage_gc import enqueue_file_removal
+from app.services.thumbnails import has_thumbnail, thumbnail_path
+from app.storage.blobs import get_blob_store
+from app.utils.downloads import send_stored_file
+from app.utils.files import VIDEO_EXTENSIONS, FileTooLarge, describe_file
+from app.utils.filters import request_filters
+from app.utils.zipstream import iter_zip
 
 bp = Blueprint(
     "archivos_bp",
@@ -30,6 +39,8 @@ bp = Blueprint(
 )
 
 ALLOWED_EXTENSIONS: set[str] = {".jpg", ".jpeg", ".png", ".pdf"}
+# Las subidas por partes admiten además video; su límite es UPLOAD_MAX_BYTES.
+CHUNKED_EXTENSIONS: set[str] = ALLOWED_EXTENSIONS | set(VIDEO_EXTENSIONS)
 MAX_SIZE = 10 * 1024 * 1024  # 10 MB
 
 
@@ -52,12 +63,6 @@ def _imports():
     return ParteDiaria, ChecklistRun, ArchivoAdjunto
 
 
-def _upload_dir() -> str:
-    dest = current_app.config.get("UPLOAD_DIR") or "/opt/render/project/data/uploads"
-    os.makedirs(dest, exist_ok=True)
-    return dest
-
-
 def _attachment_path(record) -> str | None:
     for attr in ("ruta", "path", "filepath"):
         value = getattr(record, attr, None)
@@ -77,15 +82,7 @@ def _attachment_name(record) -> str:
 
 def _attachment_size(record) -> int:
     size = getattr(record, "size", None)
-    if isinstance(size, int) and size >= 0:
-        return size
-    path = _attachment_path(record)
-    if path and os.path.exists(path):
-        try:
-            return os.path.getsize(path)
-        except OSError:
-            return 0
-    return 0
+    return size if isinstance(size, int) and size >= 0 else 0
 
 
 def _label_for(record) -> str:
@@ -103,7 +100,18 @@ def _label_for(record) -> str:
     return " · ".join(labels) if labels else "—"
 
 
-def _build_payload(model, *, name: str, path: str, mime: str, size: int, parte_id: int | None, run_id: int | None):
+def _build_payload(
+    model,
+    *,
+    name: str,
+    path: str,
+    mime: str,
+    size: int,
+    parte_id: int | None,
+    run_id: int | None,
+    sha256: str | None = None,
+    categoria: str | None = None,
+):
     payload = {}
     if hasattr(model, "nombre"):
         payload["nombre"] = name
@@ -123,6 +131,10 @@ def _build_payload(model, *, name: str, path: str, mime: str, size: int, parte_i
         payload["mimetype"] = mime
     if hasattr(model, "size"):
         payload["size"] = size
+    if sha256 and hasattr(model, "sha256"):
+        payload["sha256"] = sha256
+    if categoria and hasattr(model, "categoria"):
+        payload["categoria"] = categoria
 
     if parte_id:
         if hasattr(model, "parte_id"):
@@ -170,6 +182,7 @@ def _serialize_records(records: Iterable) -> list[SimpleNamespace]:
                 name=_attachment_name(record),
                 size_kb=size_bytes // 1024,
                 label=_label_for(record),
+                thumb=has_thumbnail(_attachment_path(record)),
                 record=record,
             )
         )
@@ -221,36 +234,30 @@ def upload():
         flash("Extensión no permitida", "error")
         return _redirect_with_filters(parte_id, run_id)
 
-    file.seek(0, os.SEEK_END)
-    size = file.tell()
-    file.seek(0)
-    if size > MAX_SIZE:
-        flash("Archivo demasiado grande (máx 10MB)", "error")
-        return _redirect_with_filters(parte_id, run_id)
-
-    upload_root = _upload_dir()
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    abs_path = os.path.join(upload_root, unique_name)
-    file.save(abs_path)
-
-    mime = mimetypes.guess_type(filename)[0] or "application/octet-stream"
     ParteDiaria, ChecklistRun, ArchivoAdjunto = _imports()
     if not ArchivoAdjunto:
         flash("El modelo de archivos no está disponible.", "error")
-        try:
-            os.remove(abs_path)
-        except OSError:
-            pass
         return _redirect_with_filters(parte_id, run_id)
 
+    try:
+        blob = get_blob_store().put_stream(file.stream, max_bytes=MAX_SIZE)
+    except FileTooLarge:
+        flash("Archivo demasiado grande (máx 10MB)", "error")
+        return _redirect_with_filters(parte_id, run_id)
+
+    abs_path = blob.path
+    meta = describe_file(abs_path, filename, sha256=blob.sha256)
+
     payload = _build_payload(
         ArchivoAdjunto,
         name=filename,
         path=abs_path,
-        mime=mime,
-        size=size,
+        mime=meta["mimetype"],
+        size=meta["size"],
         parte_id=parte_id,
         run_id=run_id,
+        sha256=meta["sha256"],
+        categoria=meta["categoria"],
     )
     adjunto = ArchivoAdjunto(**payload)
     db.session.add(adjunto)
@@ -259,6 +266,119 @@ def upload():
     return _redirect_with_filters(parte_id, run_id)
 
 
+def _as_int(value) -> int | None:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _upload_response(status: dict, code: int = 200):
+    response = jsonify(status)
+    response.status_code = code
+    response.headers["Upload-Offset"] = str(status["offset"])
+    response.headers["Upload-Length"] = str(status["length"])
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def _upload_error(exc: uploads.UploadError):
+    response = jsonify({"detail": str(exc), "offset": exc.offset})
+    response.status_code = exc.status
+    if exc.offset is not None:
+        response.headers["Upload-Offset"] = str(exc.offset)
+    return response
+
+
+@bp.post("/uploads")
+@login_required
+def upload_create():
+    """Abre una subida por partes: ``{"filename", "length", "parte_id"?, "run_id"?}``."""
+
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(str(data.get("filename") or ""))
+    try:
+        status = uploads.create_upload(
+            filename,
+            data.get("length"),
+            allowed_extensions=CHUNKED_EXTENSIONS,
+            parte_id=_as_int(data.get("parte_id")),
+            run_id=_as_int(data.get("run_id")),
+        )
+    except uploads.UploadError as exc:
+        return _upload_error(exc)
+    response = _upload_response(status, 201)
+    response.headers["Location"] = url_for("archivos_bp.upload_chunk", upload_id=status["id"])
+    return response
+
+
+@bp.get("/uploads/<upload_id>")
+@login_required
+def upload_status(upload_id: str):
+    """Estado de la subida; con ``HEAD`` sólo devuelve ``Upload-Offset``."""
+
+    try:
+        return _upload_response(uploads.upload_status(upload_id))
+    except uploads.UploadError as exc:
+        return _upload_error(exc)
+
+
+@bp.patch("/uploads/<upload_id>")
+@login_required
+def upload_chunk(upload_id: str):
+    """Agrega el cuerpo de la petición en el desplazamiento ``Upload-Offset``."""
+
+    offset = request.headers.get("Upload-Offset", type=int)
+    if offset is None or offset < 0:
+        return jsonify({"detail": "Falta el encabezado Upload-Offset"}), 400
+    try:
+        status = uploads.append_chunk(upload_id, offset, request.stream)
+    except uploads.UploadError as exc:
+        return _upload_error(exc)
+    return _upload_response(status)
+
+
+@bp.delete("/uploads/<upload_id>")
+@login_required
+def upload_abort(upload_id: str):
+    try:
+        uploads.abort_upload(upload_id)
+    except uploads.UploadError as exc:
+        return _upload_error(exc)
+    return "", 204
+
+
+@bp.post("/uploads/<upload_id>/finalize")
+@login_required
+def upload_finalize(upload_id: str):
+    """Registra como evidencia una subida por partes ya completa."""
+
+    _, _, ArchivoAdjunto = _imports()
+    if not ArchivoAdjunto:
+        abort(404)
+    try:
+        result = uploads.finalize_upload(upload_id, get_blob_store())
+    except uploads.UploadError as exc:
+        return _upload_error(exc)
+
+    meta = describe_file(result["path"], result["filename"], sha256=result["sha256"])
+    payload = _build_payload(
+        ArchivoAdjunto,
+        name=result["filename"],
+        path=result["path"],
+        mime=meta["mimetype"],
+        size=meta["size"],
+        parte_id=result["parte_id"],
+        run_id=result["run_id"],
+        sha256=meta["sha256"],
+        categoria=meta["categoria"],
+    )
+    adjunto = ArchivoAdjunto(**payload)
+    db.session.add(adjunto)
+    db.session.commit()
+    return jsonify({"id": adjunto.id, "sha256": meta["sha256"], "size": meta["size"]}), 201
+
+
 @bp.get("/<int:attachment_id>/download")
 @login_required
 def download(attachment_id: int):
@@ -273,7 +393,68 @@ def download(attachment_id: int):
         abort(404)
     name = _attachment_name(adjunto)
     mimetype = getattr(adjunto, "mimetype", None) or mimetypes.guess_type(name)[0]
-    return send_file(path, as_attachment=True, download_name=name, mimetype=mimetype)
+    return send_stored_file(
+        path,
+        download_name=name,
+        mimetype=mimetype,
+        sha256=getattr(adjunto, "sha256", None),
+    )
+
+
+@bp.get("/zip")
+@login_required
+def download_zip():
+    """Todas las evidencias de un parte, un run o un rango de fechas en un zip.
+
+    El zip se genera mientras se envía (JPEG/PDF sin recomprimir), así que no
+    usa disco temporal y la memoria no depende de cuántos archivos incluya.
+    """
+
+    parte_id = request.args.get("parte_id", type=int)
+    run_id = request.args.get("run_id", type=int)
+    filtros = request_filters()
+    if not (parte_id or run_id or filtros["desde"] or filtros["hasta"]):
+        return jsonify({"detail": "Indica parte_id, run_id o un rango de fechas"}), 400
+
+    entries = evidencias_zip_entries(parte_id=parte_id, run_id=run_id, **filtros)
+    max_files = int(current_app.config.get("EVIDENCE_ZIP_MAX_FILES") or 0)
+    if max_files and len(entries) > max_files:
+        return jsonify({"detail": f"Demasiadas evidencias ({len(entries)}; máx {max_files})"}), 400
+
+    if parte_id:
+        name = f"evidencias_parte_{parte_id}.zip"
+    elif run_id:
+        name = f"evidencias_run_{run_id}.zip"
+    else:
+        name = f"evidencias_{filtros['desde'] or 'inicio'}_{filtros['hasta'] or 'hoy'}.zip"
+    response = Response(iter_zip(entries), mimetype="application/zip", direct_passthrough=True)
+    response.headers.set("Content-Disposition", "attachment", filename=name)
+    response.headers["Cache-Control"] = "no-store"
+    # Que nginx reenvíe cada bloque en vez de acumular la respuesta completa.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@bp.get("/<int:attachment_id>/thumb")
+@login_required
+def thumb(attachment_id: int):
+    """Miniatura JPEG generada por el worker; 404 mientras no exista."""
+
+    _, _, ArchivoAdjunto = _imports()
+    if not ArchivoAdjunto:
+        abort(404)
+    adjunto = db.session.get(ArchivoAdjunto, attachment_id)
+    path = _attachment_path(adjunto) if adjunto else None
+    if not has_thumbnail(path):
+        abort(404)
+    sha256 = getattr(adjunto, "sha256", None)
+    return send_stored_file(
+        thumbnail_path(path),
+        download_name=f"{os.path.splitext(_attachment_name(adjunto))[0]}.jpg",
+        mimetype="image/jpeg",
+        sha256=f"{sha256}-thumb" if sha256 else None,
+        as_attachment=False,
+    )
 
 
 @bp.post("/<int:attachment_id>/delete")
@@ -287,12 +468,8 @@ def delete(attachment_id: int):
     adjunto = db.session.get(ArchivoAdjunto, attachment_id)
     if not adjunto:
         abort(404)
-    path = _attachment_path(adjunto)
-    if path and os.path.exists(path):
-        try:
-            os.remove(path)
-        except OSError:
-            current_app.logger.warning("No se pudo eliminar archivo %s", path)
+    # El worker borra el blob si ninguna otra evidencia comparte el contenido.
+    enqueue_file_removal([_attachment_path(adjunto)])
     db.session.delete(adjunto)
     db.session.commit()
     flash("Archivo eliminado", "success")
@@ -9,14 +9,24 @@ from flask import (
     url_for,
     flash,
     current_app,
+    jsonify,
     send_file,
 )
-from sqlalchemy import func
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.units import cm
 
+from app.blueprints.archivos.helpers import RUNS_TABLA, evidencias_summaries
 from app.extensions import db
+from app.services.catalogs import equipos_catalog, operadores_catalog, templates_catalog
+from app.services.checklist_cache import template_items
+from app.services.checklist_stats import item_stats, record_answers
+from app.services.report_batch import send_report_batch
+from app.services.report_cache import cached_pdf
+from app.services.reports import render_run_pdf, run_report_data
+from app.utils.filters import apply_filters, parse_date as _parse_date, request_filters
 from app.models.checklist import (
     ChecklistTemplate,
     ChecklistItem,
@@ -24,15 +34,6 @@ from app.models.checklist import (
     ChecklistAnswer,
 )
 
-try:
-    from app.models.equipo import Equipo
-except Exception:  # pragma: no cover - módulo opcional
-    Equipo = None
-try:
-    from app.models.operador import Operador
-except Exception:  # pragma: no cover - módulo opcional
-    Operador = None
-
 bp = Blueprint(
     "checklists_bp",
     __name__,
@@ -41,21 +42,17 @@ bp = Blueprint(
 )
 
 
+# SQLite antiguo admite 999 parámetros por sentencia; cada respuesta usa 4.
+SQLITE_MAX_PARAMS = 999
+ANSWERS_CHUNK = SQLITE_MAX_PARAMS // 4
+
+
 @bp.before_request
 def _guard():
     if current_app.config.get("SECURITY_DISABLED") or current_app.config.get("LOGIN_DISABLED"):
         return
 
 
-def _parse_date(s, default=None):
-    if not s:
-        return default
-    try:
-        return datetime.strptime(s, "%Y-%m-%d").date()
-    except Exception:  # pragma: no cover - validaciones
-        return default
-
-
 def _pdf_header_footer(c, title):
     w, h = LETTER
     c.setFont("Helvetica-Bold", 12)
@@ -72,7 +69,12 @@ def _pdf_header_footer(c, title):
 @bp.get("/templates")
 def templates_index():
     rows = ChecklistTemplate.query.order_by(ChecklistTemplate.id.desc()).all()
-    return render_template("checklists/templates_index.html", rows=rows)
+    item_counts = dict(
+        db.session.query(ChecklistItem.template_id, func.count(ChecklistItem.id)).group_by(
+            ChecklistItem.template_id
+        )
+    )
+    return render_template("checklists/templates_index.html", rows=rows, item_counts=item_counts)
 
 
 @bp.get("/")
@@ -103,8 +105,7 @@ def template_edit(id):
         db.session.commit()
         flash("Plantilla actualizada", "success")
         return redirect(url_for("checklists_bp.templates_index"))
-    items = t.items.order_by(ChecklistItem.orden.asc(), ChecklistItem.id.asc()).all()
-    return render_template("checklists/template_form.html", item=t, items=items)
+    return render_template("checklists/template_form.html", item=t, items=template_items(t))
 
 
 @bp.post("/templates/<int:id>/delete")
@@ -142,12 +143,43 @@ def template_item_delete(template_id, item_id):
     return redirect(url_for("checklists_bp.template_edit", id=template_id))
 
 
+def _template_stats(id):
+    t = ChecklistTemplate.query.get_or_404(id)
+    filtros = request_filters()
+    return t, filtros, item_stats(t.id, template_items(t), **filtros)
+
+
+@bp.get("/templates/<int:id>/stats")
+def template_stats(id):
+    t, filtros, stats = _template_stats(id)
+    equipos = equipos_catalog()
+    return render_template(
+        "checklists/template_stats.html",
+        t=t,
+        stats=stats,
+        equipos=equipos,
+        **filtros,
+    )
+
+
+@bp.get("/templates/<int:id>/stats.json")
+def template_stats_json(id):
+    t, filtros, stats = _template_stats(id)
+    return jsonify(
+        template_id=t.id,
+        desde=filtros["desde"].isoformat() if filtros["desde"] else None,
+        hasta=filtros["hasta"].isoformat() if filtros["hasta"] else None,
+        equipo_id=filtros["equipo_id"],
+        items=stats,
+    )
+
+
 @bp.route("/ejecutar", methods=["GET", "POST"])
 def ejecutar():
     if request.method == "GET" and not request.args.get("template_id"):
-        templates = ChecklistTemplate.query.order_by(ChecklistTemplate.nombre.asc()).all()
-        equipos = Equipo.query.all() if Equipo else []
-        operadores = Operador.query.all() if Operador else []
+        templates = templates_catalog()
+        equipos = equipos_catalog()
+        operadores = operadores_catalog()
         return render_template(
             "checklists/ejecutar_select.html",
             templates=templates,
@@ -157,10 +189,10 @@ def ejecutar():
 
     template_id = request.values.get("template_id", type=int)
     t = ChecklistTemplate.query.get_or_404(template_id)
+    items = template_items(t)
     if request.method == "GET":
-        items = t.items.order_by(ChecklistItem.orden.asc(), ChecklistItem.id.asc()).all()
-        equipos = Equipo.query.all() if Equipo else []
-        operadores = Operador.query.all() if Operador else []
+        equipos = equipos_catalog()
+        operadores = operadores_catalog()
         return render_template(
             "checklists/ejecutar_form.html",
             t=t,
@@ -184,7 +216,7 @@ def ejecutar():
     db.session.add(run)
     db.session.flush()
 
-    items = ChecklistItem.query.filter_by(template_id=template_id).all()
+    answers = []
     oks = 0
     total_bool = 0
     for it in items:
@@ -193,24 +225,19 @@ def ejecutar():
             val = request.form.get(f"item_{it.id}") == "on"
             if val:
                 oks += 1
-            db.session.add(
-                ChecklistAnswer(
-                    run_id=run.id,
-                    item_id=it.id,
-                    valor_bool=val,
-                    comentario=(request.form.get(f"c_{it.id}") or "").strip(),
-                )
-            )
+            comentario = (request.form.get(f"c_{it.id}") or "").strip()
         else:
-            txt = (request.form.get(f"item_{it.id}") or "").strip()
-            db.session.add(
-                ChecklistAnswer(
-                    run_id=run.id,
-                    item_id=it.id,
-                    valor_bool=None,
-                    comentario=txt,
-                )
-            )
+            val = None
+            comentario = (request.form.get(f"item_{it.id}") or "").strip()
+        answers.append(
+            {"run_id": run.id, "item_id": it.id, "valor_bool": val, "comentario": comentario}
+        )
+    # Un solo INSERT multi-fila; los bloques respetan el límite de parámetros de SQLite.
+    for start in range(0, len(answers), ANSWERS_CHUNK):
+        db.session.execute(insert(ChecklistAnswer).values(answers[start : start + ANSWERS_CHUNK]))
+    record_answers(
+        (template_id, equipo_id, fecha, a["item_id"], a["valor_bool"]) for a in answers
+    )
     run.pct_ok = (oks / total_bool * 100.0) if total_bool else 0.0
     db.session.commit()
     flash("Checklist ejecutado", "success")
@@ -219,22 +246,22 @@ def ejecutar():
 
 @bp.get("/runs")
 def runs_index():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    q = ChecklistRun.query
-    if desde:
-        q = q.filter(ChecklistRun.fecha >= desde)
-    if hasta:
-        q = q.filter(ChecklistRun.fecha <= hasta)
+    filtros = _fechas()
+    desde, hasta = filtros["desde"], filtros["hasta"]
+    q = apply_filters(ChecklistRun.query, ChecklistRun, **filtros).options(
+        joinedload(ChecklistRun.template)
+    )
     pag = q.order_by(ChecklistRun.fecha.desc(), ChecklistRun.id.desc()).paginate(
         page=request.args.get("page", 1, type=int),
         per_page=10,
         error_out=False,
     )
+    evidencias = evidencias_summaries(RUNS_TABLA, [r.id for r in pag.items])
     return render_template(
         "checklists/runs_index.html",
         pagination=pag,
         rows=pag.items,
+        evidencias=evidencias,
         desde=desde,
         hasta=hasta,
     )
@@ -243,12 +270,8 @@ def runs_index():
 @bp.get("/run/<int:id>")
 def run_view(id):
     r = ChecklistRun.query.get_or_404(id)
-    items = (
-        ChecklistItem.query.filter_by(template_id=r.template_id)
-        .order_by(ChecklistItem.orden.asc(), ChecklistItem.id.asc())
-        .all()
-    )
-    answers = {a.item_id: a for a in r.answers.all()}
+    items = template_items(r.template)
+    answers = {a.item_id: a for a in r.answers}
     return render_template(
         "checklists/run_view.html",
         r=r,
@@ -260,104 +283,63 @@ def run_view(id):
 @bp.get("/run/<int:id>/pdf")
 def run_pdf(id):
     r = ChecklistRun.query.get_or_404(id)
-    items = (
-        ChecklistItem.query.filter_by(template_id=r.template_id)
-        .order_by(ChecklistItem.orden.asc(), ChecklistItem.id.asc())
-        .all()
-    )
-    answers = {a.item_id: a for a in r.answers.all()}
-
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=LETTER)
-    _pdf_header_footer(c, f"Checklist — {r.template.nombre}")
-
-    w, h = LETTER
-    x, y = 2 * cm, h - 3.2 * cm
-    c.setFont("Helvetica", 10)
-    header = [
-        ("Fecha", r.fecha.isoformat()),
-        ("Plantilla", r.template.nombre),
-        ("Norma", r.template.norma or "-"),
-        ("Equipo", r.equipo_id or "-"),
-        ("Operador", r.operador_id or "-"),
-        ("% OK", f"{r.pct_ok:.1f}%"),
-    ]
-    for k, v in header:
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(x, y, k + ":")
-        c.setFont("Helvetica", 10)
-        c.drawString(x + 4 * cm, y, str(v))
-        y -= 0.8 * cm
-
-    y -= 0.2 * cm
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(x, y, "Resultados")
-    y -= 0.7 * cm
-    c.setFont("Helvetica", 9)
-    for it in items:
-        ans = answers.get(it.id)
-        if it.tipo == "bool":
-            txt = "✓" if (ans and ans.valor_bool) else "✗"
-            if ans and ans.comentario:
-                txt += f" — {ans.comentario}"
-        else:
-            txt = ans.comentario if ans else ""
-        c.drawString(x, y, f"- {it.texto[:80]}: {txt[:80]}")
-        y -= 0.55 * cm
-        if y < 2.5 * cm:
-            c.showPage()
-            _pdf_header_footer(c, f"Checklist — {r.template.nombre}")
-            y = h - 3 * cm
-
-    c.showPage()
-    c.save()
-    buf.seek(0)
+    path = cached_pdf("checklist", r.id, run_report_data(r), render_run_pdf)
     return send_file(
-        buf,
+        path,
         as_attachment=True,
         download_name=f"checklist_{r.id}.pdf",
         mimetype="application/pdf",
     )
 
 
+@bp.get("/runs/lote")
+def runs_lote():
+    return send_report_batch("checklist", fmt=request.args.get("formato", "zip"), **_fechas())
+
+
+def _resumen_stats(filtros):
+    query = db.session.query(
+        func.count(ChecklistRun.id),
+        func.coalesce(func.avg(ChecklistRun.pct_ok), 0),
+    )
+    total, avg_ok = apply_filters(query, ChecklistRun, **filtros).one()
+    return int(total or 0), float(avg_ok or 0)
+
+
+def _ultimos(filtros, limit):
+    query = apply_filters(ChecklistRun.query, ChecklistRun, **filtros).options(
+        joinedload(ChecklistRun.template)
+    )
+    return query.order_by(ChecklistRun.fecha.desc(), ChecklistRun.id.desc()).limit(limit).all()
+
+
+def _fechas():
+    filtros = request_filters()
+    filtros["equipo_id"] = None
+    return filtros
+
+
 @bp.get("/resumen")
 def resumen():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    q = ChecklistRun.query
-    if desde:
-        q = q.filter(ChecklistRun.fecha >= desde)
-    if hasta:
-        q = q.filter(ChecklistRun.fecha <= hasta)
-    total = q.count()
-    avg_ok = db.session.query(func.coalesce(func.avg(ChecklistRun.pct_ok), 0)).scalar() or 0
-    ultimos = (
-        q.order_by(ChecklistRun.fecha.desc(), ChecklistRun.id.desc())
-        .limit(20)
-        .all()
-    )
+    filtros = _fechas()
+    total, avg_ok = _resumen_stats(filtros)
+    ultimos = _ultimos(filtros, 20)
     return render_template(
         "checklists/resumen.html",
         total=total,
         avg_ok=avg_ok,
         ultimos=ultimos,
-        desde=desde,
-        hasta=hasta,
+        desde=filtros["desde"],
+        hasta=filtros["hasta"],
     )
 
 
 @bp.get("/resumen.pdf")
 def resumen_pdf():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    q = ChecklistRun.query
-    if desde:
-        q = q.filter(ChecklistRun.fecha >= desde)
-    if hasta:
-        q = q.filter(ChecklistRun.fecha <= hasta)
-    rows = q.order_by(ChecklistRun.fecha.desc(), ChecklistRun.id.desc()).all()
-    total = len(rows)
-    avg_ok = sum(r.pct_ok for r in rows) / total if total else 0
+    filtros = _fechas()
+    desde, hasta = filtros["desde"], filtros["hasta"]
+    total, avg_ok = _resumen_stats(filtros)
+    rows = _ultimos(filtros, 30)
 
     buf = BytesIO()
     c = canvas.Canvas(buf, pagesize=LETTER)
@@ -376,7 +358,7 @@ def resumen_pdf():
     c.drawString(2 * cm, y, "Últimos")
     y -= 0.7 * cm
     c.setFont("Helvetica", 9)
-    for r in rows[:30]:
+    for r in rows:
         line = (
             f"{r.fecha} | T:{r.template.nombre[:20]} | Eq:{r.equipo_id or '-'} | %OK:{r.pct_ok:.1f}"
         )
@@ -3,11 +3,13 @@ from __future__ import annotations
 import csv
 import os
 
-from flask import current_app, flash, redirect, render_template, request, send_file, url_for
+from flask import current_app, flash, jsonify, redirect, render_template, request, send_file, url_for
 from flask_login import login_required
 
 from app.db import db
 from app.models import Equipo
+from app.services.lookup import AUTOCOMPLETE_LIMIT, autocomplete, matches
+from app.services.parte_history import parse_cursor, recent_partes, window_totals
 from app.utils.pagination import paginate
 
 from . import bp
@@ -19,14 +21,7 @@ def index():
     q = (request.args.get("q", "") or "").strip()
     query = Equipo.query
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                Equipo.codigo.ilike(like),
-                Equipo.tipo.ilike(like),
-                Equipo.marca.ilike(like),
-            )
-        )
+        query = query.filter(matches("equipos", q))
     query = query.order_by(Equipo.codigo.asc())
     page = request.args.get("page", type=int) or 1
     per_page = min(max(request.args.get("per_page", type=int) or 20, 1), 100)
@@ -39,6 +34,13 @@ def index():
     )
 
 
+@bp.get("/autocomplete")
+@login_required
+def autocomplete_json():
+    limit = min(max(request.args.get("limit", type=int) or AUTOCOMPLETE_LIMIT, 1), 50)
+    return jsonify(autocomplete("equipos", request.args.get("q", ""), limit))
+
+
 @bp.get("/export")
 @login_required
 def export_csv():
@@ -153,4 +155,13 @@ def eliminar(equipo_id: int):
 @login_required
 def detalle(equipo_id: int):
     equipo = Equipo.query.get_or_404(equipo_id)
-    return render_template("equipos/detalle.html", equipo=equipo)
+    partes, next_cursor = recent_partes(
+        "equipo", equipo.id, before=parse_cursor(request.args.get("antes"))
+    )
+    return render_template(
+        "equipos/detalle.html",
+        equipo=equipo,
+        partes=partes,
+        next_cursor=next_cursor,
+        ventanas=window_totals("equipo", equipo.id),
+    )
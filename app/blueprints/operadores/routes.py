@@ -7,16 +7,18 @@ import os
 from flask import (
     current_app,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
     send_file,
     url_for,
 )
-from sqlalchemy import or_
 
 from app.extensions import db
 from app.models.operador import Operador
+from app.services.lookup import AUTOCOMPLETE_LIMIT, autocomplete, matches
+from app.services.parte_history import parse_cursor, recent_partes, window_totals
 
 from . import bp
 
@@ -48,14 +50,7 @@ def index():
 
     query = Operador.query
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                Operador.nombre.ilike(like),
-                Operador.doc_id.ilike(like),
-                Operador.notas.ilike(like),
-            )
-        )
+        query = query.filter(matches("operadores", q))
     if vence_en:
         limite = date.today() + timedelta(days=vence_en)
         query = query.filter(
@@ -75,6 +70,12 @@ def index():
     )
 
 
+@bp.get("/autocomplete")
+def autocomplete_json():
+    limit = min(max(request.args.get("limit", type=int) or AUTOCOMPLETE_LIMIT, 1), 50)
+    return jsonify(autocomplete("operadores", request.args.get("q", ""), limit))
+
+
 @bp.route("/new", methods=["GET", "POST"])
 def create():
     if request.method == "POST":
@@ -92,6 +93,21 @@ def create():
     return render_template("operadores/form.html", item=None)
 
 
+@bp.get("/<int:operador_id>")
+def detalle(operador_id: int):
+    operador = Operador.query.get_or_404(operador_id)
+    partes, next_cursor = recent_partes(
+        "operador", operador.id, before=parse_cursor(request.args.get("antes"))
+    )
+    return render_template(
+        "operadores/detalle.html",
+        op=operador,
+        partes=partes,
+        next_cursor=next_cursor,
+        ventanas=window_totals("operador", operador.id),
+    )
+
+
 @bp.route("/<int:operador_id>/edit", methods=["GET", "POST"])
 def edit(operador_id: int):
     operador = Operador.query.get_or_404(operador_id)
@@ -122,14 +138,7 @@ def export_csv():
 
     query = Operador.query
     if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                Operador.nombre.ilike(like),
-                Operador.doc_id.ilike(like),
-                Operador.notas.ilike(like),
-            )
-        )
+        query = query.filter(matches("operadores", q))
     if vence_en:
         limite = date.today() + timedelta(days=vence_en)
         query = query.filter(
@@ -7,18 +7,19 @@ from werkzeug.utils import secure_filename
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.units import cm
-from sqlalchemy import func
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+from app.blueprints.archivos.helpers import PARTES_TABLA, evidencias_summaries
 from app.extensions import db
-
-try:
-    from app.models.equipo import Equipo
-except Exception:  # pragma: no cover - fallback cuando el módulo cambia
-    from app.models import Equipo
-
-try:
-    from app.models.operador import Operador
-except Exception:  # pragma: no cover - fallback cuando el módulo cambia
-    from app.models import Operador
+from app.services.catalogs import equipos_catalog, operadores_catalog
+from app.services.report_batch import send_report_batch
+from app.services.report_cache import cached_pdf
+from app.services.storage_gc import enqueue_file_removal
+from app.services.storage_usage import record_evidence
+from app.services.reports import parte_report_data, render_parte_pdf
+from app.storage.blobs import get_blob_store
+from app.utils.files import FileTooLarge, describe_file
+from app.utils.filters import apply_filters, parse_date as _parse_date, request_filters
 
 from app.models.parte_diaria import ParteDiaria, ArchivoAdjunto
 
@@ -31,26 +32,44 @@ def _guard():
         return None
 
 
-def _parse_date(value, default=None):
-    if not value:
-        return default
-    try:
-        return datetime.strptime(value, "%Y-%m-%d").date()
-    except Exception:
-        return default
+def _save_upload(file_storage):
+    """Guarda un adjunto del formulario en el almacén de blobs; ``None`` si no hay archivo.
 
+    Lanza ``FileTooLarge`` si supera ``UPLOAD_FORM_MAX_BYTES``.
+    """
 
-def _save_upload(file_storage, subdir="partes"):
     if not file_storage or not file_storage.filename:
         return None
-    root = current_app.config.get("UPLOAD_DIR", "/opt/render/project/data/uploads")
-    os.makedirs(os.path.join(root, subdir), exist_ok=True)
     fname = secure_filename(file_storage.filename)
-    ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    final_name = f"{ts}_{fname}"
-    abs_path = os.path.join(root, subdir, final_name)
-    file_storage.save(abs_path)
-    return abs_path, final_name
+    max_bytes = current_app.config.get("UPLOAD_FORM_MAX_BYTES")
+    blob = get_blob_store().put_stream(file_storage.stream, max_bytes=max_bytes)
+    return blob.path, fname, blob.sha256
+
+
+def _save_adjuntos(parte):
+    """Guarda los adjuntos del formulario; devuelve los nombres rechazados por tamaño."""
+
+    rechazados = []
+    for storage in request.files.getlist("adjuntos"):
+        try:
+            saved = _save_upload(storage)
+        except FileTooLarge:
+            rechazados.append(storage.filename)
+            continue
+        if saved:
+            abs_path, fname, sha256 = saved
+            db.session.add(
+                ArchivoAdjunto(
+                    tabla="partes_diarias",
+                    registro_id=parte.id,
+                    filename=fname,
+                    path=abs_path,
+                    **describe_file(abs_path, fname, sha256=sha256),
+                )
+            )
+    db.session.commit()
+    if rechazados:
+        flash(f"Adjuntos demasiado grandes: {', '.join(rechazados)}", "warning")
 
 
 def _pdf_header_footer(c, title):
@@ -62,19 +81,31 @@ def _pdf_header_footer(c, title):
     c.line(2 * cm, h - 2.2 * cm, w - 2 * cm, h - 2.2 * cm)
 
 
+def _resumen_stats(filtros):
+    con_incidencias = func.coalesce(func.trim(ParteDiaria.incidencias), "") != ""
+    query = db.session.query(
+        func.count(ParteDiaria.id),
+        func.coalesce(func.sum(ParteDiaria.horas_trabajo), 0.0),
+        func.coalesce(func.sum(case((con_incidencias, 1), else_=0)), 0),
+    )
+    partes_count, total_horas, incidencias_count = apply_filters(
+        query, ParteDiaria, **filtros
+    ).one()
+    return int(partes_count or 0), float(total_horas or 0), int(incidencias_count or 0)
+
+
+def _ultimos(filtros, limit):
+    query = apply_filters(ParteDiaria.query, ParteDiaria, **filtros)
+    return query.order_by(ParteDiaria.fecha.desc(), ParteDiaria.id.desc()).limit(limit).all()
+
+
 @bp.get("/")
 def index():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    equipo_id = request.args.get("equipo_id", type=int)
-
-    query = ParteDiaria.query
-    if desde:
-        query = query.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        query = query.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        query = query.filter(ParteDiaria.equipo_id == equipo_id)
+    filtros = request_filters()
+    desde, hasta, equipo_id = filtros["desde"], filtros["hasta"], filtros["equipo_id"]
+    query = apply_filters(ParteDiaria.query, ParteDiaria, **filtros).options(
+        joinedload(ParteDiaria.equipo), joinedload(ParteDiaria.operador)
+    )
 
     page = request.args.get("page", 1, type=int)
     per_page = 10
@@ -82,11 +113,13 @@ def index():
         page=page, per_page=per_page, error_out=False
     )
 
-    equipos = Equipo.query.order_by(Equipo.id.desc()).all() if hasattr(Equipo, "query") else []
+    equipos = equipos_catalog()
+    evidencias = evidencias_summaries(PARTES_TABLA, [r.id for r in pagination.items])
     return render_template(
         "partes/index.html",
         pagination=pagination,
         rows=pagination.items,
+        evidencias=evidencias,
         equipos=equipos,
         desde=desde,
         hasta=hasta,
@@ -96,8 +129,8 @@ def index():
 
 @bp.route("/new", methods=["GET", "POST"])
 def create():
-    equipos = Equipo.query.order_by(Equipo.id.desc()).all() if hasattr(Equipo, "query") else []
-    operadores = Operador.query.order_by(Operador.id.desc()).all() if hasattr(Operador, "query") else []
+    equipos = equipos_catalog()
+    operadores = operadores_catalog()
 
     if request.method == "POST":
         parte = ParteDiaria(
@@ -112,19 +145,7 @@ def create():
         db.session.add(parte)
         db.session.commit()
 
-        for storage in request.files.getlist("adjuntos"):
-            saved = _save_upload(storage, subdir="partes")
-            if saved:
-                abs_path, fname = saved
-                db.session.add(
-                    ArchivoAdjunto(
-                        tabla="partes_diarias",
-                        registro_id=parte.id,
-                        filename=fname,
-                        path=abs_path,
-                    )
-                )
-        db.session.commit()
+        _save_adjuntos(parte)
 
         flash("Parte diaria creada", "success")
         return redirect(url_for("partes.index"))
@@ -135,8 +156,8 @@ def create():
 @bp.route("/<int:id>/edit", methods=["GET", "POST"])
 def edit(id):
     parte = ParteDiaria.query.get_or_404(id)
-    equipos = Equipo.query.order_by(Equipo.id.desc()).all() if hasattr(Equipo, "query") else []
-    operadores = Operador.query.order_by(Operador.id.desc()).all() if hasattr(Operador, "query") else []
+    equipos = equipos_catalog()
+    operadores = operadores_catalog()
 
     if request.method == "POST":
         parte.fecha = _parse_date(request.form.get("fecha"), default=parte.fecha)
@@ -148,19 +169,7 @@ def edit(id):
         parte.notas = (request.form.get("notas") or "").strip()
         db.session.commit()
 
-        for storage in request.files.getlist("adjuntos"):
-            saved = _save_upload(storage, subdir="partes")
-            if saved:
-                abs_path, fname = saved
-                db.session.add(
-                    ArchivoAdjunto(
-                        tabla="partes_diarias",
-                        registro_id=parte.id,
-                        filename=fname,
-                        path=abs_path,
-                    )
-                )
-        db.session.commit()
+        _save_adjuntos(parte)
 
         flash("Parte diaria actualizada", "success")
         return redirect(url_for("partes.index"))
@@ -178,14 +187,13 @@ def edit(id):
 @bp.post("/<int:id>/delete")
 def delete(id):
     parte = ParteDiaria.query.get_or_404(id)
-    attachments = ArchivoAdjunto.query.filter_by(tabla="partes_diarias", registro_id=parte.id).all()
-    for attachment in attachments:
-        try:
-            if os.path.exists(attachment.path):
-                os.remove(attachment.path)
-        except Exception:
-            pass
-    ArchivoAdjunto.query.filter_by(tabla="partes_diarias", registro_id=parte.id).delete()
+    adjuntos = ArchivoAdjunto.query.filter_by(tabla="partes_diarias", registro_id=parte.id)
+    rows = adjuntos.with_entities(
+        ArchivoAdjunto.path, ArchivoAdjunto.categoria, ArchivoAdjunto.size
+    ).all()
+    enqueue_file_removal(row.path for row in rows)
+    record_evidence((row.categoria, -(row.size or 0), -1) for row in rows)
+    adjuntos.delete()
     db.session.delete(parte)
     db.session.commit()
     flash("Parte diaria eliminada", "success")
@@ -195,69 +203,18 @@ def delete(id):
 @bp.get("/<int:id>/pdf")
 def pdf_parte(id):
     p = ParteDiaria.query.get_or_404(id)
-    eq_name = f"Equipo #{p.equipo_id}"
-    op_name = f"Operador #{p.operador_id}"
-    try:
-        if p.equipo_id and "Equipo" in globals():
-            e = db.session.get(Equipo, p.equipo_id)
-            if e and hasattr(e, "nombre"):
-                eq_name = f"{getattr(e, 'nombre', eq_name)} (#{e.id})"
-    except Exception:
-        pass
-    try:
-        if p.operador_id and "Operador" in globals():
-            o = db.session.get(Operador, p.operador_id)
-            if o and hasattr(o, "nombre"):
-                op_name = f"{getattr(o, 'nombre', op_name)} (#{o.id})"
-    except Exception:
-        pass
+    path = cached_pdf("parte", p.id, parte_report_data(p), render_parte_pdf)
+    return send_file(path, as_attachment=True, download_name=f"parte_{p.id}.pdf", mimetype="application/pdf")
 
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=LETTER)
-    _pdf_header_footer(c, "Parte diaria")
 
-    x, y = 2 * cm, 25 * cm
-    c.setFont("Helvetica", 10)
-    rows = [
-        ("ID", p.id),
-        ("Fecha", p.fecha.isoformat() if p.fecha else ""),
-        ("Equipo", eq_name),
-        ("Operador", op_name),
-        ("Horas de trabajo", f"{p.horas_trabajo:.2f}"),
-        ("Actividad", p.actividad or ""),
-        ("Incidencias", p.incidencias or ""),
-        ("Notas", p.notas or ""),
-    ]
-    for k, v in rows:
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(x, y, f"{k}:")
-        c.setFont("Helvetica", 10)
-        c.drawString(x + 4.2 * cm, y, str(v))
-        y -= 0.9 * cm
-        if y < 3 * cm:
-            c.showPage()
-            _pdf_header_footer(c, "Parte diaria")
-            y = 25 * cm
-
-    c.showPage()
-    c.save()
-    buf.seek(0)
-    return send_file(buf, as_attachment=True, download_name=f"parte_{p.id}.pdf", mimetype="application/pdf")
+@bp.get("/lote")
+def pdf_lote():
+    return send_report_batch("parte", fmt=request.args.get("formato", "zip"), **request_filters())
 
 
 @bp.get("/export")
 def export_csv():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    equipo_id = request.args.get("equipo_id", type=int)
-
-    query = ParteDiaria.query
-    if desde:
-        query = query.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        query = query.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        query = query.filter(ParteDiaria.equipo_id == equipo_id)
+    query = apply_filters(ParteDiaria.query, ParteDiaria, **request_filters())
 
     rows = query.order_by(ParteDiaria.fecha.desc(), ParteDiaria.id.desc()).all()
 
@@ -296,49 +253,16 @@ def export_csv():
 
 @bp.get("/resumen")
 def resumen():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    equipo_id = request.args.get("equipo_id", type=int)
-
-    q = ParteDiaria.query
-    if desde:
-        q = q.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        q = q.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        q = q.filter(ParteDiaria.equipo_id == equipo_id)
-
-    total_horas = db.session.query(func.coalesce(func.sum(ParteDiaria.horas_trabajo), 0.0))
-    if desde:
-        total_horas = total_horas.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        total_horas = total_horas.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        total_horas = total_horas.filter(ParteDiaria.equipo_id == equipo_id)
-    total_horas = float(total_horas.scalar() or 0)
-
-    partes_count = q.count()
-
-    incidencias_count = db.session.query(func.count(ParteDiaria.id))
-    incidencias_count = incidencias_count.filter(
-        func.coalesce(func.nullif(func.trim(ParteDiaria.incidencias), ""), None) != None
-    )
-    if desde:
-        incidencias_count = incidencias_count.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        incidencias_count = incidencias_count.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        incidencias_count = incidencias_count.filter(ParteDiaria.equipo_id == equipo_id)
-    incidencias_count = incidencias_count.scalar() or 0
+    filtros = request_filters()
+    partes_count, total_horas, incidencias_count = _resumen_stats(filtros)
+    ultimos = _ultimos(filtros, 20)
 
-    ultimos = q.order_by(ParteDiaria.fecha.desc(), ParteDiaria.id.desc()).limit(20).all()
-
-    equipos = Equipo.query.order_by(Equipo.id.desc()).all() if hasattr(Equipo, "query") else []
+    equipos = equipos_catalog()
     return render_template(
         "partes/resumen.html",
-        desde=desde,
-        hasta=hasta,
-        equipo_id=equipo_id,
+        desde=filtros["desde"],
+        hasta=filtros["hasta"],
+        equipo_id=filtros["equipo_id"],
         equipos=equipos,
         total_horas=total_horas,
         partes_count=partes_count,
@@ -349,29 +273,10 @@ def resumen():
 
 @bp.get("/resumen.pdf")
 def resumen_pdf():
-    desde = _parse_date(request.args.get("desde"))
-    hasta = _parse_date(request.args.get("hasta"))
-    equipo_id = request.args.get("equipo_id", type=int)
-
-    q = ParteDiaria.query
-    if desde:
-        q = q.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        q = q.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        q = q.filter(ParteDiaria.equipo_id == equipo_id)
-    rows = q.order_by(ParteDiaria.fecha.desc(), ParteDiaria.id.desc()).all()
-
-    total_horas = db.session.query(func.coalesce(func.sum(ParteDiaria.horas_trabajo), 0.0))
-    if desde:
-        total_horas = total_horas.filter(ParteDiaria.fecha >= desde)
-    if hasta:
-        total_horas = total_horas.filter(ParteDiaria.fecha <= hasta)
-    if equipo_id:
-        total_horas = total_horas.filter(ParteDiaria.equipo_id == equipo_id)
-    total_horas = float(total_horas.scalar() or 0)
-    partes_count = len(rows)
-    incidencias_count = len([r for r in rows if (r.incidencias or "").strip()])
+    filtros = request_filters()
+    desde, hasta, equipo_id = filtros["desde"], filtros["hasta"], filtros["equipo_id"]
+    partes_count, total_horas, incidencias_count = _resumen_stats(filtros)
+    rows = _ultimos(filtros, 30)
 
     buf = BytesIO()
     c = canvas.Canvas(buf, pagesize=LETTER)
@@ -393,7 +298,7 @@ def resumen_pdf():
     y -= 0.7 * cm
     c.setFont("Helvetica", 9)
 
-    for r in rows[:30]:
+    for r in rows:
         line = (
             f"{r.fecha} | Eq:{r.equipo_id or '-'} | Op:{r.operador_id or '-'} | Horas:{r.horas_trabajo:.2f} | "
             f"{(r.actividad or '')[:60]}"
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from flask import Blueprint
+
+from app.security import register_login_guard
+
+bp = Blueprint(
+    "search",
+    __name__,
+    url_prefix="/search",
+    template_folder="../../templates/search",
+)
+
+register_login_guard(bp)
+
+from . import routes  # noqa: E402,F401
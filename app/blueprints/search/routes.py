@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from flask import jsonify, render_template, request, url_for
+
+from app.auth.roles import has_role
+from app.services.search import KINDS, search
+
+from . import bp
+
+PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+_LABELS = {"bitacora": "Bitácoras", "parte": "Partes", "checklist": "Checklists"}
+# Los mismos roles que pueden ver /admin/bitacoras.
+BITACORA_ROLES = ("admin", "supervisor", "editor")
+
+
+def _allowed_kinds() -> tuple[str, ...]:
+    if has_role(*BITACORA_ROLES):
+        return KINDS
+    return tuple(k for k in KINDS if k != "bitacora")
+
+
+def _hit_url(hit: dict) -> str:
+    if hit["kind"] == "parte":
+        return url_for("partes.edit", id=hit["id"])
+    if hit["kind"] == "checklist":
+        return url_for("checklists_bp.run_view", id=hit["run_id"])
+    return url_for("admin.bitacoras")
+
+
+@bp.get("/")
+def index():
+    q = (request.args.get("q") or "").strip()
+    allowed = _allowed_kinds()
+    selected = [k for k in request.args.getlist("tipo") if k in allowed]
+    kinds = selected or (None if allowed == KINDS else list(allowed))
+    page = request.args.get("page", 1, type=int)
+    per_page = min(max(request.args.get("per_page", PER_PAGE, type=int), 1), MAX_PER_PAGE)
+
+    result = search(q, kinds=kinds, page=page, per_page=per_page)
+    for hit in result["items"]:
+        hit["url"] = _hit_url(hit)
+
+    if request.args.get("format") == "json":
+        for hit in result["items"]:
+            hit["fecha"] = hit["fecha"].isoformat() if hit["fecha"] else None
+        return jsonify(result)
+    return render_template(
+        "search/index.html",
+        result=result,
+        tipos=selected,
+        labels={k: label for k, label in _LABELS.items() if k in allowed},
+    )
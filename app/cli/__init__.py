@@ -14,8 +14,26 @@ from .seed_admin import seed_admin as seed_admin_command, seed_admin_user
 
 from app.db import db
 from app.models import ChecklistItem, ChecklistTemplate, Equipo, Operador, ParteDiaria, User
+from app.services.archivos_service import backfill_archivos_metadata, migrate_archivos_to_blobs
 from app.services.auth_service import ensure_admin_user
+from app.services.checklist_stats import rebuild_stats
+from app.services.csv_import import BATCH_SIZE, ENTITIES, CsvImportError, import_csv
+from app.services.equipo_usage import reconcile_usage
+from app.services.report_batch import (
+    FORMATS as REPORT_FORMATS,
+    KINDS as REPORT_KINDS,
+    count_reports,
+    iter_report_jobs,
+    render_batch,
+)
+from app.services.jobs import purge_finished, run_pending
+from app.services.lookup import rebuild_lookup_indexes
 from app.services.maintenance_service import cleanup_expired_refresh_tokens
+from app.services.search import rebuild_search_index
+from app.services.storage_gc import collect_orphans
+from app.services.storage_usage import rebuild_usage
+from app.services.thumbnails import backfill_thumbnails
+from app.services.uploads import purge_stale_uploads
 from app.utils.strings import normalize_email
 
 
@@ -157,6 +175,136 @@ def register_cli(app):
         result = cleanup_expired_refresh_tokens(grace_days=grace_days)
         click.echo(f"Cleanup done: {result}")
 
+    @app.cli.command("archivos-backfill")
+    @click.option("--batch-size", default=200, show_default=True, help="Registros por lote.")
+    @click.option("--workers", default=8, show_default=True, help="Hilos para stat/hash en paralelo.")
+    def archivos_backfill(batch_size: int, workers: int) -> None:
+        """Completar tamaño, mimetype, categoría y sha256 de evidencias existentes."""
+
+        result = backfill_archivos_metadata(batch_size=batch_size, workers=workers)
+        click.echo(f"Backfill archivos: {result}")
+        if result["updated"]:
+            rebuild_usage()
+
+    @app.cli.command("storage-migrate")
+    @click.option("--batch-size", default=200, show_default=True, help="Registros por lote.")
+    @click.option("--workers", default=8, show_default=True, help="Hilos para hash/copia en paralelo.")
+    def storage_migrate(batch_size: int, workers: int) -> None:
+        """Mover evidencias existentes al almacén de blobs por sha256 (reanudable)."""
+
+        result = migrate_archivos_to_blobs(batch_size=batch_size, workers=workers)
+        click.echo(f"Migración de almacenamiento: {result}")
+
+    @app.cli.command("reports-batch")
+    @click.option("--tipo", "kind", type=click.Choice(REPORT_KINDS), required=True)
+    @click.option("--desde", type=click.DateTime(formats=["%Y-%m-%d"]), default=None)
+    @click.option("--hasta", type=click.DateTime(formats=["%Y-%m-%d"]), default=None)
+    @click.option("--equipo-id", type=int, default=None)
+    @click.option("--formato", "fmt", type=click.Choice(REPORT_FORMATS), default="zip", show_default=True)
+    @click.option("--workers", type=int, default=None, help="Procesos de render (por defecto, núcleos).")
+    @click.option("--out", "out_path", type=click.Path(dir_okay=False), required=True)
+    def reports_batch(kind, desde, hasta, equipo_id, fmt, workers, out_path) -> None:
+        """Renderizar en paralelo los PDF de partes o checklists en un zip."""
+
+        filters = {
+            "desde": desde.date() if desde else None,
+            "hasta": hasta.date() if hasta else None,
+            "equipo_id": equipo_id,
+        }
+        total = count_reports(kind, **filters)
+        with click.progressbar(length=total, label="Renderizando") as bar:
+            result = render_batch(
+                iter_report_jobs(kind, **filters),
+                out_path,
+                fmt=fmt,
+                workers=workers,
+                progress=bar.update,
+            )
+        click.echo(f"Lote listo: {out_path} ({result['count']} reportes, {result['format']})")
+
+    @app.cli.command("uploads-purge")
+    @click.option("--max-age-hours", default=24, show_default=True, type=int)
+    def uploads_purge(max_age_hours: int) -> None:
+        """Eliminar subidas por partes abandonadas en instance/.tmp/uploads."""
+
+        removed = purge_stale_uploads(max_age_hours * 3600)
+        click.echo(f"Subidas abandonadas eliminadas: {removed}")
+
+    @app.cli.command("jobs-run")
+    @click.option("--limit", default=1000, show_default=True, help="Máximo de tareas a procesar.")
+    @click.option("--purge-days", default=7, show_default=True, help="Borrar tareas terminadas más antiguas.")
+    def jobs_run(limit: int, purge_days: int) -> None:
+        """Procesar la cola de tareas una vez (lo mismo que hace worker.py en bucle)."""
+
+        click.echo(f"Tareas procesadas: {run_pending(limit)}")
+        click.echo(f"Tareas terminadas purgadas: {purge_finished(purge_days * 24 * 3600)}")
+
+    @app.cli.command("thumbnails-backfill")
+    def thumbnails_backfill() -> None:
+        """Encolar miniaturas para imágenes y PDF existentes que no la tienen."""
+
+        click.echo(f"Miniaturas encoladas: {backfill_thumbnails()}")
+
+    @app.cli.command("storage-gc")
+    @click.option("--dry-run", is_flag=True, help="Sólo informar, sin borrar.")
+    @click.option("--grace-hours", default=24, show_default=True, help="Respetar blobs más recientes.")
+    def storage_gc(dry_run: bool, grace_hours: int) -> None:
+        """Borrar blobs que ninguna evidencia referencia y reportar los bytes recuperados."""
+
+        result = collect_orphans(dry_run=dry_run, grace_seconds=grace_hours * 3600)
+        click.echo(f"Recolección de almacenamiento: {result}")
+
+    @app.cli.command("storage-usage-rebuild")
+    def storage_usage_rebuild() -> None:
+        """Recalcular la contabilidad de almacenamiento desde assets y evidencias."""
+
+        click.echo(f"Filas de uso de almacenamiento: {rebuild_usage()}")
+
+    @app.cli.command("equipos-usage-reconcile")
+    @click.option("--dry-run", is_flag=True, help="Sólo contar los equipos con desvío.")
+    def equipos_usage_reconcile(dry_run: bool) -> None:
+        """Recalcular horas, partes e incidencias de cada equipo desde partes_diarias."""
+
+        result = reconcile_usage(dry_run=dry_run)
+        click.echo(f"Uso de equipos: {result}")
+
+    @app.cli.command("search-reindex")
+    def search_reindex() -> None:
+        """Crear o regenerar los índices de búsqueda (texto completo y trigramas)."""
+
+        click.echo(f"Índice de búsqueda: {rebuild_search_index()} filas")
+        rebuild_lookup_indexes()
+        click.echo("Índices de trigramas de equipos y operadores regenerados")
+
+    @app.cli.command("checklist-stats-rebuild")
+    @click.option("--template-id", type=int, default=None, help="Sólo esta plantilla.")
+    def checklist_stats_rebuild(template_id: int | None) -> None:
+        """Recalcular estadísticas por ítem desde las respuestas guardadas."""
+
+        rows = rebuild_stats(template_id)
+        click.echo(f"Estadísticas de checklist: {rows} filas")
+
+    @app.cli.command("import-csv")
+    @click.argument("entity", type=click.Choice(ENTITIES))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--batch-size", type=int, default=BATCH_SIZE, show_default=True)
+    @click.option("--dry-run", is_flag=True, help="Sólo validar, sin escribir.")
+    def import_csv_command(entity: str, path: str, batch_size: int, dry_run: bool) -> None:
+        """Importar equipos, operadores o partes desde un CSV con encabezado."""
+
+        with open(path, encoding="utf-8-sig", newline="") as fh:
+            try:
+                report = import_csv(entity, fh, batch_size=batch_size, dry_run=dry_run)
+            except CsvImportError as exc:
+                raise click.ClickException(str(exc)) from None
+        for error in report["error_rows"]:
+            click.echo(f"Línea {error['line']}: {error['error']}", err=True)
+        click.echo(
+            f"{entity}: {report['rows']} filas, {report['inserted']} nuevas, "
+            f"{report['updated']} actualizadas, {report['errors']} con error "
+            f"({report['method']}, {report['seconds']} s)"
+        )
+
     @app.cli.command("seed-equipos")
     def seed_equipos():
         """Cargar equipos de demostración si no existen."""
@@ -48,6 +48,27 @@ class Config:
         )
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
         self.DATA_DIR = os.getenv("DATA_DIR", str(PROJECT_ROOT / "data"))
+        self.PDF_CACHE_MAX_BYTES = int(
+            os.getenv("PDF_CACHE_MAX_BYTES", str(200 * 1024 * 1024))
+        )
+        self.REPORTS_BATCH_MAX = int(os.getenv("REPORTS_BATCH_MAX", "500"))
+        # Procesos de render por petición web (cada petición crea su pool).
+        self.REPORTS_BATCH_WORKERS = int(os.getenv("REPORTS_BATCH_WORKERS", "2"))
+        self.SYNC_BATCH_MAX = int(os.getenv("SYNC_BATCH_MAX", "500"))
+        self.UPLOAD_FORM_MAX_BYTES = int(
+            os.getenv("UPLOAD_FORM_MAX_BYTES", str(25 * 1024 * 1024))
+        )
+        self.UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+        # Blobs por sha256 (ab/cd/<hash>); vacío = "<UPLOAD_DIR>/blobs".
+        self.BLOB_DIR = os.getenv("BLOB_DIR", "")
+        self.EVIDENCE_ZIP_MAX_FILES = int(os.getenv("EVIDENCE_ZIP_MAX_FILES", "5000"))
+        # Segundos tras los cuales una tarea "running" se da por abandonada.
+        self.JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "600"))
+        # Descargas: "" (Flask envía los bytes), "x-accel" (nginx) o "x-sendfile".
+        self.FILE_OFFLOAD = os.getenv("FILE_OFFLOAD", "").strip().lower()
+        # Para x-accel: "/ruta/en/disco=/ubicacion/interna,..."
+        self.X_ACCEL_MAPPING = _list_env("X_ACCEL_MAPPING")
+        self.DOWNLOAD_MAX_AGE = int(os.getenv("DOWNLOAD_MAX_AGE", str(365 * 24 * 3600)))
         self.AUTH_SIMPLE = _bool_env("AUTH_SIMPLE", True)
         self.ALLOW_SELF_SIGNUP = _bool_env("ALLOW_SELF_SIGNUP", False)
         self.SIGNUP_MODE = os.getenv("SIGNUP_MODE", "invite")
@@ -52,6 +52,18 @@ assets_registered = Gauge(
     "Current number of assets registered in the database.",
     multiprocess_mode="livesum",
 )
+storage_usage_bytes = Gauge(
+    "storage_usage_bytes",
+    "Bytes stored per scope (project, folder, evidencias) and file category.",
+    ["scope", "scope_id", "categoria"],
+    multiprocess_mode="mostrecent",
+)
+storage_usage_files = Gauge(
+    "storage_usage_files",
+    "Files stored per scope (project, folder, evidencias) and file category.",
+    ["scope", "scope_id", "categoria"],
+    multiprocess_mode="mostrecent",
+)
 
 
 def cleanup_multiprocess_directory() -> None:
@@ -79,5 +91,7 @@ __all__ = [
     "scan_lock",
     "folders_registered",
     "assets_registered",
+    "storage_usage_bytes",
+    "storage_usage_files",
     "cleanup_multiprocess_directory",
 ]
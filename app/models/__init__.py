@@ -71,6 +71,10 @@ class MetricDaily(db.Model):
     value = db.Column(db.Float, nullable=False, default=0.0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index("ix_metrics_daily_project_kpi_date", "project_id", "kpi_name", "date"),
+    )
+
 
 class Todo(db.Model):
     __tablename__ = "todos"
@@ -100,15 +104,19 @@ from app.models.asset import Asset  # noqa: E402,F401
 from app.models.checklist import (  # noqa: E402,F401
     ChecklistAnswer,
     ChecklistItem,
+    ChecklistItemStat,
     ChecklistRun,
     ChecklistTemplate,
 )
 from app.models.equipo import Equipo  # noqa: E402,F401
 from app.models.folder import Folder  # noqa: E402,F401
 from app.models.invite import Invite  # noqa: E402,F401
+from app.models.job import Job  # noqa: E402,F401
 from app.models.operador import Operador  # noqa: E402,F401
 from app.models.parte_diaria import ArchivoAdjunto, ParteDiaria  # noqa: E402,F401
 from app.models.refresh_token import RefreshToken  # noqa: E402,F401
+from app.models.storage_usage import StorageUsage  # noqa: E402,F401
+from app.models.sync_receipt import SyncReceipt  # noqa: E402,F401
 
 
 __all__ = [
@@ -120,6 +128,7 @@ __all__ = [
     "MetricDaily",
     "ChecklistTemplate",
     "ChecklistItem",
+    "ChecklistItemStat",
     "ChecklistRun",
     "ChecklistAnswer",
     "Todo",
@@ -128,6 +137,9 @@ __all__ = [
     "ParteDiaria",
     "ArchivoAdjunto",
     "Invite",
+    "Job",
     "RefreshToken",
+    "StorageUsage",
+    "SyncReceipt",
     "User",
 ]
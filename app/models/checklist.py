@@ -1,3 +1,6 @@
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
 from app.extensions import db
 
 
@@ -7,11 +10,14 @@ class ChecklistTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(160), nullable=False)
     norma = db.Column(db.String(40))
+    # Se incrementa cada vez que cambian sus ítems; invalida la caché de ítems.
+    items_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     items = db.relationship(
         "ChecklistItem",
         backref="template",
         cascade="all, delete-orphan",
-        lazy="dynamic",
+        order_by="(ChecklistItem.orden, ChecklistItem.id)",
+        lazy="select",
     )
 
 
@@ -49,7 +55,7 @@ class ChecklistRun(db.Model):
         "ChecklistAnswer",
         backref="run",
         cascade="all, delete-orphan",
-        lazy="dynamic",
+        lazy="select",
     )
 
 
@@ -69,3 +75,44 @@ class ChecklistAnswer(db.Model):
     )
     valor_bool = db.Column(db.Boolean)
     comentario = db.Column(db.Text)
+
+
+class ChecklistItemStat(db.Model):
+    """Conteo diario de respuestas por ítem y equipo.
+
+    Se mantiene al guardar respuestas (ver ``app.services.checklist_stats``).
+    ``equipo_id`` vale 0 para las ejecuciones sin equipo, así la clave única
+    también las agrupa.
+    """
+
+    __tablename__ = "checklist_item_stats"
+    __table_args__ = (
+        db.UniqueConstraint("item_id", "equipo_id", "fecha", name="uq_checklist_item_stats_key"),
+        db.Index("ix_checklist_item_stats_template_fecha", "template_id", "fecha"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    template_id = db.Column(db.Integer, nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    equipo_id = db.Column(db.Integer, nullable=False, default=0)
+    fecha = db.Column(db.Date, nullable=False)
+    answered = db.Column(db.Integer, nullable=False, default=0)
+    ok = db.Column(db.Integer, nullable=False, default=0)
+    fail = db.Column(db.Integer, nullable=False, default=0)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_items_version(session, flush_context, instances):
+    """Incrementa ``items_version`` de las plantillas con ítems modificados."""
+
+    template_ids = {
+        obj.template_id
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, ChecklistItem) and obj.template_id
+    }
+    for template_id in template_ids:
+        template = session.get(ChecklistTemplate, template_id)
+        if template is not None and template not in session.deleted:
+            # Expresión SQL: el incremento lo hace la base, así dos ediciones
+            # concurrentes no escriben la misma versión.
+            template.items_version = func.coalesce(ChecklistTemplate.items_version, 0) + 1
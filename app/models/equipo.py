@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from sqlalchemy import event, update
+
 from app.db import db
 
 
@@ -18,6 +20,11 @@ class Equipo(db.Model):
     status = db.Column(db.String(32), default="activo")
     ubicacion = db.Column(db.String(128))
     horas_uso = db.Column(db.Float, default=0.0)
+    # Uso acumulado desde ``partes_diarias`` (ver ``app.services.equipo_usage``).
+    horas_trabajadas = db.Column(db.Float, nullable=False, default=0.0, server_default="0")
+    partes_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    incidencias_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    ultimo_parte = db.Column(db.Date)
     fecha_alta = db.Column(db.Date, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -25,5 +32,14 @@ class Equipo(db.Model):
     partes = db.relationship(
         "ParteDiaria",
         back_populates="equipo",
-        lazy="dynamic",
+        # Historial sin límite: nunca se carga completo (ver ``app.services.parte_history``).
+        lazy="write_only",
+        passive_deletes=True,
     )
+
+
+@event.listens_for(Equipo, "before_delete")
+def _detach_partes(mapper, connection, target):
+    # Con ``passive_deletes`` el ORM ya no carga los partes para soltarlos.
+    partes = mapper.local_table.metadata.tables["partes_diarias"]
+    connection.execute(update(partes).where(partes.c.equipo_id == target.id).values(equipo_id=None))
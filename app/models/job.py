@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class Job(db.Model):
+    """Tarea en segundo plano que procesa ``worker.py``.
+
+    ``payload`` es JSON. Una tarea ``running`` cuyo ``locked_at`` supera
+    ``JOB_LOCK_TIMEOUT`` se considera abandonada y otro worker la retoma.
+    """
+
+    __tablename__ = "jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    status = db.Column(db.String(16), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (db.Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+    def __repr__(self) -> str:  # pragma: no cover - ayuda para depuración
+        return f"<Job {self.id} {self.kind} {self.status}>"
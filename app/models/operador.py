@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from datetime import date
 
+from sqlalchemy import event, update
+
 from app.extensions import db
 
 
@@ -18,10 +20,19 @@ class Operador(db.Model):
     partes = db.relationship(
         "ParteDiaria",
         back_populates="operador",
-        lazy="dynamic",
+        # Historial sin límite: nunca se carga completo (ver ``app.services.parte_history``).
+        lazy="write_only",
+        passive_deletes=True,
     )
 
     def dias_para_vencer(self) -> int | None:
         if not self.licencia_vence:
             return None
         return (self.licencia_vence - date.today()).days
+
+
+@event.listens_for(Operador, "before_delete")
+def _detach_partes(mapper, connection, target):
+    # Con ``passive_deletes`` el ORM ya no carga los partes para soltarlos.
+    partes = mapper.local_table.metadata.tables["partes_diarias"]
+    connection.execute(update(partes).where(partes.c.operador_id == target.id).values(operador_id=None))
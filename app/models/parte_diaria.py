@@ -27,6 +27,12 @@ class ParteDiaria(db.Model):
     equipo = db.relationship("Equipo", back_populates="partes")
     operador = db.relationship("Operador", back_populates="partes")
 
+    # Historial por equipo/operador paginado por (fecha, id) descendente.
+    __table_args__ = (
+        db.Index("ix_partes_diarias_equipo_fecha", "equipo_id", "fecha", "id"),
+        db.Index("ix_partes_diarias_operador_fecha", "operador_id", "fecha", "id"),
+    )
+
     def __repr__(self) -> str:  # pragma: no cover - ayuda para depuración
         return f"<ParteDiaria id={self.id} fecha={self.fecha}>"
 
@@ -39,4 +45,10 @@ class ArchivoAdjunto(db.Model):
     registro_id = db.Column(db.Integer, nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.BigInteger)
+    mimetype = db.Column(db.String(128))
+    categoria = db.Column(db.String(16))
+    sha256 = db.Column(db.String(64), index=True)
     subido_en = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (db.Index("ix_archivos_tabla_registro", "tabla", "registro_id"),)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class StorageUsage(db.Model):
+    """Bytes y archivos guardados por ámbito y categoría.
+
+    ``scope`` es ``project`` o ``folder`` (assets escaneados, ``scope_id`` es
+    el id correspondiente) o ``evidencias`` (tabla ``archivos``, ``scope_id``
+    0). ``categoria`` es ``img``, ``pdf``, ``video`` u ``otro``.
+    """
+
+    __tablename__ = "storage_usage"
+
+    id = db.Column(db.Integer, primary_key=True)
+    scope = db.Column(db.String(16), nullable=False)
+    scope_id = db.Column(db.Integer, nullable=False, default=0)
+    categoria = db.Column(db.String(16), nullable=False)
+    bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    files = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("scope", "scope_id", "categoria", name="uq_storage_usage_key"),
+    )
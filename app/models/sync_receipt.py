@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class SyncReceipt(db.Model):
+    """Recibo de un registro enviado por ``/api/v1/sync``.
+
+    ``client_key`` es la clave de idempotencia generada por el dispositivo;
+    reenviar el mismo lote devuelve los ids ya creados en vez de duplicarlos.
+    """
+
+    __tablename__ = "sync_receipts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    client_key = db.Column(db.String(64), nullable=False, unique=True)
+    kind = db.Column(db.String(16), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self) -> str:  # pragma: no cover - ayuda para depuración
+        return f"<SyncReceipt {self.kind}:{self.record_id} key={self.client_key}>"
@@ -6,6 +6,7 @@ from flask import Blueprint, Flask
 
 from app.api.metrics import bp as metrics_bp
 from app.api.version import bp as version_bp
+from app.api.v1.sync import bp as sync_v1_bp
 from app.api.v1.todos import bp as todos_v1_bp
 from app.api.v1.users import bp as users_v1_bp
 from app.blueprints.admin import bp_admin
@@ -14,6 +15,7 @@ from app.blueprints.auth import bp_auth
 from app.blueprints.equipos import bp as equipos_bp
 from app.blueprints.operadores import bp as operadores_bp
 from app.blueprints.ping import bp_ping
+from app.blueprints.search import bp as search_bp
 from app.blueprints.web import bp_web
 from app.routes.assets import assets_bp
 from app.routes.auth import bp as auth_api_bp
@@ -30,10 +32,12 @@ def register_blueprints(app: Flask) -> dict[str, Blueprint]:
         (bp_web, {}),
         (equipos_bp, {}),
         (operadores_bp, {}),
+        (search_bp, {}),
         (bp_admin, {}),
         (bp_api_v1, {"url_prefix": "/api/v1"}),
         (todos_v1_bp, {}),
         (users_v1_bp, {}),
+        (sync_v1_bp, {}),
         (metrics_bp, {}),
         (version_bp, {}),
         (assets_bp, {}),
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+import os
 
+from flask import Blueprint, abort, jsonify, request
+
+from app.db import db
 from app.models.asset import Asset
+from app.security.guards import requires_auth
+from app.utils.downloads import send_stored_file
 
 assets_bp = Blueprint("assets", __name__, url_prefix="/api/assets")
 
@@ -35,3 +40,21 @@ def list_assets():
             for asset in items
         ]
     )
+
+
+@assets_bp.get("/<int:asset_id>/download")
+@requires_auth
+def download_asset(asset_id: int):
+    asset = db.session.get(Asset, asset_id)
+    if asset is None or asset.folder is None or not asset.folder.fs_path:
+        abort(404)
+    root = os.path.realpath(asset.folder.fs_path)
+    path = os.path.realpath(os.path.join(root, asset.relative_path))
+    if not path.startswith(root + os.sep):
+        abort(404)
+    return send_stored_file(
+        path,
+        download_name=asset.filename,
+        mimetype=asset.mime_type,
+        sha256=asset.sha256,
+    )
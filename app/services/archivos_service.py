@@ -0,0 +1,180 @@
+"""Mantenimiento de evidencias (tabla ``archivos``) y de sus archivos en disco."""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models.parte_diaria import ArchivoAdjunto
+from app.storage.blobs import SIDECAR_SUFFIXES, BlobStore, get_blob_store
+from app.utils.files import describe_file, sha256_of_file
+
+
+def _describe_row(row) -> dict[str, object] | None:
+    if not row.path or not os.path.isfile(row.path):
+        return None
+    try:
+        meta = describe_file(row.path, row.filename)
+    except OSError:
+        return None
+    meta["id"] = row.id
+    return meta
+
+
+def backfill_archivos_metadata(
+    *,
+    batch_size: int = 200,
+    workers: int = 8,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    """Completa ``size``, ``mimetype``, ``categoria`` y ``sha256`` faltantes.
+
+    Recorre los adjuntos sin tamaño por lotes (paginación por ``id``), calcula
+    los metadatos en paralelo con un pool de hilos (stat + hash son E/S) y los
+    escribe con un ``UPDATE`` masivo por lote.
+
+    Returns:
+        Conteo de registros actualizados y de archivos no encontrados en disco.
+    """
+
+    stats = {"updated": 0, "missing": 0}
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while True:
+            rows = (
+                db.session.query(
+                    ArchivoAdjunto.id, ArchivoAdjunto.path, ArchivoAdjunto.filename
+                )
+                .filter(ArchivoAdjunto.size.is_(None), ArchivoAdjunto.id > last_id)
+                .order_by(ArchivoAdjunto.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            updates = [meta for meta in pool.map(_describe_row, rows) if meta]
+            if updates:
+                db.session.execute(update(ArchivoAdjunto), updates)
+            db.session.commit()
+
+            stats["updated"] += len(updates)
+            stats["missing"] += len(rows) - len(updates)
+            if progress:
+                progress(len(rows))
+
+    return stats
+
+
+def remove_unreferenced_files(
+    paths: Iterable[str], store: BlobStore | None = None, *, min_age_seconds: int = 0
+) -> int:
+    """Borra del disco los ``paths`` que ya no usa ningún adjunto.
+
+    Con almacenamiento direccionado por contenido varios adjuntos comparten
+    el mismo archivo, así que sólo se borra cuando no queda ninguna fila que
+    lo referencie. Llamar después de eliminar (o actualizar) las filas.
+    Los blobs modificados hace menos de ``min_age_seconds`` se conservan (una
+    subida con el mismo contenido puede estar en curso); la recolección de
+    huérfanos los quita después si siguen sin uso.
+    """
+
+    candidates = {p for p in paths if p}
+    if not candidates:
+        return 0
+    in_use = {
+        row.path
+        for row in db.session.query(ArchivoAdjunto.path).filter(
+            ArchivoAdjunto.path.in_(candidates)
+        )
+    }
+    store = store or get_blob_store()
+    removed = 0
+    cutoff = time.time() - min_age_seconds
+    for path in candidates - in_use:
+        try:
+            if store.contains(path):
+                if min_age_seconds and os.path.getmtime(path) > cutoff:
+                    continue
+                removed += store.delete(os.path.basename(path))
+            elif os.path.exists(path):
+                os.remove(path)
+                removed += 1
+                for suffix in SIDECAR_SUFFIXES:
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+        except (OSError, ValueError):
+            current_app.logger.warning("No se pudo eliminar archivo %s", path)
+    return removed
+
+
+def _store_row(row, store: BlobStore) -> dict[str, object] | None:
+    if not row.path or not os.path.isfile(row.path):
+        return None
+    # El hash se recalcula siempre: un sha256 desactualizado en la tabla
+    # dejaría el contenido bajo un nombre que no le corresponde.
+    blob = store.put_file(row.path, sha256=sha256_of_file(row.path), move=False)
+    return {"id": row.id, "path": blob.path, "sha256": blob.sha256, "old_path": row.path}
+
+
+def migrate_archivos_to_blobs(
+    *,
+    batch_size: int = 200,
+    workers: int = 8,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    """Mueve los adjuntos guardados con nombre propio al almacén de blobs.
+
+    Por lote (paginación por ``id``): enlaza o copia cada archivo a su ruta
+    por hash en paralelo, actualiza ``path``/``sha256`` con un ``UPDATE``
+    masivo, confirma y sólo entonces borra los originales que ya nadie
+    referencia. Interrumpir el proceso deja los archivos viejos en su lugar y
+    volver a ejecutarlo continúa con lo pendiente.
+
+    Returns:
+        Conteo de registros migrados, ya presentes en el almacén, archivos no
+        encontrados y originales borrados.
+    """
+
+    store = get_blob_store()
+    stats = {"migrated": 0, "skipped": 0, "missing": 0, "removed": 0}
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        while True:
+            rows = (
+                db.session.query(ArchivoAdjunto.id, ArchivoAdjunto.path)
+                .filter(ArchivoAdjunto.id > last_id)
+                .order_by(ArchivoAdjunto.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            pending = [row for row in rows if not store.contains(row.path)]
+            results = [r for r in pool.map(lambda row: _store_row(row, store), pending) if r]
+            if results:
+                db.session.execute(
+                    update(ArchivoAdjunto),
+                    [{k: r[k] for k in ("id", "path", "sha256")} for r in results],
+                )
+            db.session.commit()
+            stats["removed"] += remove_unreferenced_files(
+                (r["old_path"] for r in results), store
+            )
+
+            stats["migrated"] += len(results)
+            stats["skipped"] += len(rows) - len(pending)
+            stats["missing"] += len(pending) - len(results)
+            if progress:
+                progress(len(rows))
+
+    return stats
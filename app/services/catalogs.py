@@ -0,0 +1,145 @@
+"""Catálogos de equipos, operadores y plantillas para los selectores de formularios.
+
+Los listados de partes y checklists muestran los mismos desplegables en cada
+petición. Se guardan como tuplas ligeras (no objetos ORM, que quedarían
+ligados a una sesión cerrada) bajo la clave ``(catálogo, versión)``: cada
+alta, edición o baja en este proceso sube la versión del catálogo afectado,
+así la siguiente lectura vuelve a consultar, y ``CATALOG_TTL`` acota cuánto
+tarda en verse un cambio hecho desde otro proceso.
+
+``catalog_payload`` entrega el mismo contenido como ``id → etiqueta`` con un
+ETag derivado del contenido (igual en todos los procesos), para que
+``/api/v1/catalogs/<nombre>`` pueda responder ``304`` al navegador.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, NamedTuple
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.checklist import ChecklistTemplate
+from app.models.equipo import Equipo
+from app.models.operador import Operador
+from app.utils.cache import LRUCache
+
+CATALOG_TTL = 60
+
+_catalogs = LRUCache(maxsize=16, ttl=CATALOG_TTL)
+_versions: dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+class EquipoOption(NamedTuple):
+    id: int
+    codigo: str
+
+    @property
+    def label(self) -> str:
+        return self.codigo
+
+
+class OperadorOption(NamedTuple):
+    id: int
+    nombre: str
+
+    @property
+    def label(self) -> str:
+        return self.nombre
+
+
+class TemplateOption(NamedTuple):
+    id: int
+    nombre: str
+    norma: str | None
+
+    @property
+    def label(self) -> str:
+        return f"{self.nombre} ({self.norma or '-'})"
+
+
+def _load_equipos() -> tuple[EquipoOption, ...]:
+    rows = db.session.query(Equipo.id, Equipo.codigo).order_by(Equipo.id.desc())
+    return tuple(EquipoOption(*row) for row in rows)
+
+
+def _load_operadores() -> tuple[OperadorOption, ...]:
+    rows = db.session.query(Operador.id, Operador.nombre).order_by(Operador.id.desc())
+    return tuple(OperadorOption(*row) for row in rows)
+
+
+def _load_templates() -> tuple[TemplateOption, ...]:
+    rows = db.session.query(
+        ChecklistTemplate.id, ChecklistTemplate.nombre, ChecklistTemplate.norma
+    ).order_by(ChecklistTemplate.nombre.asc())
+    return tuple(TemplateOption(*row) for row in rows)
+
+
+_LOADERS: dict[str, Callable[[], tuple]] = {
+    "equipos": _load_equipos,
+    "operadores": _load_operadores,
+    "templates": _load_templates,
+}
+CATALOGS = tuple(_LOADERS)
+
+
+def catalog_version(name: str) -> int:
+    return _versions.get(name, 0)
+
+
+def _entry(name: str) -> tuple[tuple, str]:
+    key = (name, catalog_version(name))
+    entry = _catalogs.get(key)
+    if entry is None:
+        options = _LOADERS[name]()
+        body = json.dumps([[o.id, o.label] for o in options], ensure_ascii=False)
+        entry = (options, hashlib.sha1(body.encode("utf-8")).hexdigest()[:20])
+        _catalogs.discard_where(lambda k: k[0] == name)
+        _catalogs.set(key, entry)
+    return entry
+
+
+def equipos_catalog() -> tuple[EquipoOption, ...]:
+    return _entry("equipos")[0]
+
+
+def operadores_catalog() -> tuple[OperadorOption, ...]:
+    return _entry("operadores")[0]
+
+
+def templates_catalog() -> tuple[TemplateOption, ...]:
+    return _entry("templates")[0]
+
+
+def catalog_payload(name: str) -> tuple[dict[str, Any], str]:
+    """``({"name", "items": [{"id", "label"}]}, etag)`` del catálogo ``name``."""
+
+    if name not in _LOADERS:
+        raise KeyError(name)
+    options, etag = _entry(name)
+    payload = {"name": name, "items": [{"id": o.id, "label": o.label} for o in options]}
+    return payload, f"{name}-{etag}"
+
+
+def invalidate_catalogs(*names: str) -> None:
+    with _versions_lock:
+        for name in names or CATALOGS:
+            _versions[name] = _versions.get(name, 0) + 1
+    _catalogs.discard_where(lambda k: not names or k[0] in names)
+
+
+def _listen(model, name: str) -> None:
+    def _on_change(mapper, connection, target):
+        invalidate_catalogs(name)
+
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, _event, _on_change)
+
+
+_listen(Equipo, "equipos")
+_listen(Operador, "operadores")
+_listen(ChecklistTemplate, "templates")
@@ -0,0 +1,65 @@
+"""Caché en proceso de los ítems de cada plantilla de checklist.
+
+La clave es ``(template_id, items_version)``: al agregar, editar o eliminar un
+ítem la versión de la plantilla sube (ver ``app.models.checklist``) y la
+siguiente lectura consulta la base de datos de nuevo. Los ítems se guardan
+como tuplas inmutables para poder compartirlos entre peticiones e hilos.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.checklist import ChecklistItem, ChecklistTemplate
+from app.utils.cache import LRUCache
+
+_items_cache = LRUCache(maxsize=256)
+
+
+class ItemDef(NamedTuple):
+    id: int
+    texto: str
+    tipo: str
+    orden: int
+
+
+def template_items(template) -> tuple[ItemDef, ...]:
+    """Ítems de ``template`` ordenados por ``orden`` e ``id``."""
+
+    version = template.items_version or 0
+    key = (template.id, version)
+    items = _items_cache.get(key)
+    if items is not None:
+        return items
+
+    rows = (
+        db.session.query(
+            ChecklistItem.id,
+            ChecklistItem.texto,
+            ChecklistItem.tipo,
+            ChecklistItem.orden,
+        )
+        .filter(ChecklistItem.template_id == template.id)
+        .order_by(ChecklistItem.orden.asc(), ChecklistItem.id.asc())
+        .all()
+    )
+    items = tuple(ItemDef(r.id, r.texto, r.tipo, r.orden or 0) for r in rows)
+    _items_cache.discard_where(lambda k: k[0] == template.id and k[1] != version)
+    _items_cache.set(key, items)
+    return items
+
+
+def clear() -> None:
+    _items_cache.clear()
+
+
+@event.listens_for(Session, "before_flush")
+def _forget_deleted_templates(session, flush_context, instances):
+    # SQLite puede reutilizar el id de una plantilla eliminada.
+    for obj in session.deleted:
+        if isinstance(obj, ChecklistTemplate) and obj.id is not None:
+            _items_cache.discard_where(lambda k, tid=obj.id: k[0] == tid)
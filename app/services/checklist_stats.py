@@ -0,0 +1,154 @@
+"""Estadísticas agregadas de respuestas por ítem de checklist.
+
+``checklist_item_stats`` guarda, por ítem, equipo y día, cuántas respuestas
+hubo y cuántas fueron OK o falla. Los contadores se incrementan al escribir
+respuestas: los INSERT masivos llaman a ``record_answers`` y las respuestas
+creadas vía ORM se registran en ``after_flush``. ``rebuild_stats`` recalcula
+la tabla desde ``checklist_answers`` si alguna vez se desincroniza.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Iterable
+
+from sqlalchemy import case, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.checklist import ChecklistAnswer, ChecklistItemStat, ChecklistRun
+from app.utils.filters import apply_filters
+from app.utils.upsert import increment_counters
+
+# (template_id, equipo_id, fecha, item_id, valor_bool)
+AnswerRow = tuple[int, int | None, date, int, bool | None]
+
+_KEY = ("item_id", "equipo_id", "fecha")
+
+
+def _deltas(rows: Iterable[AnswerRow]) -> list[dict[str, Any]]:
+    totals: dict[tuple, dict[str, Any]] = {}
+    for template_id, equipo_id, fecha, item_id, valor_bool in rows:
+        key = (item_id, equipo_id or 0, fecha)
+        entry = totals.get(key)
+        if entry is None:
+            entry = totals[key] = {
+                "template_id": template_id,
+                "item_id": item_id,
+                "equipo_id": equipo_id or 0,
+                "fecha": fecha,
+                "answered": 0,
+                "ok": 0,
+                "fail": 0,
+            }
+        entry["answered"] += 1
+        if valor_bool is True:
+            entry["ok"] += 1
+        elif valor_bool is False:
+            entry["fail"] += 1
+    return list(totals.values())
+
+
+def record_answers(rows: Iterable[AnswerRow], session: Session | None = None) -> int:
+    """Suma las respuestas ``rows`` a los contadores diarios.
+
+    Usa ``INSERT ... ON CONFLICT DO UPDATE`` en SQLite y PostgreSQL, de modo
+    que todas las filas se aplican en una sola sentencia.
+    """
+
+    values = _deltas(rows)
+    if not values:
+        return 0
+    session = session or db.session
+    increment_counters(
+        session.connection(),
+        ChecklistItemStat.__table__,
+        values,
+        key=_KEY,
+        counters=("answered", "ok", "fail"),
+    )
+    return len(values)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_orm_answers(session, flush_context):
+    answers = [obj for obj in session.new if isinstance(obj, ChecklistAnswer)]
+    if not answers:
+        return
+    rows = []
+    for ans in answers:
+        run = session.get(ChecklistRun, ans.run_id)
+        if run is not None:
+            rows.append((run.template_id, run.equipo_id, run.fecha, ans.item_id, ans.valor_bool))
+    record_answers(rows, session)
+
+
+def rebuild_stats(template_id: int | None = None) -> int:
+    """Recalcula las estadísticas desde ``checklist_answers`` con un INSERT ... SELECT."""
+
+    equipo = func.coalesce(ChecklistRun.equipo_id, 0)
+    source = (
+        select(
+            ChecklistRun.template_id,
+            ChecklistAnswer.item_id,
+            equipo,
+            ChecklistRun.fecha,
+            func.count(ChecklistAnswer.id),
+            func.coalesce(func.sum(case((ChecklistAnswer.valor_bool.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((ChecklistAnswer.valor_bool.is_(False), 1), else_=0)), 0),
+        )
+        .join(ChecklistRun, ChecklistRun.id == ChecklistAnswer.run_id)
+        .group_by(ChecklistRun.template_id, ChecklistAnswer.item_id, equipo, ChecklistRun.fecha)
+    )
+    purge = delete(ChecklistItemStat)
+    if template_id is not None:
+        source = source.where(ChecklistRun.template_id == template_id)
+        purge = purge.where(ChecklistItemStat.template_id == template_id)
+
+    db.session.execute(purge)
+    result = db.session.execute(
+        insert(ChecklistItemStat).from_select(
+            ["template_id", "item_id", "equipo_id", "fecha", "answered", "ok", "fail"],
+            source,
+        )
+    )
+    db.session.commit()
+    return result.rowcount or 0
+
+
+def item_stats(
+    template_id: int,
+    items: Iterable,
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    equipo_id: int | None = None,
+) -> list[dict[str, Any]]:
+    """Totales por ítem de la plantilla, ordenados por tasa de falla."""
+
+    query = db.session.query(
+        ChecklistItemStat.item_id,
+        func.sum(ChecklistItemStat.answered),
+        func.sum(ChecklistItemStat.ok),
+        func.sum(ChecklistItemStat.fail),
+    ).filter(ChecklistItemStat.template_id == template_id)
+    query = apply_filters(query, ChecklistItemStat, desde=desde, hasta=hasta, equipo_id=equipo_id)
+    totals = {row[0]: row[1:] for row in query.group_by(ChecklistItemStat.item_id)}
+
+    stats = []
+    for it in items:
+        answered, ok, fail = (int(v or 0) for v in totals.get(it.id, (0, 0, 0)))
+        evaluated = ok + fail
+        stats.append(
+            {
+                "item_id": it.id,
+                "texto": it.texto,
+                "tipo": it.tipo,
+                "answered": answered,
+                "ok": ok,
+                "fail": fail,
+                "fail_rate": round(fail / evaluated * 100.0, 1) if evaluated else 0.0,
+            }
+        )
+    stats.sort(key=lambda s: (-s["fail_rate"], -s["fail"], s["item_id"]))
+    return stats
@@ -0,0 +1,446 @@
+"""Importación masiva de equipos, operadores y partes desde CSV.
+
+El archivo se lee en streaming y se procesa por lotes de ``batch_size``
+filas: cada fila se valida y convierte en Python, las inválidas se reportan
+con su número de línea y el resto del lote se escribe de una vez.
+
+- Equipos y operadores se actualizan o insertan por su clave natural
+  (``codigo`` y ``doc_id``). Una celda vacía toma el ``default`` del modelo
+  al insertar y conserva el valor guardado al actualizar; si la clave se
+  repite en el archivo, las celdas no vacías de la última fila prevalecen.
+  ``operadores.doc_id`` no es único: si ya hay varios operadores con el mismo
+  documento la fila se reporta como error en lugar de elegir uno.
+- Los partes sólo se insertan; ``equipo`` y ``operador`` se indican con el
+  código del equipo y el documento del operador. Los contadores de uso de
+  cada equipo se ajustan en la misma transacción del lote.
+
+En PostgreSQL cada lote se copia con ``COPY`` a una tabla temporal y se
+aplica con un ``UPDATE ... FROM`` y un ``INSERT ... SELECT``; en otros
+motores se usa ``executemany``. Cada lote se confirma por separado, así un
+error de base de datos sólo revierte el lote en curso.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import time
+from datetime import date, datetime
+from typing import IO, Any, Callable, Iterable, Iterator, NamedTuple
+
+from sqlalchemy import Date, Table, bindparam, func, insert, select, update
+
+from app.extensions import db
+from app.models.equipo import Equipo
+from app.models.operador import Operador
+from app.models.parte_diaria import ParteDiaria
+from app.services.catalogs import CATALOGS, invalidate_catalogs
+from app.services.equipo_usage import record_partes
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+# Parámetros por ``IN (...)``: por debajo del límite de SQLite.
+_LOOKUP_CHUNK = 900
+
+
+class CsvImportError(ValueError):
+    """Archivo o entidad inválidos (no se importa nada)."""
+
+
+class Field(NamedTuple):
+    name: str
+    parse: Callable[[str], Any]
+    required: bool = False
+
+
+def _text(max_len: int | None = None) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        if max_len and len(value) > max_len:
+            raise ValueError(f"máximo {max_len} caracteres")
+        return value
+
+    return parse
+
+
+def _float(value: str) -> float:
+    try:
+        number = float(value.replace(",", "."))
+    except ValueError:
+        raise ValueError(f"número inválido: {value!r}") from None
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"debe ser un número >= 0: {value!r}")
+    return number
+
+
+def _date(value: str) -> date:
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"fecha inválida: {value!r} (use AAAA-MM-DD o DD/MM/AAAA)")
+
+
+class Spec(NamedTuple):
+    model: Any
+    fields: tuple[Field, ...]
+    key: str | None  # clave natural para actualizar; ``None`` = sólo insertar
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+
+SPECS = {
+    "equipos": Spec(
+        Equipo,
+        (
+            Field("codigo", _text(64), True),
+            Field("tipo", _text(64), True),
+            Field("marca", _text(64)),
+            Field("modelo", _text(64)),
+            Field("serie", _text(128)),
+            Field("placas", _text(32)),
+            Field("status", _text(32)),
+            Field("ubicacion", _text(128)),
+            Field("horas_uso", _float),
+            Field("fecha_alta", _date),
+        ),
+        "codigo",
+    ),
+    "operadores": Spec(
+        Operador,
+        (
+            Field("doc_id", _text(80), True),
+            Field("nombre", _text(160), True),
+            Field("licencia_vence", _date),
+            Field("notas", _text()),
+            Field("estatus", _text(32)),
+        ),
+        "doc_id",
+    ),
+    "partes": Spec(
+        ParteDiaria,
+        (
+            Field("fecha", _date, True),
+            Field("equipo", _text(64)),
+            Field("operador", _text(80)),
+            Field("horas_trabajo", _float),
+            Field("actividad", _text()),
+            Field("incidencias", _text()),
+            Field("notas", _text()),
+        ),
+        None,
+    ),
+}
+ENTITIES = tuple(SPECS)
+
+
+def _reader(stream: IO[str]) -> csv.DictReader:
+    header = stream.readline()
+    if not header.strip():
+        raise CsvImportError("El archivo está vacío")
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    names = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))]
+    return csv.DictReader(stream, fieldnames=names, delimiter=delimiter)
+
+
+def _batches(reader: csv.DictReader, size: int) -> Iterator[list[tuple[int, dict[str, str]]]]:
+    batch: list[tuple[int, dict[str, str]]] = []
+    for row in reader:
+        # ``line_num`` cuenta líneas físicas (los saltos dentro de comillas incluidos).
+        batch.append((reader.line_num + 1, row))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _index(rows: Iterable[tuple[str | None, int]]) -> dict[str, int | None]:
+    # Una clave repetida queda en ``None``: ambigua, no se elige ninguna.
+    index: dict[str, int | None] = {}
+    for key, id_ in rows:
+        if key:
+            index[key] = None if key in index else id_
+    return index
+
+
+class _Resolver:
+    """``codigo``/``doc_id`` → id para las referencias de los partes (cargado una vez)."""
+
+    def __init__(self) -> None:
+        self.equipos = _index(db.session.execute(select(Equipo.codigo, Equipo.id)))
+        self.operadores = _index(db.session.execute(select(Operador.doc_id, Operador.id)))
+
+    def apply(self, values: dict[str, Any]) -> None:
+        for field, column, known in (
+            ("equipo", "equipo_id", self.equipos),
+            ("operador", "operador_id", self.operadores),
+        ):
+            if field not in values:
+                continue
+            ref = values.pop(field)
+            if ref and ref not in known:
+                raise ValueError(f"{field} desconocido: {ref!r}")
+            if ref and known[ref] is None:
+                raise ValueError(f"{field} ambiguo: {ref!r} corresponde a varios registros")
+            values[column] = known[ref] if ref else None
+
+
+def _clean(spec: Spec, columns: list[Field], raw: dict[str, str]) -> dict[str, Any]:
+    values: dict[str, Any] = {}
+    for field in columns:
+        value = (raw.get(field.name) or "").strip()
+        if not value:
+            if field.required:
+                raise ValueError(f"{field.name} es obligatorio")
+            # Celda vacía: ``None``; los escritores deciden default o valor guardado.
+            values[field.name] = None
+            continue
+        try:
+            values[field.name] = field.parse(value)
+        except ValueError as exc:
+            raise ValueError(f"{field.name}: {exc}") from None
+    return values
+
+
+def _insert_defaults(table: Table, present: Iterable[str]) -> dict[str, Any]:
+    """Valores de ``default`` del modelo para las columnas que no trae el CSV."""
+
+    present = set(present)
+    defaults = {}
+    for column in table.columns:
+        if column.primary_key or column.name in present or column.default is None:
+            continue
+        arg = column.default.arg
+        value = arg(None) if callable(arg) else arg
+        if isinstance(value, datetime) and isinstance(column.type, Date):
+            value = value.date()
+        defaults[column.name] = value
+    return defaults
+
+
+def _with_defaults(row: dict[str, Any], defaults: dict[str, Any]) -> dict[str, Any]:
+    return {name: defaults.get(name) if value is None else value for name, value in row.items()}
+
+
+def _onupdate_values(table: Table) -> dict[str, Any]:
+    values = {}
+    for column in table.columns:
+        if column.onupdate is not None:
+            arg = column.onupdate.arg
+            values[column.name] = arg(None) if callable(arg) else arg
+    return values
+
+
+def _ambiguous_keys(spec: Spec, keys: list[str]) -> set[str]:
+    """Claves de ``keys`` que ya tienen más de una fila en la base."""
+
+    key_column = spec.table.c[spec.key]
+    found: set[str] = set()
+    for start in range(0, len(keys), _LOOKUP_CHUNK):
+        chunk = keys[start : start + _LOOKUP_CHUNK]
+        rows = db.session.execute(
+            select(key_column)
+            .where(key_column.in_(chunk))
+            .group_by(key_column)
+            .having(func.count() > 1)
+        )
+        found.update(rows.scalars())
+    return found
+
+
+def _existing_ids(spec: Spec, keys: list[str]) -> dict[str, int]:
+    key_column = spec.table.c[spec.key]
+    found: dict[str, int] = {}
+    for start in range(0, len(keys), _LOOKUP_CHUNK):
+        chunk = keys[start : start + _LOOKUP_CHUNK]
+        rows = db.session.execute(
+            select(key_column, spec.table.c.id).where(key_column.in_(chunk))
+        )
+        found.update(dict(rows.all()))
+    return found
+
+
+def _write_executemany(
+    spec: Spec, rows: list[dict[str, Any]], defaults: dict[str, Any]
+) -> tuple[int, int]:
+    table = spec.table
+    connection = db.session.connection()
+    to_update: list[dict[str, Any]] = []
+    to_insert = rows
+    if spec.key:
+        existing = _existing_ids(spec, [row[spec.key] for row in rows])
+        to_insert = []
+        for row in rows:
+            if row[spec.key] in existing:
+                to_update.append(
+                    {"_id": existing[row[spec.key]], **{f"_v_{k}": v for k, v in row.items()}}
+                )
+            else:
+                to_insert.append(row)
+    if to_update:
+        columns = [name for name in rows[0] if name != spec.key]
+        # ``NULL`` (celda vacía) conserva el valor guardado.
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(
+                {name: func.coalesce(bindparam(f"_v_{name}"), table.c[name]) for name in columns}
+            )
+        )
+        connection.execute(stmt, to_update)
+    if to_insert:
+        connection.execute(insert(table), [_with_defaults(row, defaults) for row in to_insert])
+    return len(to_insert), len(to_update)
+
+
+def _write_copy(
+    spec: Spec, rows: list[dict[str, Any]], defaults: dict[str, Any]
+) -> tuple[int, int]:
+    table = spec.table
+    columns = list(rows[0])
+    extras = _insert_defaults(table, columns)
+    connection = db.session.connection()
+    cursor = connection.connection.driver_connection.cursor()
+    staging = f"_import_{table.name}"
+    column_list = ", ".join(columns)
+    # Sólo las columnas del CSV y sin restricciones: se validan al aplicar.
+    cursor.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {table.name} WITH NO DATA"
+    )
+    with cursor.copy(f"COPY {staging} ({column_list}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row([row[name] for name in columns])
+
+    updated = 0
+    if spec.key:
+        assignments = [
+            f"{name} = COALESCE(s.{name}, t.{name})" for name in columns if name != spec.key
+        ]
+        onupdate = _onupdate_values(table)
+        assignments += [f"{name} = %({name})s" for name in onupdate if name not in columns]
+        cursor.execute(
+            f"UPDATE {table.name} AS t SET {', '.join(assignments)} "
+            f"FROM {staging} AS s WHERE t.{spec.key} = s.{spec.key}",
+            onupdate,
+        )
+        updated = cursor.rowcount
+    extra_names = "".join(f", {name}" for name in extras)
+    extra_values = "".join(f", %({name})s" for name in extras)
+    selected = []
+    for name in columns:
+        if name in defaults:
+            extras[f"_d_{name}"] = defaults[name]
+            selected.append(f"COALESCE(s.{name}, %(_d_{name})s)")
+        else:
+            selected.append(f"s.{name}")
+    missing = (
+        f" WHERE NOT EXISTS (SELECT 1 FROM {table.name} AS t WHERE t.{spec.key} = s.{spec.key})"
+        if spec.key
+        else ""
+    )
+    cursor.execute(
+        f"INSERT INTO {table.name} ({column_list}{extra_names}) "
+        f"SELECT {', '.join(selected)}{extra_values} FROM {staging} AS s{missing}",
+        extras,
+    )
+    return cursor.rowcount, updated
+
+
+def _report_error(report: dict[str, Any], line: int, message: str) -> None:
+    report["errors"] += 1
+    if len(report["error_rows"]) < MAX_REPORTED_ERRORS:
+        report["error_rows"].append({"line": line, "error": message})
+
+
+def import_csv(
+    entity: str,
+    stream: IO[str],
+    *,
+    batch_size: int = BATCH_SIZE,
+    dry_run: bool = False,
+    use_copy: bool | None = None,
+) -> dict[str, Any]:
+    """Importa ``stream`` (texto CSV con encabezado) como ``entity``.
+
+    Returns:
+        ``rows`` leídas, ``inserted``, ``updated``, ``errors`` (cantidad),
+        ``error_rows`` (las primeras ``MAX_REPORTED_ERRORS`` como
+        ``{"line", "error"}``), ``method`` y ``seconds``.
+    """
+
+    if entity not in SPECS:
+        raise CsvImportError(f"Entidad desconocida: {entity} (use {', '.join(ENTITIES)})")
+    spec = SPECS[entity]
+    reader = _reader(stream)
+    header = set(reader.fieldnames or ())
+    missing = [f.name for f in spec.fields if f.required and f.name not in header]
+    if missing:
+        raise CsvImportError(f"Faltan columnas obligatorias: {', '.join(missing)}")
+    columns = [f for f in spec.fields if f.name in header]
+    defaults = _insert_defaults(spec.table, ())
+
+    if use_copy is None:
+        use_copy = db.session.get_bind().dialect.name == "postgresql"
+    writer = _write_copy if use_copy else _write_executemany
+    resolver = _Resolver() if entity == "partes" else None
+    report: dict[str, Any] = {
+        "entity": entity,
+        "rows": 0,
+        "inserted": 0,
+        "updated": 0,
+        "errors": 0,
+        "error_rows": [],
+        "method": "copy" if use_copy else "executemany",
+        "dry_run": dry_run,
+    }
+    started = time.perf_counter()
+
+    for batch in _batches(reader, max(batch_size, 1)):
+        clean: dict[Any, dict[str, Any]] = {}
+        lines: dict[Any, int] = {}
+        for line, raw in batch:
+            report["rows"] += 1
+            try:
+                values = _clean(spec, columns, raw)
+                if resolver is not None:
+                    resolver.apply(values)
+            except ValueError as exc:
+                _report_error(report, line, str(exc))
+                continue
+            key = values[spec.key] if spec.key else line
+            if key in clean:
+                values = {**clean[key], **{k: v for k, v in values.items() if v is not None}}
+            clean[key] = values
+            lines[key] = line
+        if spec.key and clean:
+            for key in _ambiguous_keys(spec, list(clean)):
+                del clean[key]
+                _report_error(
+                    report, lines[key], f"{spec.key} {key!r} corresponde a varios registros existentes"
+                )
+        if not clean or dry_run:
+            continue
+        try:
+            inserted, updated = writer(spec, list(clean.values()), defaults)
+            if entity == "partes":
+                record_partes(
+                    (r.get("equipo_id"), r.get("fecha"), r.get("horas_trabajo"), r.get("incidencias"))
+                    for r in clean.values()
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        report["inserted"] += inserted
+        report["updated"] += updated
+
+    if entity in CATALOGS and (report["inserted"] or report["updated"]):
+        # Las escrituras por lotes no pasan por los eventos del ORM.
+        invalidate_catalogs(entity)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
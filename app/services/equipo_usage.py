@@ -0,0 +1,285 @@
+"""Contadores de uso por equipo mantenidos desde ``partes_diarias``.
+
+``equipos`` guarda horas trabajadas, cantidad de partes, partes con
+incidencias y fecha del último parte, así los listados no agregan
+``partes_diarias`` en cada petición. Los contadores se ajustan con deltas
+(``col = col + :delta``) en la misma transacción que el parte:
+
+- altas, ediciones y bajas vía ORM: evento ``after_flush``;
+- INSERT masivos (sincronización, importación CSV): ``record_partes``.
+
+Sólo ``ultimo_parte`` puede retroceder (baja o cambio de fecha del parte más
+reciente); en ese caso se recalcula con ``max(fecha)`` de ese equipo.
+``reconcile_usage`` (``flask equipos-usage-reconcile``) compara contra
+``partes_diarias`` y corrige cualquier desvío.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Iterable
+
+from sqlalchemy import bindparam, case, event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.equipo import Equipo
+from app.models.parte_diaria import ParteDiaria
+
+# (equipo_id, fecha, horas_trabajo, incidencias)
+ParteRow = tuple[int | None, date | None, float | None, str | None]
+
+_TRACKED = ("equipo_id", "fecha", "horas_trabajo", "incidencias")
+_HORAS_EPSILON = 1e-6
+
+
+def _con_incidencia(texto: str | None) -> bool:
+    return bool((texto or "").strip())
+
+
+class _Totals:
+    """Deltas acumulados por equipo dentro de un flush o lote."""
+
+    def __init__(self) -> None:
+        self.deltas: dict[int, dict[str, Any]] = {}
+
+    def _entry(self, equipo_id: int) -> dict[str, Any]:
+        entry = self.deltas.get(equipo_id)
+        if entry is None:
+            entry = self.deltas[equipo_id] = {
+                "_id": equipo_id,
+                "_horas": 0.0,
+                "_partes": 0,
+                "_incidencias": 0,
+                "added": None,
+                "removed": None,
+            }
+        return entry
+
+    def add(self, row: ParteRow, sign: int = 1) -> None:
+        equipo_id, fecha, horas, incidencias = row
+        if not equipo_id:
+            return
+        entry = self._entry(equipo_id)
+        entry["_horas"] += sign * float(horas or 0)
+        entry["_partes"] += sign
+        entry["_incidencias"] += sign * int(_con_incidencia(incidencias))
+        if fecha is None:
+            return
+        key = "added" if sign > 0 else "removed"
+        if entry[key] is None or fecha > entry[key]:
+            entry[key] = fecha
+
+
+def _apply(connection, totals: _Totals) -> None:
+    table = Equipo.__table__
+    changed = [
+        e for e in totals.deltas.values() if e["_horas"] or e["_partes"] or e["_incidencias"]
+    ]
+    if changed:
+        connection.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(
+                horas_trabajadas=func.coalesce(table.c.horas_trabajadas, 0) + bindparam("_horas"),
+                partes_count=func.coalesce(table.c.partes_count, 0) + bindparam("_partes"),
+                incidencias_count=func.coalesce(table.c.incidencias_count, 0)
+                + bindparam("_incidencias"),
+            ),
+            [{k: e[k] for k in ("_id", "_horas", "_partes", "_incidencias")} for e in changed],
+        )
+
+    fecha = bindparam("_fecha", type_=db.Date)
+    added = [{"_id": e["_id"], "_fecha": e["added"]} for e in totals.deltas.values() if e["added"]]
+    if added:
+        connection.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("_id"),
+                or_(table.c.ultimo_parte.is_(None), table.c.ultimo_parte < fecha),
+            )
+            .values(ultimo_parte=fecha),
+            added,
+        )
+
+    # Si se quitó el parte más reciente, la fecha sale de los partes que quedan.
+    removed = [
+        {"_id": e["_id"], "_fecha": e["removed"]} for e in totals.deltas.values() if e["removed"]
+    ]
+    if removed:
+        latest = (
+            select(func.max(ParteDiaria.fecha))
+            .where(ParteDiaria.equipo_id == table.c.id)
+            .scalar_subquery()
+        )
+        connection.execute(
+            update(table)
+            .where(table.c.id == bindparam("_id"), table.c.ultimo_parte <= fecha)
+            .values(ultimo_parte=latest),
+            removed,
+        )
+
+
+def record_partes(rows: Iterable[ParteRow], session: Session | None = None, *, sign: int = 1) -> int:
+    """Suma (``sign=1``) o resta (``sign=-1``) los partes ``rows`` a sus equipos.
+
+    Para escrituras que no pasan por el ORM; devuelve cuántos equipos se tocaron.
+    """
+
+    totals = _Totals()
+    for row in rows:
+        totals.add(row, sign)
+    if not totals.deltas:
+        return 0
+    session = session or db.session
+    _apply(session.connection(), totals)
+    return len(totals.deltas)
+
+
+def _old_row(parte: ParteDiaria, previous: dict[int, ParteRow]) -> ParteRow:
+    """Valores de ``parte`` antes de este flush."""
+
+    state = inspect(parte)
+    if state.has_identity and state.identity[0] in previous:
+        return previous[state.identity[0]]
+    values = []
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        values.append(history.deleted[0] if history.deleted else getattr(parte, name))
+    return tuple(values)  # type: ignore[return-value]
+
+
+def _new_row(parte: ParteDiaria) -> ParteRow:
+    return tuple(getattr(parte, name) for name in _TRACKED)  # type: ignore[return-value]
+
+
+def _missing_history(parte: ParteDiaria) -> bool:
+    # Asignado sobre un atributo expirado: el ORM no conoce el valor anterior.
+    state = inspect(parte)
+    return any(
+        state.attrs[name].history.added and not state.attrs[name].history.deleted
+        for name in _TRACKED
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _load_previous_partes(session, flush_context, instances):
+    # Tras el flush ya no se pueden leer de la base los valores anteriores.
+    previous = session.info["equipo_usage_previous"] = {}
+    for obj in session.deleted:
+        if isinstance(obj, ParteDiaria):
+            for name in _TRACKED:
+                getattr(obj, name)
+    stale = [
+        inspect(obj).identity[0]
+        for obj in session.dirty
+        if isinstance(obj, ParteDiaria) and inspect(obj).has_identity and _missing_history(obj)
+    ]
+    if stale:
+        table = ParteDiaria.__table__
+        rows = session.connection().execute(
+            select(table.c.id, *(table.c[name] for name in _TRACKED)).where(table.c.id.in_(stale))
+        )
+        for id_, *values in rows:
+            previous[id_] = tuple(values)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_orm_partes(session, flush_context):
+    # En ``after_flush`` new/dirty/deleted y el historial aún reflejan el flush.
+    previous = session.info.pop("equipo_usage_previous", {})
+    totals = _Totals()
+    for obj in session.new:
+        if isinstance(obj, ParteDiaria):
+            totals.add(_new_row(obj))
+    for obj in session.deleted:
+        if isinstance(obj, ParteDiaria):
+            totals.add(_old_row(obj, previous), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, ParteDiaria) or not session.is_modified(obj):
+            continue
+        old, new = _old_row(obj, previous), _new_row(obj)
+        if old != new:
+            totals.add(old, -1)
+            totals.add(new)
+    if totals.deltas:
+        _apply(session.connection(), totals)
+
+
+def _aggregates(equipo_ids: Iterable[int] | None = None):
+    partes = ParteDiaria.__table__
+    query = select(
+        partes.c.equipo_id,
+        func.coalesce(func.sum(partes.c.horas_trabajo), 0).label("horas"),
+        func.count().label("partes"),
+        func.coalesce(
+            func.sum(case((func.trim(func.coalesce(partes.c.incidencias, "")) != "", 1), else_=0)),
+            0,
+        ).label("incidencias"),
+        func.max(partes.c.fecha).label("ultimo"),
+    ).where(partes.c.equipo_id.is_not(None))
+    if equipo_ids is not None:
+        query = query.where(partes.c.equipo_id.in_(list(equipo_ids)))
+    return query.group_by(partes.c.equipo_id)
+
+
+def _values(row) -> dict[str, Any]:
+    return {
+        "_id": row.equipo_id,
+        "_horas": float(row.horas or 0),
+        "_partes": int(row.partes or 0),
+        "_incidencias": int(row.incidencias or 0),
+        "_ultimo": row.ultimo,
+    }
+
+
+def _write(connection, values: list[dict[str, Any]]) -> None:
+    table = Equipo.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(
+            horas_trabajadas=bindparam("_horas"),
+            partes_count=bindparam("_partes"),
+            incidencias_count=bindparam("_incidencias"),
+            ultimo_parte=bindparam("_ultimo", type_=db.Date),
+        ),
+        values,
+    )
+
+
+def reconcile_usage(*, dry_run: bool = False) -> dict[str, int]:
+    """Compara los contadores con ``partes_diarias`` y corrige los que difieren.
+
+    Returns:
+        ``{"equipos": revisados, "corregidos": con desvío}``.
+    """
+
+    actual = {row.equipo_id: _values(row) for row in db.session.execute(_aggregates())}
+    stored = db.session.execute(
+        select(
+            Equipo.id,
+            Equipo.horas_trabajadas,
+            Equipo.partes_count,
+            Equipo.incidencias_count,
+            Equipo.ultimo_parte,
+        )
+    ).all()
+    drifted = []
+    for id_, horas, partes, incidencias, ultimo in stored:
+        expected = actual.get(
+            id_, {"_id": id_, "_horas": 0.0, "_partes": 0, "_incidencias": 0, "_ultimo": None}
+        )
+        if (
+            abs(float(horas or 0) - expected["_horas"]) > _HORAS_EPSILON
+            or (partes or 0) != expected["_partes"]
+            or (incidencias or 0) != expected["_incidencias"]
+            or ultimo != expected["_ultimo"]
+        ):
+            drifted.append(expected)
+    if drifted and not dry_run:
+        _write(db.session.connection(), drifted)
+        db.session.commit()
+    else:
+        db.session.rollback()
+    return {"equipos": len(stored), "corregidos": len(drifted)}
@@ -0,0 +1,199 @@
+"""Explorador de ``DATA_DIR`` por directorio, paginado y con caché.
+
+Cada página lista un solo directorio con ``os.scandir``: el tipo de cada
+entrada sale del propio *dirent* (sin ``stat``), de modo que ordenar y
+paginar sólo cuesta leer los nombres, y únicamente se hace ``stat`` de las
+entradas de la página visible. El listado ordenado se guarda en memoria por
+directorio y se invalida cuando cambia el ``mtime`` del directorio (crear,
+renombrar o borrar entradas lo actualiza).
+
+El tamaño acumulado de cada subdirectorio es opcional: lo calcula el worker
+(tarea ``data_dir.index``) y se guarda en ``instance/data_dir_index.json``;
+mientras no exista, las carpetas registradas toman el suyo de
+``storage_usage``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import posixpath
+from datetime import datetime, timezone
+from typing import Any
+
+from flask import current_app
+
+from app.services.jobs import enqueue, handler
+from app.services.storage_usage import folder_usage_by_path
+from app.utils.cache import LRUCache
+
+_listings = LRUCache(maxsize=64)
+_index_cache = LRUCache(maxsize=1)
+
+
+class BrowserError(ValueError):
+    """Ruta inexistente o fuera de ``DATA_DIR``."""
+
+
+def data_root() -> str:
+    return os.path.realpath(current_app.config["DATA_DIR"])
+
+
+def resolve(rel: str | None) -> tuple[str, str]:
+    """Devuelve ``(ruta_absoluta, ruta_relativa_normalizada)`` dentro de la raíz."""
+
+    root = data_root()
+    rel = posixpath.normpath("/" + (rel or "").replace("\\", "/")).lstrip("/")
+    path = os.path.realpath(os.path.join(root, rel)) if rel else root
+    if path != root and not path.startswith(root + os.sep):
+        raise BrowserError("Ruta fuera de DATA_DIR")
+    if not os.path.isdir(path):
+        raise BrowserError("El directorio no existe")
+    return path, rel
+
+
+def _sorted_entries(path: str) -> tuple[tuple[str, bool], ...]:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _listings.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with os.scandir(path) as it:
+        entries = [(e.name, e.is_dir()) for e in it]
+    # Directorios primero, luego archivos; ambos por nombre.
+    entries.sort(key=lambda item: (not item[1], item[0].lower(), item[0]))
+    result = tuple(entries)
+    _listings.set(path, (mtime, result))
+    return result
+
+
+def list_directory(rel: str | None = None, *, page: int = 1, per_page: int = 100) -> dict[str, Any]:
+    """Una página del directorio ``rel`` (relativo a ``DATA_DIR``)."""
+
+    path, rel = resolve(rel)
+    entries = _sorted_entries(path)
+    total = len(entries)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), pages)
+    index = load_size_index()
+    dir_sizes = index.get("dirs", {}) if index else {}
+    visible = entries[(page - 1) * per_page : page * per_page]
+    # Carpetas registradas: su tamaño ya está en ``storage_usage``.
+    registered = folder_usage_by_path(
+        os.path.join(path, name) for name, is_dir in visible if is_dir
+    )
+
+    items = []
+    for name, is_dir in visible:
+        child = posixpath.join(rel, name) if rel else name
+        size = files = mtime = None
+        if is_dir:
+            size, files = dir_sizes.get(child) or registered.get(
+                os.path.join(path, name), (None, None)
+            )
+        else:
+            try:
+                st = os.stat(os.path.join(path, name))
+            except OSError:
+                continue
+            size, mtime = st.st_size, datetime.fromtimestamp(st.st_mtime)
+        items.append(
+            {"name": name, "path": child, "is_dir": is_dir, "size": size, "files": files, "mtime": mtime}
+        )
+
+    crumbs = []
+    if rel:
+        parts = rel.split("/")
+        crumbs = [{"name": part, "path": "/".join(parts[: i + 1])} for i, part in enumerate(parts)]
+    return {
+        "base": data_root(),
+        "path": rel,
+        "parent": posixpath.dirname(rel) if rel else None,
+        "crumbs": crumbs,
+        "items": items,
+        "total": total,
+        "page": page,
+        "pages": pages,
+        "dir_size": dir_sizes.get(rel) if index else None,
+        "indexed_at": index.get("generated_at") if index else None,
+    }
+
+
+def _index_path() -> str:
+    return os.path.join(current_app.instance_path, "data_dir_index.json")
+
+
+def build_size_index() -> dict[str, Any]:
+    """Recorre ``DATA_DIR`` y guarda ``{ruta_dir: [bytes, archivos]}`` acumulados."""
+
+    root = data_root()
+    own: dict[str, list[int]] = {}
+    order: list[str] = []
+    stack = [(root, "")]
+    while stack:
+        path, rel = stack.pop()
+        order.append(rel)
+        size = files = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, posixpath.join(rel, entry.name) if rel else entry.name))
+                    elif entry.is_file(follow_symlinks=False):
+                        size += entry.stat(follow_symlinks=False).st_size
+                        files += 1
+        except OSError:
+            pass
+        own[rel] = [size, files]
+
+    # ``order`` es preorden: al recorrerlo al revés cada hijo se suma antes que su padre.
+    for rel in reversed(order):
+        if rel:
+            parent = own[posixpath.dirname(rel)]
+            parent[0] += own[rel][0]
+            parent[1] += own[rel][1]
+
+    index = {
+        "base": root,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "dirs": own,
+    }
+    target = _index_path()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    partial = f"{target}.part"
+    with open(partial, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, separators=(",", ":"))
+    os.replace(partial, target)
+    _index_cache.clear()
+    return index
+
+
+def load_size_index() -> dict[str, Any] | None:
+    """Índice de tamaños guardado (``None`` si no existe o es de otra raíz)."""
+
+    target = _index_path()
+    try:
+        mtime = os.stat(target).st_mtime_ns
+    except OSError:
+        return None
+    cached = _index_cache.get(target)
+    if cached is not None and cached[0] == mtime:
+        index = cached[1]
+    else:
+        try:
+            with open(target, encoding="utf-8") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        _index_cache.set(target, (mtime, index))
+    return index if index.get("base") == data_root() else None
+
+
+def request_size_index() -> bool:
+    """Encola el recálculo del índice de tamaños (una sola tarea pendiente a la vez)."""
+
+    return enqueue("data_dir.index", unique=True)
+
+
+@handler("data_dir.index")
+def _build_size_index_job(payload):
+    build_size_index()
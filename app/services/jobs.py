@@ -0,0 +1,156 @@
+"""Cola de tareas en segundo plano respaldada por la tabla ``jobs``.
+
+Las peticiones web sólo encolan (``enqueue``) y ``worker.py`` ejecuta con
+``run_pending``. No hace falta un broker: la base de datos ya es compartida
+entre procesos. En PostgreSQL la reserva usa ``FOR UPDATE SKIP LOCKED`` para
+que varios workers no compitan por la misma fila; en SQLite basta el
+``UPDATE ... WHERE status = 'pending'`` condicional.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from flask import current_app
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.job import Job
+
+MAX_ATTEMPTS = 3
+
+_handlers: dict[str, Callable[[dict[str, Any]], None]] = {}
+
+
+def handler(kind: str):
+    """Registra la función que procesa las tareas de tipo ``kind``."""
+
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+
+    return decorator
+
+
+def enqueue(
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    session: Session | None = None,
+    *,
+    unique: bool = False,
+) -> bool:
+    """Encola una tarea en la transacción actual (se confirma con ella).
+
+    Usa un ``INSERT`` directo sobre la conexión, así también sirve desde
+    eventos ``after_flush``. Con ``unique=True`` no se encola si ya hay una
+    tarea pendiente o en curso del mismo tipo y con el mismo ``payload``.
+    """
+
+    session = session or db.session
+    conn = session.connection()
+    data = json.dumps(payload or {}, sort_keys=True)
+    if unique:
+        table = Job.__table__
+        existing = conn.execute(
+            select(table.c.id)
+            .where(
+                table.c.kind == kind,
+                table.c.payload == data,
+                table.c.status.in_(("pending", "running")),
+            )
+            .limit(1)
+        ).first()
+        if existing is not None:
+            return False
+    conn.execute(
+        insert(Job.__table__).values(
+            kind=kind,
+            payload=data,
+            status="pending",
+            attempts=0,
+            run_after=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+    )
+    return True
+
+
+def _claim() -> Job | None:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=int(current_app.config.get("JOB_LOCK_TIMEOUT") or 600))
+    ready = or_(
+        and_(Job.status == "pending", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_at < stale),
+    )
+    while True:
+        query = select(Job.id).where(ready).order_by(Job.run_after, Job.id).limit(1)
+        if db.session.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        job_id = db.session.execute(query).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, ready)
+            .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(Job, job_id)
+
+
+def run_job(job: Job) -> bool:
+    """Ejecuta ``job``; si falla se reintenta con espera creciente hasta ``MAX_ATTEMPTS``."""
+
+    func = _handlers.get(job.kind)
+    try:
+        if func is None:
+            raise LookupError(f"Tipo de tarea desconocido: {job.kind}")
+        func(json.loads(job.payload or "{}"))
+    except Exception as exc:  # noqa: BLE001 - el error queda registrado en la tarea
+        db.session.rollback()
+        current_app.logger.warning("Tarea %s (%s) falló: %s", job.id, job.kind, exc)
+        job.error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < MAX_ATTEMPTS and func is not None:
+            job.status = "pending"
+            job.run_after = datetime.utcnow() + timedelta(seconds=30 * 2 ** job.attempts)
+        else:
+            job.status = "failed"
+        job.locked_at = None
+        db.session.commit()
+        return False
+    job.status = "done"
+    job.locked_at = None
+    job.error = None
+    db.session.commit()
+    return True
+
+
+def run_pending(limit: int = 50) -> int:
+    """Procesa hasta ``limit`` tareas listas; devuelve cuántas se ejecutaron."""
+
+    processed = 0
+    while processed < limit:
+        job = _claim()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def purge_finished(max_age_seconds: int = 7 * 24 * 3600) -> int:
+    """Elimina tareas terminadas con más de ``max_age_seconds`` de antigüedad."""
+
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    deleted = (
+        db.session.query(Job)
+        .filter(Job.status == "done", Job.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    return deleted
@@ -0,0 +1,189 @@
+"""Búsqueda por subcadena y autocompletado de equipos y operadores.
+
+Los listados filtraban con ``ILIKE '%q%'`` encadenado en tres columnas, que
+no puede usar índices B-tree. Ahora cada tabla tiene un índice de trigramas
+sobre una sola expresión (las tres columnas concatenadas en minúsculas):
+
+- PostgreSQL: índice GIN ``gin_trgm_ops`` (extensión ``pg_trgm``), que sirve
+  tanto para ``LIKE '%q%'`` como para ordenar por ``word_similarity``.
+- SQLite: tabla FTS5 con ``tokenize='trigram'`` (``<tabla>_trgm``) mantenida
+  por *triggers*; ``LIKE '%q%'`` contra ella usa el índice. No tolera errores
+  de tipeo, así que el orden se calcula con ``difflib`` sobre los candidatos.
+
+Con menos de tres caracteres no hay trigramas y se recorre la tabla, pero
+siempre con ``LIMIT``.
+"""
+
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import Any, NamedTuple
+
+from sqlalchemy import event, func, literal_column, select, text
+
+from app.extensions import db
+from app.models.equipo import Equipo
+from app.models.operador import Operador
+
+AUTOCOMPLETE_LIMIT = 10
+# Candidatos que SQLite ordena en Python antes de recortar a ``limit``.
+_SQLITE_CANDIDATES = 200
+
+
+class Lookup(NamedTuple):
+    kind: str
+    model: Any
+    columns: tuple[str, ...]
+
+    @property
+    def table(self) -> str:
+        return self.model.__tablename__
+
+    def expression(self, prefix: str = "") -> str:
+        joined = " || ' ' || ".join(f"coalesce({prefix}{c}, '')" for c in self.columns)
+        return f"lower({joined})"
+
+
+LOOKUPS = {
+    "equipos": Lookup("equipos", Equipo, ("codigo", "tipo", "marca")),
+    "operadores": Lookup("operadores", Operador, ("nombre", "doc_id", "notas")),
+}
+
+
+def _sqlite_ddl(lookup: Lookup) -> list[str]:
+    fts = f"{lookup.table}_trgm"
+    insert_new = (
+        f"INSERT INTO {fts}(rowid, body) VALUES (new.id, {lookup.expression('new.')});"
+    )
+    delete_old = f"DELETE FROM {fts} WHERE rowid = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(body, tokenize = 'trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {lookup.table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {lookup.table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+        f"AFTER UPDATE OF {', '.join(lookup.columns)} ON {lookup.table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _postgres_ddl(lookup: Lookup) -> list[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{lookup.table}_trgm ON {lookup.table} "
+        f"USING gin (({lookup.expression()}) gin_trgm_ops)"
+    ]
+
+
+def install_lookup_indexes(connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        builder = _postgres_ddl
+    elif dialect == "sqlite":
+        builder = _sqlite_ddl
+    else:  # pragma: no cover - otros motores no se usan
+        return
+    for lookup in LOOKUPS.values():
+        for statement in builder(lookup):
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_lookup_indexes(target, connection, **kw):
+    install_lookup_indexes(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _drop_lookup_indexes(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for lookup in LOOKUPS.values():
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {lookup.table}_trgm")
+
+
+def rebuild_lookup_indexes() -> None:
+    connection = db.session.connection()
+    install_lookup_indexes(connection)
+    if connection.dialect.name == "sqlite":
+        for lookup in LOOKUPS.values():
+            fts = f"{lookup.table}_trgm"
+            connection.exec_driver_sql(f"DELETE FROM {fts}")
+            connection.exec_driver_sql(
+                f"INSERT INTO {fts}(rowid, body) SELECT id, {lookup.expression()} FROM {lookup.table}"
+            )
+    db.session.commit()
+
+
+def _pattern(q: str) -> str:
+    escaped = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _uses_fts(q: str) -> bool:
+    # FTS5 ignora el índice si el ``LIKE`` lleva ``ESCAPE``: sólo se usa con
+    # textos sin comodines.
+    return (
+        db.session.get_bind().dialect.name == "sqlite"
+        and len(q) >= 3
+        and not any(ch in q for ch in "%_\\")
+    )
+
+
+def matches(kind: str, q: str):
+    """Condición ``WHERE`` para filtrar ``LOOKUPS[kind].model`` por ``q``."""
+
+    lookup = LOOKUPS[kind]
+    q = q.strip()
+    if _uses_fts(q):
+        rowids = select(literal_column("rowid")).select_from(text(f"{lookup.table}_trgm")).where(
+            literal_column("body").like(f"%{q.lower()}%")
+        )
+        return lookup.model.id.in_(rowids)
+    return literal_column(lookup.expression()).like(_pattern(q), escape="\\")
+
+
+def _label(kind: str, row) -> str:
+    if kind == "equipos":
+        extra = " ".join(v for v in (row.tipo, row.marca) if v)
+        return f"{row.codigo} · {extra}" if extra else row.codigo
+    return f"{row.nombre} · {row.doc_id}" if row.doc_id else row.nombre
+
+
+def autocomplete(kind: str, q: str, limit: int = AUTOCOMPLETE_LIMIT) -> list[dict[str, Any]]:
+    """Mejores coincidencias de ``q`` ordenadas por similitud."""
+
+    lookup = LOOKUPS[kind]
+    q = (q or "").strip().lower()
+    if not q:
+        return []
+    model = lookup.model
+    columns = [model.id, *(getattr(model, c) for c in lookup.columns if c != "notas")]
+    expression = literal_column(lookup.expression())
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        score = func.word_similarity(q, expression)
+        # ``%>`` (similitud de palabra) también usa el índice GIN de trigramas.
+        rows = (
+            db.session.query(*columns, score.label("score"))
+            .filter(matches(kind, q) | expression.op("%>")(q))
+            .order_by(score.desc(), model.id)
+            .limit(limit)
+            .all()
+        )
+        return [
+            {"id": row.id, "label": _label(kind, row), "score": round(float(row.score), 4)}
+            for row in rows
+        ]
+
+    rows = db.session.query(*columns).filter(matches(kind, q)).limit(_SQLITE_CANDIDATES).all()
+    scored = []
+    for row in rows:
+        label = _label(kind, row)
+        lowered = label.lower()
+        score = SequenceMatcher(None, q, lowered).ratio()
+        if lowered.startswith(q):
+            score += 1.0
+        scored.append((score, row.id, label))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [
+        {"id": id_, "label": label, "score": round(score, 4)}
+        for score, id_, label in scored[:limit]
+    ]
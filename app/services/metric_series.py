@@ -0,0 +1,120 @@
+"""Series temporales de ``MetricDaily`` para las gráficas del panel admin.
+
+El filtro por proyecto, KPI y rango de fechas se resuelve en SQL (índice
+``ix_metrics_daily_project_kpi_date``) y las filas llegan ya ordenadas por
+fecha, así el pivote a arreglos alineados (una etiqueta por fecha y un
+arreglo por KPI, con ``None`` donde falta el dato) se hace en una pasada.
+Las historias largas se reducen a ``points`` puntos con LTTB o con el
+promedio por tramo (ver ``app.utils.downsample``).
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Sequence
+
+from app.extensions import db
+from app.models import MetricDaily
+from app.utils.downsample import bucket_ranges, lttb_indices
+
+MODES = ("lttb", "avg")
+
+
+def load_series(
+    project_id: int,
+    kpis: Sequence[str],
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+) -> tuple[list[date], dict[str, list[float | None]]]:
+    """Fechas y valores de ``kpis`` alineados por fecha."""
+
+    query = db.session.query(MetricDaily.date, MetricDaily.kpi_name, MetricDaily.value).filter(
+        MetricDaily.project_id == project_id, MetricDaily.kpi_name.in_(kpis)
+    )
+    if desde:
+        query = query.filter(MetricDaily.date >= desde)
+    if hasta:
+        query = query.filter(MetricDaily.date <= hasta)
+
+    labels: list[date] = []
+    series: dict[str, list[float | None]] = {kpi: [] for kpi in kpis}
+    for day, kpi, value in query.order_by(MetricDaily.date, MetricDaily.id):
+        if not labels or labels[-1] != day:
+            labels.append(day)
+            for values in series.values():
+                values.append(None)
+        # Si hay varias filas del mismo día gana la última registrada.
+        series[kpi][-1] = value
+    return labels, series
+
+
+def _average(values: list[float | None]) -> float | None:
+    present = [v for v in values if v is not None]
+    return sum(present) / len(present) if present else None
+
+
+def downsample(
+    labels: list[date],
+    series: dict[str, list[float | None]],
+    points: int,
+    *,
+    mode: str = "lttb",
+) -> tuple[list[date], dict[str, list[float | None]]]:
+    """Reduce las series alineadas a ``points`` puntos como máximo.
+
+    ``lttb`` elige los días según la forma del primer KPI y toma los demás
+    en esos mismos días; ``avg`` promedia cada tramo (la etiqueta es el
+    primer día del tramo).
+    """
+
+    if len(labels) <= points:
+        return labels, series
+
+    if mode == "lttb" and series:
+        primary = next(iter(series.values()))
+        present = [i for i, value in enumerate(primary) if value is not None]
+        if len(present) > points:
+            xs = [labels[i].toordinal() for i in present]
+            ys = [primary[i] for i in present]
+            chosen = [present[i] for i in lttb_indices(xs, ys, points)]
+            return (
+                [labels[i] for i in chosen],
+                {kpi: [values[i] for i in chosen] for kpi, values in series.items()},
+            )
+        if present:
+            return (
+                [labels[i] for i in present],
+                {kpi: [values[i] for i in present] for kpi, values in series.items()},
+            )
+
+    ranges = bucket_ranges(len(labels), points)
+    return (
+        [labels[start] for start, _ in ranges],
+        {
+            kpi: [_average(values[start:end]) for start, end in ranges]
+            for kpi, values in series.items()
+        },
+    )
+
+
+def kpi_series(
+    project_id: int,
+    kpis: Sequence[str],
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    points: int = 500,
+    mode: str = "lttb",
+) -> dict[str, Any]:
+    labels, series = load_series(project_id, kpis, desde=desde, hasta=hasta)
+    total = len(labels)
+    labels, series = downsample(labels, series, points, mode=mode)
+    return {
+        "project_id": project_id,
+        "labels": [day.isoformat() for day in labels],
+        "series": series,
+        "points": len(labels),
+        "total": total,
+        "mode": mode if total > points else None,
+    }
@@ -0,0 +1,106 @@
+"""Historial de partes y horas recientes para las fichas de equipo y operador.
+
+Un equipo puede acumular años de partes, así que la ficha nunca carga la
+colección completa (las relaciones ``partes`` son ``write_only``):
+
+- ``recent_partes`` pagina por *keyset* sobre ``(fecha, id)`` descendente; el
+  cursor es el último parte mostrado y cada página es un rango del índice
+  ``ix_partes_diarias_<dueño>_fecha``, sin ``OFFSET`` ni ``COUNT``.
+- ``window_totals`` suma horas y partes de los últimos 7/30/90 días en una
+  sola consulta acotada a ese rango del mismo índice.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, NamedTuple
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.parte_diaria import ParteDiaria
+
+HISTORY_PAGE_SIZE = 20
+WINDOWS = (7, 30, 90)
+
+# dueño → (columna de filtro, relación que se muestra en cada fila)
+OWNERS = {
+    "equipo": (ParteDiaria.equipo_id, ParteDiaria.operador),
+    "operador": (ParteDiaria.operador_id, ParteDiaria.equipo),
+}
+
+
+class Cursor(NamedTuple):
+    fecha: date
+    id: int
+
+    def __str__(self) -> str:
+        return f"{self.fecha.isoformat()}_{self.id}"
+
+
+def parse_cursor(raw: str | None) -> Cursor | None:
+    """``"AAAA-MM-DD_id"`` → ``Cursor``; ``None`` si falta o es inválido."""
+
+    try:
+        fecha, id_ = (raw or "").split("_", 1)
+        return Cursor(date.fromisoformat(fecha), int(id_))
+    except ValueError:
+        return None
+
+
+def recent_partes(
+    owner: str,
+    owner_id: int,
+    *,
+    before: Cursor | None = None,
+    limit: int = HISTORY_PAGE_SIZE,
+) -> tuple[list[ParteDiaria], Cursor | None]:
+    """Partes de ``owner`` más recientes que ``before``; y el cursor siguiente."""
+
+    column, related = OWNERS[owner]
+    query = (
+        db.session.query(ParteDiaria)
+        .options(joinedload(related))
+        .filter(column == owner_id)
+    )
+    if before is not None:
+        query = query.filter(
+            or_(
+                ParteDiaria.fecha < before.fecha,
+                and_(ParteDiaria.fecha == before.fecha, ParteDiaria.id < before.id),
+            )
+        )
+    rows = query.order_by(ParteDiaria.fecha.desc(), ParteDiaria.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], Cursor(last.fecha, last.id)
+
+
+def window_totals(owner: str, owner_id: int, *, today: date | None = None) -> list[dict[str, Any]]:
+    """``[{"dias", "horas", "partes"}]`` de cada ventana de ``WINDOWS`` hasta ``today``."""
+
+    column, _ = OWNERS[owner]
+    today = today or date.today()
+    starts = {dias: today - timedelta(days=dias - 1) for dias in WINDOWS}
+    columns = []
+    for dias in WINDOWS:
+        inside = ParteDiaria.fecha >= starts[dias]
+        columns += [
+            func.coalesce(func.sum(case((inside, ParteDiaria.horas_trabajo), else_=0)), 0),
+            func.coalesce(func.sum(case((inside, 1), else_=0)), 0),
+        ]
+    row = (
+        db.session.query(*columns)
+        .filter(
+            column == owner_id,
+            ParteDiaria.fecha >= starts[max(WINDOWS)],
+            ParteDiaria.fecha <= today,
+        )
+        .one()
+    )
+    return [
+        {"dias": dias, "horas": float(row[2 * i] or 0), "partes": int(row[2 * i + 1] or 0)}
+        for i, dias in enumerate(WINDOWS)
+    ]
@@ -0,0 +1,98 @@
+"""KPIs de proyectos y listado paginado para el inicio del panel admin.
+
+Los totales (proyectos, avance promedio, presupuesto y gasto) salen de una
+sola consulta agregada y el listado se pide por páginas, así el inicio del
+panel no crece con el número de proyectos. Ambos se guardan en memoria como
+tuplas durante ``KPI_TTL`` segundos; cualquier alta, edición o baja de un
+``Project`` en este proceso invalida la caché de inmediato.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from sqlalchemy import event, func
+
+from app.extensions import db
+from app.models import Project
+from app.utils.cache import LRUCache
+from app.utils.pagination import SimplePagination
+
+KPI_TTL = 60
+
+_kpis = LRUCache(maxsize=32, ttl=KPI_TTL)
+
+
+class ProjectKpis(NamedTuple):
+    total: int
+    avg_progress: float
+    budget: float
+    spent: float
+
+
+class ProjectRow(NamedTuple):
+    id: int
+    name: str
+    status: str | None
+    progress: float
+    budget: float
+    spent: float
+
+
+def project_kpis() -> ProjectKpis:
+    kpis = _kpis.get("totals")
+    if kpis is None:
+        total, avg_progress, budget, spent = db.session.query(
+            func.count(Project.id),
+            func.avg(func.coalesce(Project.progress, 0.0)),
+            func.coalesce(func.sum(Project.budget), 0.0),
+            func.coalesce(func.sum(Project.spent), 0.0),
+        ).one()
+        kpis = ProjectKpis(
+            total=int(total or 0),
+            avg_progress=round(float(avg_progress or 0.0), 1),
+            budget=float(budget),
+            spent=float(spent),
+        )
+        _kpis.set("totals", kpis)
+    return kpis
+
+
+def projects_page(page: int = 1, per_page: int = 25) -> tuple[tuple[ProjectRow, ...], SimplePagination]:
+    """Una página de proyectos por nombre; el total sale de ``project_kpis``."""
+
+    total = project_kpis().total
+    per_page = max(int(per_page or 1), 1)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(int(page or 1), 1), pages)
+    key = ("page", page, per_page)
+    rows = _kpis.get(key)
+    if rows is None:
+        query = (
+            db.session.query(
+                Project.id,
+                Project.name,
+                Project.status,
+                func.coalesce(Project.progress, 0.0),
+                func.coalesce(Project.budget, 0.0),
+                func.coalesce(Project.spent, 0.0),
+            )
+            .order_by(Project.name.asc(), Project.id.asc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        rows = tuple(ProjectRow(*row) for row in query)
+        _kpis.set(key, rows)
+    return rows, SimplePagination(page=page, per_page=per_page, total=total, pages=pages)
+
+
+def invalidate_project_kpis() -> None:
+    _kpis.clear()
+
+
+def _on_change(mapper, connection, target):
+    invalidate_project_kpis()
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Project, _event, _on_change)
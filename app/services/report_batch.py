@@ -0,0 +1,179 @@
+"""Generación por lotes de reportes PDF en un pool de procesos.
+
+ReportLab es CPU-bound y no libera el GIL, así que el renderizado de muchos
+registros se reparte en procesos. La base de datos sólo se consulta en el
+proceso principal (``iter_report_jobs``); los procesos hijos reciben
+diccionarios planos y devuelven bytes. Como mucho ``window`` reportes están en
+vuelo a la vez y cada uno se escribe al zip en cuanto llega, de modo que la
+memoria no crece con el tamaño del lote (por eso no se ofrece un PDF unido).
+
+Las peticiones web usan ``REPORTS_BATCH_WORKERS`` procesos (2 por defecto,
+porque cada petición crea su propio pool); la CLI usa todos los núcleos.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from flask import abort, current_app, send_file
+
+from app.services.reports import (
+    parte_report_data,
+    render_parte_pdf,
+    render_run_pdf,
+    run_report_data,
+)
+from app.utils.filters import apply_filters
+
+KINDS = ("parte", "checklist")
+FORMATS = ("zip",)
+
+_RENDERERS = {"parte": render_parte_pdf, "checklist": render_run_pdf}
+
+ReportJob = tuple[str, int, dict]
+
+
+def _render_job(job: ReportJob) -> tuple[str, bytes]:
+    kind, record_id, data = job
+    return f"{kind}_{record_id}.pdf", _RENDERERS[kind](data)
+
+
+def _base_query(kind: str, desde: date | None, hasta: date | None, equipo_id: int | None):
+    if kind == "parte":
+        from app.models.parte_diaria import ParteDiaria as model
+    else:
+        from app.models.checklist import ChecklistRun as model
+
+    query = apply_filters(model.query, model, desde=desde, hasta=hasta, equipo_id=equipo_id)
+    return model, query
+
+
+def count_reports(kind: str, *, desde=None, hasta=None, equipo_id=None) -> int:
+    _, query = _base_query(kind, desde, hasta, equipo_id)
+    return query.count()
+
+
+def iter_report_jobs(
+    kind: str,
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    equipo_id: int | None = None,
+    chunk_size: int = 100,
+) -> Iterator[ReportJob]:
+    """Datos de reporte de cada registro filtrado, cargados por bloques de ids."""
+
+    if kind not in KINDS:
+        raise ValueError(f"Tipo de reporte desconocido: {kind}")
+    model, query = _base_query(kind, desde, hasta, equipo_id)
+    build = parte_report_data if kind == "parte" else run_report_data
+
+    ids = [
+        row[0]
+        for row in query.with_entities(model.id).order_by(model.fecha.asc(), model.id.asc())
+    ]
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        records = {r.id: r for r in model.query.filter(model.id.in_(chunk)).all()}
+        for record_id in chunk:
+            record = records.get(record_id)
+            if record is not None:
+                yield kind, record_id, build(record)
+
+
+def _iter_rendered(
+    jobs: Iterable[ReportJob], workers: int, window: int
+) -> Iterator[tuple[str, bytes]]:
+    if workers <= 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: deque = deque()
+        for job in jobs:
+            pending.append(pool.submit(_render_job, job))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def render_batch(
+    jobs: Iterable[ReportJob],
+    out,
+    *,
+    fmt: str = "zip",
+    workers: int | None = None,
+    window: int | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, object]:
+    """Renderiza ``jobs`` en paralelo y los escribe en ``out`` (ruta o archivo).
+
+    ``out`` es un zip con un PDF por registro.
+
+    Returns:
+        ``{"count": n, "format": "zip"}``.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (use {', '.join(FORMATS)})")
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+
+    count = 0
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for name, content in _iter_rendered(jobs, workers, window):
+            bundle.writestr(name, content)
+            count += 1
+            if progress:
+                progress(1)
+
+    return {"count": count, "format": fmt}
+
+
+def send_report_batch(
+    kind: str,
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    equipo_id: int | None = None,
+    fmt: str = "zip",
+):
+    """Respuesta Flask con el lote de reportes filtrado, listo para descargar."""
+
+    if fmt not in FORMATS:
+        abort(400, description=f"Formato no soportado: {fmt} (use {', '.join(FORMATS)})")
+    limit = int(current_app.config.get("REPORTS_BATCH_MAX", 500))
+    total = count_reports(kind, desde=desde, hasta=hasta, equipo_id=equipo_id)
+    if total > limit:
+        abort(
+            400,
+            description=f"El lote tiene {total} reportes (máx {limit}); usa la CLI reports-batch.",
+        )
+
+    tmp_dir = Path(current_app.instance_path) / ".tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    handle = tempfile.TemporaryFile(dir=tmp_dir)
+    result = render_batch(
+        iter_report_jobs(kind, desde=desde, hasta=hasta, equipo_id=equipo_id),
+        handle,
+        fmt=fmt,
+        workers=current_app.config.get("REPORTS_BATCH_WORKERS", 2),
+    )
+    handle.seek(0)
+    return send_file(
+        handle,
+        as_attachment=True,
+        download_name=f"{kind}s_lote.{result['format']}",
+        mimetype="application/zip",
+    )
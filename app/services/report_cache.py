@@ -0,0 +1,101 @@
+"""Caché en disco de reportes PDF renderizados.
+
+Cada archivo se nombra ``<tipo>_<id>_<versión>.pdf`` donde la versión es un
+hash del contenido del reporte: al editar el registro cambia la versión, el
+siguiente acceso renderiza de nuevo y las versiones anteriores se descartan.
+El directorio se mantiene por debajo de ``PDF_CACHE_MAX_BYTES`` desalojando
+los archivos usados hace más tiempo (el ``mtime`` se actualiza en cada acierto).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+from flask import current_app
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def cache_dir() -> Path:
+    path = Path(current_app.instance_path) / "exports" / "pdf"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def content_version(data: dict[str, Any]) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+def _write_atomic(directory: Path, name: str, content: bytes) -> Path:
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(content)
+    target = directory / name
+    os.replace(tmp, target)
+    return target
+
+
+def _drop_stale_versions(directory: Path, prefix: str, keep: str) -> None:
+    for entry in os.scandir(directory):
+        if entry.name.startswith(prefix) and entry.name != keep:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+
+
+def evict(directory: Path, max_bytes: int, keep: Path | None = None) -> int:
+    """Elimina los PDF menos usados hasta quedar bajo ``max_bytes``."""
+
+    entries = []
+    total = 0
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not entry.name.endswith(".pdf"):
+            continue
+        stat = entry.stat()
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == str(keep):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached_pdf(
+    kind: str,
+    record_id: int,
+    data: dict[str, Any],
+    renderer: Callable[[dict[str, Any]], bytes],
+) -> Path:
+    """Ruta a un PDF vigente para ``data``, renderizándolo sólo si hace falta."""
+
+    directory = cache_dir()
+    prefix = f"{kind}_{record_id}_"
+    name = f"{prefix}{content_version(data)}.pdf"
+    path = directory / name
+
+    if path.exists():
+        os.utime(path)
+        return path
+
+    path = _write_atomic(directory, name, renderer(data))
+    _drop_stale_versions(directory, prefix, keep=name)
+    max_bytes = int(current_app.config.get("PDF_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES)
+    evict(directory, max_bytes, keep=path)
+    return path
@@ -0,0 +1,177 @@
+"""Reportes PDF de partes diarias y ejecuciones de checklist.
+
+Los reportes se generan en dos pasos: ``*_report_data`` convierte el registro
+ORM en un diccionario plano (serializable y apto para calcular una versión de
+contenido) y ``render_*_pdf`` dibuja ese diccionario con ReportLab. Los
+renderizadores no tocan la base de datos, así que pueden ejecutarse fuera del
+contexto de la app.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from io import BytesIO
+from typing import Any
+
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+
+from app.extensions import db
+
+
+def _pdf_header_footer(c, title):
+    w, h = LETTER
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2 * cm, h - 2 * cm, title)
+    c.setFont("Helvetica", 8)
+    c.drawRightString(
+        w - 2 * cm,
+        1.5 * cm,
+        datetime.utcnow().strftime("Generado %Y-%m-%d %H:%M UTC"),
+    )
+    c.line(2 * cm, h - 2.2 * cm, w - 2 * cm, h - 2.2 * cm)
+
+
+def _label(model, record_id, default):
+    if not record_id or model is None:
+        return default
+    try:
+        obj = db.session.get(model, record_id)
+    except Exception:
+        return default
+    if obj is not None and getattr(obj, "nombre", None):
+        return f"{obj.nombre} (#{obj.id})"
+    return default
+
+
+def parte_report_data(parte) -> dict[str, Any]:
+    """Datos planos del reporte de una parte diaria."""
+
+    from app.models.equipo import Equipo
+    from app.models.operador import Operador
+
+    return {
+        "id": parte.id,
+        "fecha": parte.fecha.isoformat() if parte.fecha else "",
+        "equipo": _label(Equipo, parte.equipo_id, f"Equipo #{parte.equipo_id}"),
+        "operador": _label(Operador, parte.operador_id, f"Operador #{parte.operador_id}"),
+        "horas_trabajo": float(parte.horas_trabajo or 0),
+        "actividad": parte.actividad or "",
+        "incidencias": parte.incidencias or "",
+        "notas": parte.notas or "",
+    }
+
+
+def render_parte_pdf(data: dict[str, Any]) -> bytes:
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=LETTER)
+    _pdf_header_footer(c, "Parte diaria")
+
+    x, y = 2 * cm, 25 * cm
+    c.setFont("Helvetica", 10)
+    rows = [
+        ("ID", data["id"]),
+        ("Fecha", data["fecha"]),
+        ("Equipo", data["equipo"]),
+        ("Operador", data["operador"]),
+        ("Horas de trabajo", f"{data['horas_trabajo']:.2f}"),
+        ("Actividad", data["actividad"]),
+        ("Incidencias", data["incidencias"]),
+        ("Notas", data["notas"]),
+    ]
+    for k, v in rows:
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(x, y, f"{k}:")
+        c.setFont("Helvetica", 10)
+        c.drawString(x + 4.2 * cm, y, str(v))
+        y -= 0.9 * cm
+        if y < 3 * cm:
+            c.showPage()
+            _pdf_header_footer(c, "Parte diaria")
+            y = 25 * cm
+
+    c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+def run_report_data(run) -> dict[str, Any]:
+    """Datos planos del reporte de una ejecución de checklist."""
+
+    from app.models.checklist import ChecklistAnswer
+    from app.services.checklist_cache import template_items
+
+    items = template_items(run.template)
+    answers = {
+        a.item_id: a for a in ChecklistAnswer.query.filter_by(run_id=run.id).all()
+    }
+    results = []
+    for it in items:
+        ans = answers.get(it.id)
+        results.append(
+            {
+                "texto": it.texto,
+                "tipo": it.tipo,
+                "valor_bool": bool(ans and ans.valor_bool),
+                "comentario": (ans.comentario or "") if ans else "",
+            }
+        )
+    return {
+        "id": run.id,
+        "fecha": run.fecha.isoformat() if run.fecha else "",
+        "plantilla": run.template.nombre,
+        "norma": run.template.norma or "-",
+        "equipo": run.equipo_id or "-",
+        "operador": run.operador_id or "-",
+        "pct_ok": float(run.pct_ok or 0),
+        "items": results,
+    }
+
+
+def render_run_pdf(data: dict[str, Any]) -> bytes:
+    title = f"Checklist — {data['plantilla']}"
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=LETTER)
+    _pdf_header_footer(c, title)
+
+    w, h = LETTER
+    x, y = 2 * cm, h - 3.2 * cm
+    c.setFont("Helvetica", 10)
+    header = [
+        ("Fecha", data["fecha"]),
+        ("Plantilla", data["plantilla"]),
+        ("Norma", data["norma"]),
+        ("Equipo", data["equipo"]),
+        ("Operador", data["operador"]),
+        ("% OK", f"{data['pct_ok']:.1f}%"),
+    ]
+    for k, v in header:
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(x, y, k + ":")
+        c.setFont("Helvetica", 10)
+        c.drawString(x + 4 * cm, y, str(v))
+        y -= 0.8 * cm
+
+    y -= 0.2 * cm
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(x, y, "Resultados")
+    y -= 0.7 * cm
+    c.setFont("Helvetica", 9)
+    for it in data["items"]:
+        if it["tipo"] == "bool":
+            txt = "✓" if it["valor_bool"] else "✗"
+            if it["comentario"]:
+                txt += f" — {it['comentario']}"
+        else:
+            txt = it["comentario"]
+        c.drawString(x, y, f"- {it['texto'][:80]}: {txt[:80]}")
+        y -= 0.55 * cm
+        if y < 2.5 * cm:
+            c.showPage()
+            _pdf_header_footer(c, title)
+            y = h - 3 * cm
+
+    c.showPage()
+    c.save()
+    return buf.getvalue()
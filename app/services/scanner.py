@@ -18,6 +18,7 @@ from app.metrics import (
 )
 from app.models.asset import Asset
 from app.models.folder import Folder
+from app.services.storage_usage import refresh_project_usage
 from app.utils.files import guess_mime, sha256_of_file, split_root_rel
 
 
@@ -69,6 +70,7 @@ def scan_folder_record(folder: Folder) -> Tuple[int, int, int]:
                     skipped += 1
 
     db.session.commit()
+    refresh_project_usage(folder.project_id)
 
     duration = perf_counter() - started_at
     scan_runs_total.inc()
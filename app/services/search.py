@@ -0,0 +1,313 @@
+"""Búsqueda de texto completo en bitácoras, partes y comentarios de checklist.
+
+Cada base usa su índice nativo en lugar de ``ILIKE`` sin índice:
+
+- PostgreSQL: índices GIN sobre ``to_tsvector('spanish', ...)`` de cada
+  tabla; la consulta usa exactamente la misma expresión para aprovecharlos y
+  ordena por ``ts_rank``.
+- SQLite: una tabla virtual FTS5 (``search_fts``) alimentada por *triggers*
+  de las tres tablas y ordenada por ``bm25``. El ``rowid`` codifica el origen
+  (``id * 4 + código``), así un borrado o edición toca una sola fila.
+
+Los índices se crean con ``create_all`` (evento de ``db.metadata``) y con la
+migración ``20251021_search_index``; ``flask search-reindex`` los regenera.
+Con otros motores se busca con ``LIKE`` sin índice (todos los términos deben
+aparecer) y los resultados salen por id descendente, sin relevancia.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, NamedTuple
+
+from sqlalchemy import event, text
+
+from app.extensions import db
+from app.models import Bitacora, Project
+from app.models.checklist import ChecklistAnswer, ChecklistItem, ChecklistRun
+from app.models.equipo import Equipo
+from app.models.parte_diaria import ParteDiaria
+
+SEARCH_CONFIG = "spanish"
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Source(NamedTuple):
+    kind: str
+    code: int
+    table: str
+    body: str  # expresión SQL; ``{p}`` es el prefijo de columna (``new.``/``old.``)
+
+
+SOURCES = (
+    Source("bitacora", 1, "bitacoras", "coalesce({p}text, '')"),
+    Source(
+        "parte",
+        2,
+        "partes_diarias",
+        "coalesce({p}actividad, '') || ' ' || coalesce({p}incidencias, '') || ' ' || coalesce({p}notas, '')",
+    ),
+    Source("checklist", 3, "checklist_answers", "coalesce({p}comentario, '')"),
+)
+KINDS = tuple(source.kind for source in SOURCES)
+_BY_CODE = {source.code: source for source in SOURCES}
+
+
+def _sqlite_ddl() -> list[str]:
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts "
+        "USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    for s in SOURCES:
+        new_body = s.body.format(p="new.")
+        insert_new = (
+            f"INSERT INTO search_fts(rowid, body) "
+            f"SELECT new.id * 4 + {s.code}, {new_body} WHERE trim({new_body}) <> '';"
+        )
+        delete_old = f"DELETE FROM search_fts WHERE rowid = old.id * 4 + {s.code};"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{s.table}_ai AFTER INSERT ON {s.table} "
+            f"BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{s.table}_ad AFTER DELETE ON {s.table} "
+            f"BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{s.table}_au AFTER UPDATE ON {s.table} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+    return statements
+
+
+def _postgres_ddl() -> list[str]:
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{s.table}_fts ON {s.table} "
+        f"USING gin (to_tsvector('{SEARCH_CONFIG}', {s.body.format(p='')}))"
+        for s in SOURCES
+    ]
+
+
+def install_search_index(connection) -> None:
+    """Crea (si faltan) los índices de búsqueda del dialecto de ``connection``."""
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        statements = _sqlite_ddl()
+    elif dialect == "postgresql":
+        statements = _postgres_ddl()
+    else:  # pragma: no cover - otros motores no se usan
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS search_fts")
+
+
+def rebuild_search_index() -> int:
+    """Regenera el índice; en SQLite devuelve cuántas filas quedaron indexadas."""
+
+    connection = db.session.connection()
+    install_search_index(connection)
+    if connection.dialect.name != "sqlite":
+        db.session.commit()
+        return 0
+    connection.exec_driver_sql("DELETE FROM search_fts")
+    for s in SOURCES:
+        body = s.body.format(p="")
+        connection.exec_driver_sql(
+            f"INSERT INTO search_fts(rowid, body) "
+            f"SELECT id * 4 + {s.code}, {body} FROM {s.table} WHERE trim({body}) <> ''"
+        )
+    total = connection.exec_driver_sql("SELECT count(*) FROM search_fts").scalar()
+    db.session.commit()
+    return int(total or 0)
+
+
+def _terms(q: str | None) -> list[str]:
+    return [t.lower() for t in _TERM_RE.findall(q or "")][:MAX_TERMS]
+
+
+def _sqlite_hits(terms, codes, limit, offset) -> tuple[int, list[tuple[str, int, float]]]:
+    # Cada término entre comillas (sin operadores FTS5) y como prefijo.
+    params: dict[str, Any] = {"match": " ".join(f'"{t}"*' for t in terms)}
+    where = "search_fts MATCH :match"
+    if len(codes) < len(SOURCES):
+        where += f" AND rowid % 4 IN ({', '.join(str(c) for c in codes)})"
+    total = db.session.execute(text(f"SELECT count(*) FROM search_fts WHERE {where}"), params).scalar()
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, bm25(search_fts) AS score FROM search_fts WHERE {where} "
+            "ORDER BY score LIMIT :limit OFFSET :offset"
+        ),
+        {**params, "limit": limit, "offset": offset},
+    )
+    return int(total or 0), [(_BY_CODE[rowid % 4].kind, rowid // 4, -score) for rowid, score in rows]
+
+
+def _postgres_hits(terms, codes, limit, offset) -> tuple[int, list[tuple[str, int, float]]]:
+    params: dict[str, Any] = {"tsquery": " & ".join(f"{t}:*" for t in terms)}
+    parts = []
+    for code in codes:
+        s = _BY_CODE[code]
+        vector = f"to_tsvector('{SEARCH_CONFIG}', {s.body.format(p='')})"
+        parts.append(
+            f"SELECT '{s.kind}' AS kind, id, ts_rank({vector}, q) AS rank "
+            f"FROM {s.table}, to_tsquery('{SEARCH_CONFIG}', :tsquery) AS q WHERE {vector} @@ q"
+        )
+    union = " UNION ALL ".join(parts)
+    total = db.session.execute(text(f"SELECT count(*) FROM ({union}) AS hits"), params).scalar()
+    rows = db.session.execute(
+        text(f"{union} ORDER BY rank DESC, id DESC LIMIT :limit OFFSET :offset"),
+        {**params, "limit": limit, "offset": offset},
+    )
+    return int(total or 0), [(kind, id_, float(rank)) for kind, id_, rank in rows]
+
+
+def _excerpt(body: str, terms: Iterable[str], width: int = 160) -> str:
+    body = " ".join((body or "").split())
+    lowered = body.lower()
+    positions = [p for p in (lowered.find(t) for t in terms) if p >= 0]
+    start = max(min(positions) - width // 4, 0) if positions else 0
+    fragment = body[start : start + width]
+    return ("…" if start else "") + fragment + ("…" if start + width < len(body) else "")
+
+
+def _like_hits(terms, codes, limit, offset) -> tuple[int, list[tuple[str, int, float]]]:
+    # ``\w`` incluye ``_``, que en ``LIKE`` es comodín.
+    params: dict[str, Any] = {f"t{i}": "%" + t.replace("_", "\\_") + "%" for i, t in enumerate(terms)}
+    parts = []
+    for code in codes:
+        s = _BY_CODE[code]
+        body = f"lower({s.body.format(p='')})"
+        where = " AND ".join(f"{body} LIKE :t{i} ESCAPE '\\'" for i in range(len(terms)))
+        parts.append(f"SELECT '{s.kind}' AS kind, id FROM {s.table} WHERE {where}")
+    union = " UNION ALL ".join(parts)
+    total = db.session.execute(text(f"SELECT count(*) FROM ({union}) AS hits"), params).scalar()
+    rows = db.session.execute(
+        text(f"SELECT kind, id FROM ({union}) AS hits ORDER BY id DESC LIMIT :limit OFFSET :offset"),
+        {**params, "limit": limit, "offset": offset},
+    )
+    return int(total or 0), [(kind, id_, 0.0) for kind, id_ in rows]
+
+
+def _describe(hits: list[tuple[str, int, float]], terms: list[str]) -> list[dict[str, Any]]:
+    ids: dict[str, list[int]] = {kind: [] for kind in KINDS}
+    for kind, id_, _ in hits:
+        ids[kind].append(id_)
+
+    details: dict[tuple[str, int], dict[str, Any]] = {}
+    if ids["bitacora"]:
+        rows = (
+            db.session.query(Bitacora.id, Bitacora.date, Bitacora.author, Bitacora.text, Project.name)
+            .outerjoin(Project, Project.id == Bitacora.project_id)
+            .filter(Bitacora.id.in_(ids["bitacora"]))
+        )
+        for id_, fecha, author, body, project in rows:
+            details[("bitacora", id_)] = {
+                "fecha": fecha,
+                "titulo": f"Bitácora · {project or '-'}" + (f" · {author}" if author else ""),
+                "body": body,
+            }
+    if ids["parte"]:
+        rows = (
+            db.session.query(
+                ParteDiaria.id,
+                ParteDiaria.fecha,
+                ParteDiaria.actividad,
+                ParteDiaria.incidencias,
+                ParteDiaria.notas,
+                Equipo.codigo,
+            )
+            .outerjoin(Equipo, Equipo.id == ParteDiaria.equipo_id)
+            .filter(ParteDiaria.id.in_(ids["parte"]))
+        )
+        for id_, fecha, actividad, incidencias, notas, equipo in rows:
+            details[("parte", id_)] = {
+                "fecha": fecha,
+                "titulo": f"Parte #{id_}" + (f" · {equipo}" if equipo else ""),
+                "body": " · ".join(v for v in (actividad, incidencias, notas) if v),
+            }
+    if ids["checklist"]:
+        rows = (
+            db.session.query(
+                ChecklistAnswer.id,
+                ChecklistAnswer.run_id,
+                ChecklistAnswer.comentario,
+                ChecklistRun.fecha,
+                ChecklistItem.texto,
+            )
+            .join(ChecklistRun, ChecklistRun.id == ChecklistAnswer.run_id)
+            .outerjoin(ChecklistItem, ChecklistItem.id == ChecklistAnswer.item_id)
+            .filter(ChecklistAnswer.id.in_(ids["checklist"]))
+        )
+        for id_, run_id, comentario, fecha, item in rows:
+            details[("checklist", id_)] = {
+                "fecha": fecha,
+                "titulo": f"Checklist #{run_id}" + (f" · {item}" if item else ""),
+                "body": comentario,
+                "run_id": run_id,
+            }
+
+    results = []
+    for kind, id_, rank in hits:
+        info = details.get((kind, id_))
+        if info is None:  # borrado entre la búsqueda y la carga
+            continue
+        body = info.pop("body")
+        results.append(
+            {
+                "kind": kind,
+                "id": id_,
+                "rank": round(rank, 6),
+                "fragmento": _excerpt(body, terms),
+                **info,
+            }
+        )
+    return results
+
+
+def search(
+    q: str | None,
+    *,
+    kinds: Iterable[str] | None = None,
+    page: int = 1,
+    per_page: int = 20,
+) -> dict[str, Any]:
+    """Resultados ordenados por relevancia y paginados.
+
+    Returns:
+        ``{"q", "items", "total", "page", "pages", "per_page"}``; cada ítem
+        tiene ``kind``, ``id``, ``rank``, ``fecha``, ``titulo`` y ``fragmento``.
+    """
+
+    terms = _terms(q)
+    wanted = set(kinds or KINDS)
+    codes = [s.code for s in SOURCES if s.kind in wanted]
+    page = max(int(page or 1), 1)
+    per_page = max(int(per_page or 1), 1)
+    result: dict[str, Any] = {"q": q or "", "items": [], "total": 0, "page": page, "pages": 1, "per_page": per_page}
+    if not terms or not codes:
+        return result
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        finder = _postgres_hits
+    elif dialect == "sqlite":
+        finder = _sqlite_hits
+    else:
+        finder = _like_hits
+    total, hits = finder(terms, codes, per_page, (page - 1) * per_page)
+    result.update(
+        items=_describe(hits, terms),
+        total=total,
+        pages=max((total + per_page - 1) // per_page, 1),
+    )
+    return result
@@ -0,0 +1,184 @@
+"""Borrado diferido de evidencias y recolección de blobs huérfanos.
+
+Al eliminar evidencias las rutas se encolan (``files.remove``) en la misma
+transacción que borra las filas, así la petición no espera al disco y, si
+se revierte, tampoco se pierde ningún archivo.
+
+``collect_orphans`` concilia el almacén de blobs con la tabla ``archivos``
+sin cargar ninguno de los dos lados en memoria: los blobs se recorren en
+orden de hash (los directorios ``ab/cd`` y los nombres son hexadecimales de
+ancho fijo, así que el orden de directorios coincide con el del hash) y los
+``sha256`` referenciados se leen con ``ORDER BY`` por lotes; ambos flujos se
+avanzan en paralelo como en un *merge join*.
+
+Fuera del almacén, ``UPLOAD_DIR`` también guarda exportaciones CSV y
+archivos aún no migrados (``flask storage-migrate``), por eso no se barre.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import time
+from typing import Iterator
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.parte_diaria import ArchivoAdjunto
+from app.services.archivos_service import remove_unreferenced_files
+from app.services.jobs import enqueue, handler
+from app.storage.blobs import LocalBlobStore, get_blob_store
+
+_SHARD_RE = re.compile(r"^[0-9a-f]{2}$")
+_BLOB_NAME_RE = re.compile(r"^([0-9a-f]{64})(?:\..*)?$")
+
+# Un blob reutilizado hace menos de esto queda para la recolección.
+REMOVAL_MIN_AGE = 60
+
+
+def enqueue_file_removal(paths) -> bool:
+    """Encola el borrado de ``paths`` (se ejecuta cuando nadie los referencie)."""
+
+    paths = sorted({p for p in paths if p})
+    if not paths:
+        return False
+    return enqueue("files.remove", {"paths": paths})
+
+
+@handler("files.remove")
+def _remove_files(payload):
+    remove_unreferenced_files(payload.get("paths") or [], min_age_seconds=REMOVAL_MIN_AGE)
+
+
+def _sorted_dirs(path: str) -> list[str]:
+    try:
+        with os.scandir(path) as entries:
+            return sorted(e.name for e in entries if e.is_dir() and _SHARD_RE.match(e.name))
+    except FileNotFoundError:
+        return []
+
+
+def _iter_disk(root: str) -> Iterator[tuple[str, str, os.DirEntry]]:
+    """``(directorio, sha256 | "", entrada)`` en orden de hash."""
+
+    for first in _sorted_dirs(root):
+        level1 = os.path.join(root, first)
+        for second in _sorted_dirs(level1):
+            shard = os.path.join(level1, second)
+            with os.scandir(shard) as entries:
+                files = sorted((e for e in entries if e.is_file()), key=lambda e: e.name)
+            for entry in files:
+                match = _BLOB_NAME_RE.match(entry.name)
+                yield shard, match.group(1) if match else "", entry
+
+
+def _iter_referenced(root: str, batch_size: int) -> Iterator[str]:
+    query = (
+        select(ArchivoAdjunto.sha256)
+        .where(
+            ArchivoAdjunto.path.startswith(root + os.sep, autoescape=True),
+            ArchivoAdjunto.sha256.isnot(None),
+        )
+        .distinct()
+        .order_by(ArchivoAdjunto.sha256)
+        .execution_options(yield_per=batch_size)
+    )
+    for sha256 in db.session.execute(query).scalars():
+        yield sha256
+
+
+def collect_orphans(
+    *,
+    dry_run: bool = False,
+    grace_seconds: int = 24 * 3600,
+    batch_size: int = 1000,
+) -> dict[str, int]:
+    """Borra los blobs (y sus miniaturas) que ninguna evidencia referencia.
+
+    Los archivos modificados hace menos de ``grace_seconds`` se respetan: una
+    subida escribe el blob antes de confirmar su fila en ``archivos``.
+
+    Returns:
+        Archivos revisados, huérfanos, bytes huérfanos y bytes recuperados,
+        recientes omitidos y nombres desconocidos (que nunca se borran).
+        ``skipped`` vale 1 si el almacén no es local y no se revisó nada.
+    """
+
+    stats = {
+        "scanned": 0,
+        "orphans": 0,
+        "orphan_bytes": 0,
+        "reclaimed_bytes": 0,
+        "recent": 0,
+        "unknown": 0,
+        "skipped": 0,
+    }
+    store = get_blob_store()
+    if not isinstance(store, LocalBlobStore):
+        # Reintentar no cambiaría nada: se omite sin fallar la tarea.
+        current_app.logger.warning(
+            "[storage-gc] omitido: el almacén %s no es local", type(store).__name__
+        )
+        stats["skipped"] = 1
+        return stats
+    cutoff = time.time() - grace_seconds
+    referenced = _iter_referenced(store.root, batch_size)
+    current = next(referenced, None)
+    touched_shards: set[str] = set()
+
+    for shard, sha256, entry in _iter_disk(store.root):
+        stats["scanned"] += 1
+        if not sha256:
+            stats["unknown"] += 1
+            continue
+        while current is not None and current < sha256:
+            current = next(referenced, None)
+        # Las copias ``<hash>.<uuid>.part`` sólo quedan si se cortó una escritura.
+        if current == sha256 and not entry.name.endswith(".part"):
+            continue
+
+        info = entry.stat()
+        if info.st_mtime > cutoff:
+            stats["recent"] += 1
+            continue
+        stats["orphans"] += 1
+        stats["orphan_bytes"] += info.st_size
+        if dry_run:
+            continue
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+        stats["reclaimed_bytes"] += info.st_size
+        touched_shards.add(shard)
+
+    # Copias intermedias de ``put_stream`` abandonadas.
+    staging = os.path.join(store.root, ".tmp")
+    if os.path.isdir(staging):
+        with os.scandir(staging) as entries:
+            for entry in entries:
+                info = entry.stat()
+                if not entry.is_file() or info.st_mtime > cutoff:
+                    continue
+                stats["orphans"] += 1
+                stats["orphan_bytes"] += info.st_size
+                if not dry_run:
+                    os.remove(entry.path)
+                    stats["reclaimed_bytes"] += info.st_size
+
+    for shard in sorted(touched_shards, reverse=True):
+        for directory in (shard, os.path.dirname(shard)):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+
+    current_app.logger.info("[storage-gc] %s", stats)
+    return stats
+
+
+@handler("storage.gc")
+def _collect_orphans_job(payload):
+    collect_orphans(grace_seconds=int(payload.get("grace_seconds") or 24 * 3600))
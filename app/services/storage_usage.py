@@ -0,0 +1,251 @@
+"""Contabilidad de almacenamiento por proyecto, carpeta y evidencias.
+
+``storage_usage`` responde "¿cuánto ocupa el proyecto X?" con una consulta
+indexada en vez de recorrer el disco:
+
+- ``project``/``folder``: se recalculan desde ``assets`` (un ``INSERT ...
+  SELECT`` agrupado) cada vez que el escáner termina una carpeta.
+- ``evidencias``: se ajustan de forma incremental al crear o borrar filas de
+  ``archivos`` por ORM (eventos de sesión); los borrados masivos con
+  ``Query.delete`` deben llamar a ``record_evidence``.
+
+``flask storage-usage-rebuild`` recalcula todo si alguna vez se desincroniza.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterable
+
+from sqlalchemy import case, delete, event, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.metrics import storage_usage_bytes, storage_usage_files
+from app.models import Project
+from app.models.asset import Asset
+from app.models.folder import Folder
+from app.models.parte_diaria import ArchivoAdjunto
+from app.models.storage_usage import StorageUsage
+from app.utils.upsert import increment_counters
+
+CATEGORIAS = ("img", "pdf", "video", "otro")
+EVIDENCIAS = "evidencias"
+
+_KEY = ("scope", "scope_id", "categoria")
+
+
+def _asset_categoria():
+    mime = func.lower(func.coalesce(Asset.mime_type, ""))
+    return case(
+        (mime.like("image/%"), literal("img")),
+        (mime == "application/pdf", literal("pdf")),
+        (mime.like("video/%"), literal("video")),
+        else_=literal("otro"),
+    )
+
+
+def _evidence_categoria():
+    return func.coalesce(ArchivoAdjunto.categoria, literal("otro"))
+
+
+def _insert_from(scope: str, scope_id, categoria, size, where) -> None:
+    source = (
+        select(
+            literal(scope),
+            scope_id,
+            categoria,
+            func.coalesce(func.sum(size), 0),
+            func.count(),
+            literal(datetime.utcnow()),
+        )
+        .where(*where)
+        .group_by(scope_id, categoria)
+    )
+    db.session.execute(
+        insert(StorageUsage).from_select(
+            ["scope", "scope_id", "categoria", "bytes", "files", "updated_at"], source
+        )
+    )
+
+
+def refresh_project_usage(project_id: int) -> None:
+    """Recalcula desde ``assets`` el uso del proyecto y de cada una de sus carpetas."""
+
+    db.session.execute(
+        delete(StorageUsage).where(
+            StorageUsage.scope == "project", StorageUsage.scope_id == project_id
+        )
+    )
+    folder_ids = select(Folder.id).where(Folder.project_id == project_id)
+    db.session.execute(
+        delete(StorageUsage).where(
+            StorageUsage.scope == "folder", StorageUsage.scope_id.in_(folder_ids)
+        )
+    )
+    categoria = _asset_categoria()
+    _insert_from("project", Asset.project_id, categoria, Asset.size_bytes, [Asset.project_id == project_id])
+    _insert_from(
+        "folder",
+        Asset.folder_id,
+        categoria,
+        Asset.size_bytes,
+        [Asset.project_id == project_id, Asset.folder_id.isnot(None)],
+    )
+    db.session.commit()
+
+
+def record_evidence(rows: Iterable[tuple[str | None, int | None, int]], session: Session | None = None) -> None:
+    """Ajusta el uso de evidencias con ``(categoria, bytes, archivos)`` (negativos al borrar)."""
+
+    totals: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for categoria, size, files in rows:
+        entry = totals[categoria or "otro"]
+        entry[0] += size or 0
+        entry[1] += files
+    values = [
+        {
+            "scope": EVIDENCIAS,
+            "scope_id": 0,
+            "categoria": categoria,
+            "bytes": size,
+            "files": files,
+            "updated_at": datetime.utcnow(),
+        }
+        for categoria, (size, files) in totals.items()
+        if size or files
+    ]
+    session = session or db.session
+    increment_counters(
+        session.connection(),
+        StorageUsage.__table__,
+        values,
+        key=_KEY,
+        counters=("bytes", "files"),
+        replace=("updated_at",),
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _record_deleted_evidence(session, flush_context, instances):
+    # Antes del flush: después las filas borradas ya no pueden recargarse.
+    rows = [
+        (obj.categoria, -(obj.size or 0), -1)
+        for obj in session.deleted
+        if isinstance(obj, ArchivoAdjunto)
+    ]
+    if rows:
+        record_evidence(rows, session)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_new_evidence(session, flush_context):
+    rows = [(obj.categoria, obj.size, 1) for obj in session.new if isinstance(obj, ArchivoAdjunto)]
+    if rows:
+        record_evidence(rows, session)
+
+
+def rebuild_usage() -> int:
+    """Recalcula toda la tabla desde ``assets`` y ``archivos``."""
+
+    db.session.execute(delete(StorageUsage))
+    categoria = _asset_categoria()
+    _insert_from("project", Asset.project_id, categoria, Asset.size_bytes, [])
+    _insert_from("folder", Asset.folder_id, categoria, Asset.size_bytes, [Asset.folder_id.isnot(None)])
+    _insert_from(EVIDENCIAS, literal(0), _evidence_categoria(), ArchivoAdjunto.size, [])
+    db.session.commit()
+    return db.session.query(func.count(StorageUsage.id)).scalar() or 0
+
+
+def _empty() -> dict[str, Any]:
+    return {"bytes": 0, "files": 0, "by_categoria": {}}
+
+
+def _add(target: dict[str, Any], categoria: str, size: int, files: int) -> None:
+    target["bytes"] += size
+    target["files"] += files
+    target["by_categoria"][categoria] = {"bytes": size, "files": files}
+
+
+def usage_summary() -> dict[str, Any]:
+    """Uso por proyecto (con nombre) y de evidencias, ordenado por bytes."""
+
+    projects: dict[int, dict[str, Any]] = {}
+    evidencias = _empty()
+    rows = (
+        db.session.query(
+            StorageUsage.scope,
+            StorageUsage.scope_id,
+            StorageUsage.categoria,
+            StorageUsage.bytes,
+            StorageUsage.files,
+            Project.name,
+        )
+        .outerjoin(
+            Project, (StorageUsage.scope == "project") & (Project.id == StorageUsage.scope_id)
+        )
+        .filter(StorageUsage.scope.in_(("project", EVIDENCIAS)))
+    )
+    for scope, scope_id, categoria, size, files, name in rows:
+        if scope == EVIDENCIAS:
+            _add(evidencias, categoria, int(size or 0), int(files or 0))
+            continue
+        entry = projects.setdefault(scope_id, {"id": scope_id, "name": name, **_empty()})
+        _add(entry, categoria, int(size or 0), int(files or 0))
+    return {
+        "projects": sorted(projects.values(), key=lambda p: -p["bytes"]),
+        "evidencias": evidencias,
+    }
+
+
+def folder_usage_by_path(paths: Iterable[str]) -> dict[str, tuple[int, int]]:
+    """``{ruta: (bytes, archivos)}`` de las rutas de ``paths`` que son carpetas registradas."""
+
+    # ``Folder.fs_path`` se guarda con ``abspath``; se prueban ambas formas.
+    candidates: dict[str, str] = {}
+    for path in paths:
+        candidates[os.path.abspath(path)] = path
+        candidates.setdefault(os.path.realpath(path), path)
+    if not candidates:
+        return {}
+    rows = (
+        db.session.query(
+            Folder.fs_path, func.sum(StorageUsage.bytes), func.sum(StorageUsage.files)
+        )
+        .join(
+            StorageUsage, (StorageUsage.scope == "folder") & (StorageUsage.scope_id == Folder.id)
+        )
+        .filter(Folder.fs_path.in_(list(candidates)))
+        .group_by(Folder.fs_path)
+    )
+    return {
+        candidates[fs_path]: (int(size or 0), int(files or 0)) for fs_path, size, files in rows
+    }
+
+
+# Etiquetas publicadas por este proceso en el último ``refresh_gauges``.
+_published: set[tuple[str, str, str]] = set()
+
+
+def refresh_gauges() -> None:
+    """Copia la tabla a los gauges de Prometheus (se llama al servir ``/metrics``).
+
+    ``Gauge.clear()`` no funciona en modo multiproceso, así que en lugar de
+    borrar series se publican en 0: todas las categorías de cada ámbito
+    presente y las etiquetas que este proceso publicó antes y ya no existen.
+    """
+
+    values: dict[tuple[str, str, str], tuple[int, int]] = {}
+    for row in db.session.query(StorageUsage):
+        values[(row.scope, str(row.scope_id), row.categoria)] = (row.bytes or 0, row.files or 0)
+    scopes = {(scope, scope_id) for scope, scope_id, _ in values}
+    labels = {(scope, scope_id, categoria) for scope, scope_id in scopes for categoria in CATEGORIAS}
+    labels |= set(values) | _published
+    for label in labels:
+        size, files = values.get(label, (0, 0))
+        storage_usage_bytes.labels(*label).set(size)
+        storage_usage_files.labels(*label).set(files)
+    _published.clear()
+    _published.update(values)
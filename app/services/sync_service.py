@@ -0,0 +1,279 @@
+"""Sincronización por lotes de partes diarias y checklists desde campo.
+
+Una tableta acumula el trabajo del día sin conexión y lo envía en un solo
+``POST /api/v1/sync``. Cada registro trae una clave de idempotencia (``key``)
+generada en el dispositivo: si el lote se reenvía tras un corte de red, los
+registros ya guardados se reportan como ``duplicate`` con su id original.
+
+La validación se hace en bloque (una consulta por catálogo referenciado) y la
+escritura en una única transacción con ``INSERT`` masivos. Los registros
+inválidos se reportan individualmente sin impedir que se guarden los demás.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.checklist import ChecklistAnswer, ChecklistRun, ChecklistTemplate
+from app.models.equipo import Equipo
+from app.models.operador import Operador
+from app.models.parte_diaria import ParteDiaria
+from app.models.sync_receipt import SyncReceipt
+from app.services.checklist_cache import template_items
+from app.services.checklist_stats import record_answers
+from app.services.equipo_usage import record_partes
+
+MAX_KEY_LENGTH = 64
+
+
+class SyncError(ValueError):
+    """El lote completo es inválido (formato o tamaño)."""
+
+
+class SyncConflict(RuntimeError):
+    """Otro envío guardó las mismas claves a la vez; el cliente debe reintentar."""
+
+
+class _Invalid(ValueError):
+    pass
+
+
+def _parse_fecha(value) -> date:
+    if not value:
+        raise _Invalid("fecha requerida")
+    try:
+        return datetime.strptime(str(value), "%Y-%m-%d").date()
+    except ValueError:
+        raise _Invalid("fecha inválida (YYYY-MM-DD)") from None
+
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _optional_id(rec: dict, field: str, known: set[int]) -> int | None:
+    value = rec.get(field)
+    if value is None or value == "":
+        return None
+    if not _is_id(value) or value not in known:
+        raise _Invalid(f"{field} no existe")
+    return value
+
+
+def _text(rec: dict, field: str) -> str:
+    value = rec.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise _Invalid(f"{field} debe ser texto")
+    return value.strip()
+
+
+def _ids(records: list[dict], field: str) -> set[int]:
+    return {rec[field] for rec in records if _is_id(rec.get(field))}
+
+
+def _existing(model, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    return set(db.session.scalars(db.select(model.id).where(model.id.in_(ids))))
+
+
+def _clean_parte(rec: dict, refs: dict) -> dict[str, Any]:
+    horas = rec.get("horas_trabajo", 0)
+    if (
+        isinstance(horas, bool)
+        or not isinstance(horas, (int, float))
+        or not math.isfinite(horas)
+        or horas < 0
+    ):
+        raise _Invalid("horas_trabajo debe ser un número >= 0")
+    return {
+        "fecha": _parse_fecha(rec.get("fecha")),
+        "equipo_id": _optional_id(rec, "equipo_id", refs["equipos"]),
+        "operador_id": _optional_id(rec, "operador_id", refs["operadores"]),
+        "horas_trabajo": float(horas),
+        "actividad": _text(rec, "actividad"),
+        "incidencias": _text(rec, "incidencias"),
+        "notas": _text(rec, "notas"),
+    }
+
+
+def _clean_run(rec: dict, refs: dict) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    template_id = rec.get("template_id")
+    items = refs["templates"].get(template_id) if _is_id(template_id) else None
+    if items is None:
+        raise _Invalid("template_id no existe")
+
+    raw_answers = rec.get("answers") or []
+    if not isinstance(raw_answers, list):
+        raise _Invalid("answers debe ser una lista")
+    by_item: dict[int, dict] = {}
+    valid_ids = {it.id for it in items}
+    for ans in raw_answers:
+        item_id = ans.get("item_id") if isinstance(ans, dict) else None
+        if not _is_id(item_id) or item_id not in valid_ids:
+            raise _Invalid(f"item_id {item_id} no pertenece a la plantilla")
+        if item_id in by_item:
+            raise _Invalid(f"item_id {item_id} repetido")
+        by_item[item_id] = ans
+
+    answers = []
+    oks = 0
+    total_bool = 0
+    for it in items:
+        ans = by_item.get(it.id, {})
+        comentario = _text(ans, "comentario")
+        if it.tipo == "bool":
+            val = ans.get("valor_bool", False)
+            if not isinstance(val, bool):
+                raise _Invalid(f"valor_bool del ítem {it.id} debe ser booleano")
+            total_bool += 1
+            oks += int(val)
+        else:
+            val = None
+        answers.append({"item_id": it.id, "valor_bool": val, "comentario": comentario})
+
+    run = {
+        "template_id": rec["template_id"],
+        "fecha": _parse_fecha(rec.get("fecha")),
+        "equipo_id": _optional_id(rec, "equipo_id", refs["equipos"]),
+        "operador_id": _optional_id(rec, "operador_id", refs["operadores"]),
+        "notas": _text(rec, "notas"),
+        "pct_ok": (oks / total_bool * 100.0) if total_bool else 0.0,
+    }
+    return run, answers
+
+
+def _load_refs(records: list[dict]) -> dict[str, Any]:
+    template_ids = _ids(records, "template_id")
+    templates = (
+        ChecklistTemplate.query.filter(ChecklistTemplate.id.in_(template_ids)).all()
+        if template_ids
+        else []
+    )
+    return {
+        "equipos": _existing(Equipo, _ids(records, "equipo_id")),
+        "operadores": _existing(Operador, _ids(records, "operador_id")),
+        "templates": {t.id: template_items(t) for t in templates},
+    }
+
+
+def _insert_returning_ids(model, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.session.scalars(stmt, rows))
+
+
+def sync_batch(payload: dict, *, max_records: int = 500) -> dict[str, Any]:
+    """Valida y guarda un lote ``{"partes": [...], "checklists": [...]}``.
+
+    Returns:
+        ``{"results": [...], "summary": {...}}`` con un resultado por registro
+        en el orden recibido (primero partes, luego checklists).
+
+    Raises:
+        SyncError: si el lote no tiene el formato esperado o es demasiado grande.
+        SyncConflict: si otra petición guardó alguna clave durante la escritura.
+    """
+
+    partes = payload.get("partes") or []
+    checklists = payload.get("checklists") or []
+    if not isinstance(partes, list) or not isinstance(checklists, list):
+        raise SyncError("'partes' y 'checklists' deben ser listas")
+    entries = [("parte", rec) for rec in partes] + [("checklist", rec) for rec in checklists]
+    if len(entries) > max_records:
+        raise SyncError(f"El lote tiene {len(entries)} registros (máx {max_records})")
+
+    results: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for kind, rec in entries:
+        key = rec.get("key") if isinstance(rec, dict) else None
+        result: dict[str, Any] = {"key": key, "kind": kind}
+        if not isinstance(key, str) or not 0 < len(key) <= MAX_KEY_LENGTH:
+            result.update(status="error", error=f"key requerida (máx {MAX_KEY_LENGTH})")
+        elif key in seen:
+            result.update(status="error", error="key repetida en el lote")
+        else:
+            seen.add(key)
+        results.append(result)
+
+    receipts = {}
+    if seen:
+        receipts = {
+            r.client_key: r
+            for r in SyncReceipt.query.filter(SyncReceipt.client_key.in_(seen))
+        }
+
+    pending = [
+        (idx, kind, rec)
+        for idx, (kind, rec) in enumerate(entries)
+        if "status" not in results[idx]
+    ]
+    refs = _load_refs([rec for _, _, rec in pending])
+
+    parte_rows: list[tuple[int, dict]] = []
+    run_rows: list[tuple[int, dict, list[dict]]] = []
+    for idx, kind, rec in pending:
+        result = results[idx]
+        receipt = receipts.get(rec["key"])
+        if receipt is not None:
+            if receipt.kind != kind:
+                result.update(status="error", error="key usada por otro tipo de registro")
+            else:
+                result.update(status="duplicate", id=receipt.record_id)
+            continue
+        try:
+            if kind == "parte":
+                parte_rows.append((idx, _clean_parte(rec, refs)))
+            else:
+                run_rows.append((idx, *_clean_run(rec, refs)))
+        except _Invalid as exc:
+            result.update(status="error", error=str(exc))
+
+    try:
+        parte_ids = _insert_returning_ids(ParteDiaria, [row for _, row in parte_rows])
+        record_partes(
+            (row["equipo_id"], row["fecha"], row["horas_trabajo"], row["incidencias"])
+            for _, row in parte_rows
+        )
+        run_ids = _insert_returning_ids(ChecklistRun, [row for _, row, _ in run_rows])
+        answers = [
+            {"run_id": run_id, **ans}
+            for run_id, (_, _, run_answers) in zip(run_ids, run_rows)
+            for ans in run_answers
+        ]
+        if answers:
+            db.session.execute(insert(ChecklistAnswer), answers)
+            record_answers(
+                (run["template_id"], run["equipo_id"], run["fecha"], ans["item_id"], ans["valor_bool"])
+                for _, run, run_answers in run_rows
+                for ans in run_answers
+            )
+
+        created = [(idx, "parte", rid) for (idx, _), rid in zip(parte_rows, parte_ids)]
+        created += [(idx, "checklist", rid) for (idx, _, _), rid in zip(run_rows, run_ids)]
+        new_receipts = []
+        for idx, kind, record_id in created:
+            results[idx].update(status="created", id=record_id)
+            new_receipts.append(
+                {"client_key": results[idx]["key"], "kind": kind, "record_id": record_id}
+            )
+        if new_receipts:
+            db.session.execute(insert(SyncReceipt), new_receipts)
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        raise SyncConflict("Claves enviadas simultáneamente; reintenta el lote") from exc
+
+    summary = {"created": 0, "duplicate": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return {"results": results, "summary": summary}
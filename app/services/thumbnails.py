@@ -0,0 +1,155 @@
+"""Miniaturas de evidencias generadas en segundo plano.
+
+Al registrar una imagen o un PDF se encola una tarea ``thumbnail``; el worker
+escribe ``<archivo>.thumb.jpg`` junto al blob. Como los blobs se guardan por
+contenido, una miniatura sirve para todas las evidencias con el mismo hash.
+
+Las imágenes se reducen con Pillow. Para la primera página de un PDF se usa
+``pypdfium2`` si está instalado o, en su defecto, ``pdftoppm`` (poppler); sin
+ninguno de los dos el PDF queda sin miniatura y la lista muestra sólo el nombre.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.parte_diaria import ArchivoAdjunto
+from app.services.jobs import enqueue, handler
+from app.storage.blobs import THUMB_SUFFIX
+
+THUMB_SIZE = (320, 320)
+THUMB_QUALITY = 80
+CATEGORIAS = ("img", "pdf")
+
+
+def thumbnail_path(path: str) -> str:
+    return f"{path}{THUMB_SUFFIX}"
+
+
+def has_thumbnail(path: str | None) -> bool:
+    return bool(path) and os.path.exists(thumbnail_path(path))
+
+
+def _pdf_first_page(src: str):
+    from PIL import Image
+
+    try:
+        import pypdfium2 as pdfium  # type: ignore
+    except ImportError:
+        pdfium = None
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(src)
+        try:
+            return pdf[0].render(scale=1).to_pil()
+        finally:
+            pdf.close()
+
+    exe = shutil.which("pdftoppm")
+    if exe is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, "page")
+        subprocess.run(
+            [exe, "-jpeg", "-f", "1", "-l", "1", "-scale-to", str(max(THUMB_SIZE) * 2),
+             "-singlefile", src, prefix],
+            check=True,
+            capture_output=True,
+            timeout=60,
+        )
+        with Image.open(f"{prefix}.jpg") as page:
+            page.load()
+            return page.copy()
+
+
+def render_thumbnail(src: str, categoria: str) -> str | None:
+    """Genera la miniatura JPEG de ``src``; devuelve su ruta o ``None`` si no aplica."""
+
+    from PIL import Image, ImageOps
+
+    if categoria == "img":
+        with Image.open(src) as original:
+            original.draft("RGB", THUMB_SIZE)  # JPEG: decodifica ya reducido
+            image = ImageOps.exif_transpose(original)
+            image.thumbnail(THUMB_SIZE)
+    elif categoria == "pdf":
+        image = _pdf_first_page(src)
+        if image is None:
+            return None
+        image.thumbnail(THUMB_SIZE)
+    else:
+        return None
+
+    if image.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image.convert("RGBA"), mask=image.convert("RGBA").split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    dest = thumbnail_path(src)
+    partial = f"{dest}.part"
+    try:
+        image.save(partial, "JPEG", quality=THUMB_QUALITY, optimize=True, progressive=True)
+        os.replace(partial, dest)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial)
+        raise
+    return dest
+
+
+@handler("thumbnail")
+def _thumbnail_job(payload):
+    path = payload.get("path")
+    if not path or has_thumbnail(path) or not os.path.isfile(path):
+        return
+    render_thumbnail(path, payload.get("categoria") or "")
+
+
+def enqueue_thumbnail(path: str, categoria: str | None, session: Session | None = None) -> bool:
+    if categoria not in CATEGORIAS or not path or has_thumbnail(path):
+        return False
+    return enqueue("thumbnail", {"path": path, "categoria": categoria}, session=session, unique=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _enqueue_new_thumbnails(session, flush_context):
+    seen = set()
+    for obj in session.new:
+        if isinstance(obj, ArchivoAdjunto) and obj.path not in seen:
+            seen.add(obj.path)
+            enqueue_thumbnail(obj.path, obj.categoria, session)
+
+
+def backfill_thumbnails(*, batch_size: int = 500) -> int:
+    """Encola miniaturas para las evidencias existentes que no la tienen."""
+
+    queued = 0
+    seen = set()
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(ArchivoAdjunto.id, ArchivoAdjunto.path, ArchivoAdjunto.categoria)
+            .filter(ArchivoAdjunto.categoria.in_(CATEGORIAS), ArchivoAdjunto.id > last_id)
+            .order_by(ArchivoAdjunto.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            if row.path in seen:
+                continue
+            seen.add(row.path)
+            queued += enqueue_thumbnail(row.path, row.categoria)
+        db.session.commit()
+    return queued
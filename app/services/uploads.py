@@ -0,0 +1,244 @@
+"""Subidas por partes y reanudables de evidencias (protocolo al estilo tus).
+
+Flujo:
+
+1. ``create_upload`` reserva una sesión con el nombre y el tamaño total.
+2. ``append_chunk`` agrega bytes en el desplazamiento actual; si la conexión
+   se corta, el cliente consulta ``upload_status`` y continúa desde ahí.
+3. ``finalize_upload`` guarda el archivo completo en el almacén de blobs.
+
+Los bytes se escriben directo a ``instance/.tmp/uploads/<id>.part`` sin pasar
+por memoria. El sha256 se calcula mientras llegan los bloques; el estado del
+hash vive en memoria del proceso y, si la petición siguiente cae en otro
+worker, se reconstruye leyendo una vez lo ya recibido.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from flask import current_app
+
+from app.storage.blobs import BlobStore
+from app.utils.cache import LRUCache
+from app.utils.files import FileTooLarge, copy_stream, sha256_of_file
+from app.utils.lock import file_lock
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# upload_id -> (offset, hashlib.sha256 con los bytes hasta ``offset``)
+_digests = LRUCache(maxsize=256)
+
+
+class UploadError(Exception):
+    status = 400
+
+    def __init__(self, message: str, *, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadNotFound(UploadError):
+    status = 404
+
+
+class UploadConflict(UploadError):
+    """Desplazamiento distinto al esperado o bloque en curso desde otra petición."""
+
+    status = 409
+
+
+class UploadTooLarge(UploadError):
+    status = 413
+
+
+def _tmp_dir() -> Path:
+    path = Path(current_app.instance_path) / ".tmp" / "uploads"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _paths(upload_id: str) -> tuple[Path, Path]:
+    if not _ID_RE.match(upload_id or ""):
+        raise UploadNotFound("Subida no encontrada")
+    base = _tmp_dir()
+    return base / f"{upload_id}.json", base / f"{upload_id}.part"
+
+
+def _load(upload_id: str) -> tuple[dict[str, Any], Path]:
+    meta_path, part_path = _paths(upload_id)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise UploadNotFound("Subida no encontrada") from None
+    return meta, part_path
+
+
+def _status(meta: dict[str, Any], part_path: Path) -> dict[str, Any]:
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    return {
+        "id": meta["id"],
+        "filename": meta["filename"],
+        "length": meta["length"],
+        "offset": offset,
+        "complete": offset == meta["length"],
+    }
+
+
+def _digest_at(upload_id: str, part_path: Path, offset: int):
+    cached = _digests.pop(upload_id)
+    if cached is not None and cached[0] == offset:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(part_path, "rb") as handle:
+        remaining = offset
+        while remaining:
+            chunk = handle.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+def create_upload(
+    filename: str,
+    length: int,
+    *,
+    allowed_extensions: set[str] | None = None,
+    parte_id: int | None = None,
+    run_id: int | None = None,
+) -> dict[str, Any]:
+    """Crea una sesión de subida vacía y devuelve su estado."""
+
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not filename or (allowed_extensions is not None and ext not in allowed_extensions):
+        raise UploadError("Extensión no permitida")
+    max_bytes = int(current_app.config.get("UPLOAD_MAX_BYTES") or 0)
+    if not isinstance(length, int) or length <= 0:
+        raise UploadError("Tamaño inválido")
+    if max_bytes and length > max_bytes:
+        raise UploadTooLarge(f"Archivo demasiado grande (máx {max_bytes} bytes)")
+
+    upload_id = uuid.uuid4().hex
+    meta = {
+        "id": upload_id,
+        "filename": filename,
+        "length": length,
+        "parte_id": parte_id,
+        "run_id": run_id,
+        "created_at": time.time(),
+    }
+    meta_path, part_path = _paths(upload_id)
+    part_path.touch()
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    _digests.set(upload_id, (0, hashlib.sha256()))
+    return _status(meta, part_path)
+
+
+def upload_status(upload_id: str) -> dict[str, Any]:
+    meta, part_path = _load(upload_id)
+    return _status(meta, part_path)
+
+
+def append_chunk(upload_id: str, offset: int, stream: BinaryIO) -> dict[str, Any]:
+    """Escribe el bloque ``stream`` en ``offset`` y devuelve el nuevo estado."""
+
+    meta, part_path = _load(upload_id)
+    lock_path = part_path.with_suffix(".lock")
+    try:
+        with file_lock(str(lock_path), timeout=0):
+            current = part_path.stat().st_size
+            if offset != current:
+                raise UploadConflict("Desplazamiento incorrecto", offset=current)
+            digest = _digest_at(upload_id, part_path, current)
+            # Si la conexión se corta a mitad del bloque no se guarda el hash:
+            # el siguiente intento lo rehace con lo que sí quedó en disco.
+            try:
+                with open(part_path, "ab") as handle:
+                    written = copy_stream(
+                        stream, handle, max_bytes=meta["length"] - current, digest=digest
+                    )
+            except FileTooLarge:
+                with open(part_path, "ab") as handle:
+                    handle.truncate(current)
+                raise UploadTooLarge("El bloque excede el tamaño declarado", offset=current)
+            _digests.set(upload_id, (current + written, digest))
+    except TimeoutError:
+        raise UploadConflict("Hay otro bloque en curso para esta subida") from None
+    return _status(meta, part_path)
+
+
+def finalize_upload(upload_id: str, store: BlobStore) -> dict[str, Any]:
+    """Guarda la subida completa en ``store`` y devuelve sus metadatos.
+
+    Returns:
+        ``{"path", "filename", "size", "sha256", "parte_id", "run_id"}``.
+    """
+
+    meta, part_path = _load(upload_id)
+    status = _status(meta, part_path)
+    if not status["complete"]:
+        raise UploadConflict("La subida está incompleta", offset=status["offset"])
+
+    cached = _digests.pop(upload_id)
+    if cached is not None and cached[0] == meta["length"]:
+        sha256 = cached[1].hexdigest()
+    else:
+        sha256 = sha256_of_file(str(part_path))
+
+    blob = store.put_file(str(part_path), sha256=sha256)
+    _discard_files(upload_id)
+    return {
+        "path": blob.path,
+        "filename": meta["filename"],
+        "size": meta["length"],
+        "sha256": sha256,
+        "parte_id": meta.get("parte_id"),
+        "run_id": meta.get("run_id"),
+    }
+
+
+def _discard_files(upload_id: str) -> None:
+    meta_path, part_path = _paths(upload_id)
+    for path in (part_path, meta_path, part_path.with_suffix(".lock")):
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+
+
+def abort_upload(upload_id: str) -> None:
+    _load(upload_id)
+    _digests.pop(upload_id)
+    _discard_files(upload_id)
+
+
+def purge_stale_uploads(max_age_seconds: int = 24 * 3600) -> int:
+    """Elimina sesiones sin actividad desde hace ``max_age_seconds``."""
+
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(_tmp_dir()):
+        if not entry.name.endswith(".json"):
+            continue
+        upload_id = entry.name[: -len(".json")]
+        try:
+            _, part_path = _paths(upload_id)
+        except UploadNotFound:
+            continue
+        touched = max(
+            entry.stat().st_mtime,
+            part_path.stat().st_mtime if part_path.exists() else 0,
+        )
+        if touched < cutoff:
+            _digests.pop(upload_id)
+            _discard_files(upload_id)
+            removed += 1
+    return removed
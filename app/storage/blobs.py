@@ -0,0 +1,153 @@
+"""Almacenamiento de blobs direccionado por contenido.
+
+Cada archivo se guarda una única vez en ``<raíz>/ab/cd/<sha256>``: dos niveles
+de subdirectorios por prefijo del hash mantienen cada directorio con pocas
+entradas aunque haya millones de archivos, y subir dos veces el mismo
+contenido reutiliza el blob existente. El nombre visible y el mimetype viven
+en la base de datos (``ArchivoAdjunto``), no en el sistema de archivos.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO, NamedTuple
+
+from flask import current_app
+
+from app.utils.files import save_stream, sha256_of_file
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Archivos derivados que viven junto al blob y se borran con él.
+THUMB_SUFFIX = ".thumb.jpg"
+SIDECAR_SUFFIXES = (THUMB_SUFFIX,)
+
+
+class StoredBlob(NamedTuple):
+    sha256: str
+    path: str
+    size: int
+    created: bool
+
+
+class BlobStore(ABC):
+    """Interfaz mínima de un almacén de blobs."""
+
+    @abstractmethod
+    def path_for(self, sha256: str) -> str: ...
+
+    @abstractmethod
+    def contains(self, path: str) -> bool:
+        """Indica si ``path`` pertenece a este almacén."""
+
+    @abstractmethod
+    def put_file(self, src: str, *, sha256: str | None = None, move: bool = True) -> StoredBlob: ...
+
+    @abstractmethod
+    def put_stream(self, stream: BinaryIO, *, max_bytes: int | None = None) -> StoredBlob: ...
+
+    @abstractmethod
+    def delete(self, sha256: str) -> bool: ...
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs en un directorio local con fragmentación ``ab/cd/<hash>``."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.realpath(root)
+
+    def path_for(self, sha256: str) -> str:
+        if not _SHA256_RE.match(sha256 or ""):
+            raise ValueError(f"sha256 inválido: {sha256!r}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def contains(self, path: str) -> bool:
+        return bool(path) and os.path.realpath(path).startswith(self.root + os.sep)
+
+    def _tmp_dir(self) -> str:
+        path = os.path.join(self.root, ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def put_file(self, src: str, *, sha256: str | None = None, move: bool = True) -> StoredBlob:
+        """Guarda ``src`` en el almacén.
+
+        Con ``move=False`` el original se conserva (se usa un enlace duro si
+        el sistema de archivos lo permite, si no una copia).
+        """
+
+        sha256 = sha256 or sha256_of_file(src)
+        target = self.path_for(sha256)
+        size = os.path.getsize(src)
+        if os.path.exists(target):
+            if move:
+                os.remove(src)
+            # Marca el blob como recién usado para que un borrado diferido o
+            # la recolección no lo quiten antes de que se confirme la fila nueva.
+            with contextlib.suppress(OSError):
+                os.utime(target)
+            return StoredBlob(sha256, target, size, False)
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        staging = f"{target}.{uuid.uuid4().hex}.part"
+        try:
+            if move:
+                try:
+                    os.replace(src, staging)
+                except OSError:
+                    shutil.copyfile(src, staging)
+                    os.remove(src)
+            else:
+                try:
+                    os.link(src, staging)
+                except OSError:
+                    shutil.copyfile(src, staging)
+            # Dos escrituras simultáneas del mismo hash traen el mismo contenido.
+            os.replace(staging, target)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(staging)
+            raise
+        return StoredBlob(sha256, target, size, True)
+
+    def put_stream(self, stream: BinaryIO, *, max_bytes: int | None = None) -> StoredBlob:
+        """Guarda ``stream`` calculando el hash al vuelo (sin cargarlo en memoria)."""
+
+        staging = os.path.join(self._tmp_dir(), uuid.uuid4().hex)
+        _, sha256 = save_stream(stream, staging, max_bytes=max_bytes)
+        return self.put_file(staging, sha256=sha256)
+
+    def delete(self, sha256: str) -> bool:
+        path = self.path_for(sha256)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        for suffix in SIDECAR_SUFFIXES:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + suffix)
+        # Limpia los directorios de fragmento que queden vacíos.
+        shard = os.path.dirname(path)
+        for directory in (shard, os.path.dirname(shard)):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+        return True
+
+
+def blob_root() -> str:
+    configured = current_app.config.get("BLOB_DIR")
+    if configured:
+        return configured
+    upload_dir = current_app.config.get("UPLOAD_DIR") or "/opt/render/project/data/uploads"
+    return os.path.join(upload_dir, "blobs")
+
+
+def get_blob_store() -> BlobStore:
+    return LocalBlobStore(blob_root())
@@ -0,0 +1,74 @@
+"""Cachés en memoria de proceso."""
+
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+_instances: weakref.WeakSet[LRUCache] = weakref.WeakSet()
+
+
+class LRUCache:
+    """Diccionario acotado y seguro entre hilos con expiración opcional.
+
+    Al superar ``maxsize`` se descarta la entrada usada hace más tiempo. Si
+    ``ttl`` (segundos) está definido, las entradas más antiguas se ignoran.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def discard_where(self, predicate) -> int:
+        """Elimina las entradas cuya clave cumple ``predicate``."""
+
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def clear_all() -> None:
+    """Vacía todas las cachés del proceso (útil en pruebas y tras migraciones)."""
+
+    for cache in list(_instances):
+        cache.clear()
@@ -0,0 +1,91 @@
+"""Envío de archivos guardados con Range, ETag y descarga delegada al proxy."""
+
+from __future__ import annotations
+
+import os
+
+from flask import Response, current_app, request, send_file
+from werkzeug.exceptions import NotFound
+
+
+def _accel_uri(path: str, mapping: list[str]) -> str | None:
+    real = os.path.realpath(path)
+    for entry in mapping:
+        prefix, _, location = entry.partition("=")
+        prefix = os.path.realpath(prefix.strip())
+        if location and (real == prefix or real.startswith(prefix + os.sep)):
+            rel = os.path.relpath(real, prefix).replace(os.sep, "/")
+            return location.rstrip("/") + "/" + rel
+    return None
+
+
+def _offloaded(
+    path: str, mode: str, *, download_name: str, mimetype: str | None, as_attachment: bool
+):
+    if mode == "x-accel":
+        uri = _accel_uri(path, current_app.config.get("X_ACCEL_MAPPING") or [])
+        if uri is None:
+            return None
+        header = ("X-Accel-Redirect", uri)
+    elif mode == "x-sendfile":
+        header = ("X-Sendfile", os.path.realpath(path))
+    else:
+        return None
+
+    response = Response(mimetype=mimetype or "application/octet-stream")
+    response.headers[header[0]] = header[1]
+    response.headers.set(
+        "Content-Disposition", "attachment" if as_attachment else "inline", filename=download_name
+    )
+    return response
+
+
+def send_stored_file(
+    path: str,
+    *,
+    download_name: str,
+    mimetype: str | None = None,
+    sha256: str | None = None,
+    as_attachment: bool = True,
+):
+    """Respuesta de descarga para un archivo en disco.
+
+    - Con ``sha256`` el ETag es el hash del contenido, así que sirve entre
+      réplicas y sobrevive a cambios de ``mtime``.
+    - ``Range``/``If-Range``/``If-None-Match`` se resuelven con
+      ``conditional=True`` de Werkzeug.
+    - ``Cache-Control`` es ``private`` (las evidencias requieren sesión) con
+      ``DOWNLOAD_MAX_AGE``; si hay hash el contenido se marca ``immutable``.
+    - Con ``FILE_OFFLOAD`` Flask sólo autoriza y agrega encabezados; nginx
+      (``X-Accel-Redirect``) o Apache/lighttpd (``X-Sendfile``) envían los bytes.
+    """
+
+    if not path or not os.path.isfile(path):
+        raise NotFound()
+
+    max_age = int(current_app.config.get("DOWNLOAD_MAX_AGE") or 0)
+    mode = current_app.config.get("FILE_OFFLOAD") or ""
+    response = _offloaded(
+        path, mode, download_name=download_name, mimetype=mimetype, as_attachment=as_attachment
+    )
+    if response is not None:
+        if sha256:
+            response.set_etag(sha256)
+        response.make_conditional(request)
+    else:
+        response = send_file(
+            path,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            mimetype=mimetype,
+            conditional=True,
+            etag=sha256 or True,
+            max_age=max_age,
+        )
+
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    if sha256:
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,57 @@
+"""Reducción de series temporales a un número acotado de puntos.
+
+- ``lttb_indices``: *Largest-Triangle-Three-Buckets*; conserva la forma
+  visual (picos y valles) eligiendo en cada tramo el punto que forma el
+  triángulo de mayor área con el elegido anterior y el promedio del tramo
+  siguiente.
+- ``bucket_ranges``: tramos contiguos de tamaño parejo para promediar.
+
+Ambas trabajan con índices, de modo que varias series alineadas se reducen
+con los mismos cortes.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def bucket_ranges(n: int, buckets: int) -> list[tuple[int, int]]:
+    """Divide ``range(n)`` en ``buckets`` tramos ``[inicio, fin)`` contiguos."""
+
+    if buckets <= 0 or n <= buckets:
+        return [(i, i + 1) for i in range(n)]
+    return [(n * b // buckets, n * (b + 1) // buckets) for b in range(buckets)]
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Índices elegidos por LTTB (siempre incluye el primero y el último)."""
+
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][: max(threshold, 0)]
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Promedio del tramo siguiente: tercer vértice del triángulo.
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
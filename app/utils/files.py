@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import contextlib
 import hashlib
 import mimetypes
 import os
-from typing import Tuple
+from typing import BinaryIO, Tuple
+
+PDF_EXTENSIONS = (".pdf",)
+IMG_EXTENSIONS = (".jpg", ".jpeg", ".png")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm")
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLarge(ValueError):
+    """El archivo supera el tamaño máximo permitido."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Archivo demasiado grande (máx {max_bytes} bytes)")
+        self.max_bytes = max_bytes
 
 
 def sha256_of_file(path: str, chunk_size: int = 1024 * 1024) -> str:
@@ -14,6 +29,57 @@ def sha256_of_file(path: str, chunk_size: int = 1024 * 1024) -> str:
     return digest.hexdigest()
 
 
+def copy_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    *,
+    max_bytes: int | None = None,
+    digest=None,
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> int:
+    """Copia ``src`` en ``dst`` por bloques y devuelve los bytes escritos.
+
+    Si se indica ``digest`` (p. ej. ``hashlib.sha256()``) se actualiza con cada
+    bloque. Lanza ``FileTooLarge`` antes de escribir el bloque que superaría
+    ``max_bytes``.
+    """
+
+    written = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            return written
+        if max_bytes is not None and written + len(chunk) > max_bytes:
+            raise FileTooLarge(max_bytes)
+        dst.write(chunk)
+        if digest is not None:
+            digest.update(chunk)
+        written += len(chunk)
+
+
+def save_stream(stream: BinaryIO, path: str, *, max_bytes: int | None = None) -> tuple[int, str]:
+    """Guarda ``stream`` en ``path`` sin cargarlo en memoria.
+
+    Escribe primero en ``<path>.part`` y lo renombra al terminar, así un corte
+    o un archivo demasiado grande no dejan un archivo incompleto.
+
+    Returns:
+        ``(tamaño, sha256)`` del archivo guardado.
+    """
+
+    digest = hashlib.sha256()
+    partial = f"{path}.part"
+    try:
+        with open(partial, "wb") as handle:
+            size = copy_stream(stream, handle, max_bytes=max_bytes, digest=digest)
+        os.replace(partial, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial)
+        raise
+    return size, digest.hexdigest()
+
+
 def guess_mime(path: str) -> str | None:
     mime, _ = mimetypes.guess_type(path)
     return mime
@@ -25,3 +91,31 @@ def split_root_rel(full_path: str, root: str) -> Tuple[str, str]:
     relative = os.path.relpath(full_path, root)
     directory = os.path.dirname(relative)
     return ("" if directory == "." else directory, os.path.basename(relative))
+
+
+def categoria_for(filename: str) -> str:
+    """Clasifica un archivo como ``pdf``, ``img`` u ``otro`` según su extensión."""
+
+    ext = os.path.splitext((filename or "").lower())[1]
+    if ext in PDF_EXTENSIONS:
+        return "pdf"
+    if ext in IMG_EXTENSIONS:
+        return "img"
+    return "otro"
+
+
+def describe_file(
+    path: str, filename: str | None = None, sha256: str | None = None
+) -> dict[str, object]:
+    """Metadatos persistibles de un archivo ya escrito en disco.
+
+    ``sha256`` evita releer el archivo cuando el hash se calculó al guardarlo.
+    """
+
+    name = filename or os.path.basename(path)
+    return {
+        "size": os.path.getsize(path),
+        "mimetype": guess_mime(name) or "application/octet-stream",
+        "categoria": categoria_for(name),
+        "sha256": sha256 or sha256_of_file(path),
+    }
@@ -0,0 +1,49 @@
+"""Filtros compartidos para listados y resúmenes por fecha/equipo."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from flask import request
+
+
+def parse_date(value, default=None):
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except Exception:
+        return default
+
+
+def request_filters() -> dict[str, object]:
+    """Lee ``desde``, ``hasta`` y ``equipo_id`` de la query string."""
+
+    return {
+        "desde": parse_date(request.args.get("desde")),
+        "hasta": parse_date(request.args.get("hasta")),
+        "equipo_id": request.args.get("equipo_id", type=int),
+    }
+
+
+def apply_filters(
+    query,
+    model,
+    *,
+    desde: date | None = None,
+    hasta: date | None = None,
+    equipo_id: int | None = None,
+):
+    """Aplica el rango de fechas y el equipo a ``query`` sobre ``model.fecha``.
+
+    Sirve tanto para ``Model.query`` como para consultas de agregados
+    (``db.session.query(func.count(...))``).
+    """
+
+    if desde:
+        query = query.filter(model.fecha >= desde)
+    if hasta:
+        query = query.filter(model.fecha <= hasta)
+    if equipo_id:
+        query = query.filter(model.equipo_id == equipo_id)
+    return query
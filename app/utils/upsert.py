@@ -0,0 +1,57 @@
+"""``INSERT ... ON CONFLICT DO UPDATE`` para contadores acumulados."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+
+def _dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def increment_counters(
+    conn: Connection,
+    table: Table,
+    values: list[dict[str, Any]],
+    *,
+    key: Sequence[str],
+    counters: Iterable[str],
+    replace: Iterable[str] = (),
+) -> None:
+    """Suma ``counters`` de cada fila de ``values`` a la fila con la misma ``key``.
+
+    Si la fila no existe se inserta tal cual. Las columnas de ``replace`` se
+    sobrescriben con el valor nuevo. En SQLite y PostgreSQL es una sola
+    sentencia; en otros motores, un ``UPDATE`` (o ``INSERT``) por fila.
+    """
+
+    if not values:
+        return
+    counters = tuple(counters)
+    replace = tuple(replace)
+
+    dialect_insert = _dialect_insert(conn.dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(table)
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in counters}
+        set_.update({name: stmt.excluded[name] for name in replace})
+        conn.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=set_), values)
+        return
+
+    for value in values:
+        set_ = {name: table.c[name] + value[name] for name in counters}
+        set_.update({name: value[name] for name in replace})
+        updated = conn.execute(
+            table.update().where(*(table.c[name] == value[name] for name in key)).values(**set_)
+        )
+        if not updated.rowcount:
+            conn.execute(table.insert(), value)
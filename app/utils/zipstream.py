@@ -0,0 +1,101 @@
+"""Zip generado al vuelo, por bloques y sin archivos temporales.
+
+``zipfile`` acepta destinos no posicionables (sin ``seek``): escribe cada
+entrada con *data descriptor* y el directorio central al final. ``iter_zip``
+le da un destino que sólo acumula los bytes escritos y los entrega después de
+cada bloque, así la memoria queda acotada a ``chunk_size`` sin importar
+cuántos archivos ni de qué tamaño.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import zipfile
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from app.utils.files import IMG_EXTENSIONS, PDF_EXTENSIONS, VIDEO_EXTENSIONS
+
+CHUNK_SIZE = 1024 * 1024
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# Formatos ya comprimidos: deflate sólo gastaría CPU.
+STORED_EXTENSIONS = frozenset(IMG_EXTENSIONS + PDF_EXTENSIONS + VIDEO_EXTENSIONS + (".zip", ".gz"))
+
+
+class _Sink(io.RawIOBase):
+    """Destino sólo de escritura que guarda lo escrito hasta que se drena."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def compression_for(name: str) -> int:
+    ext = os.path.splitext(name.lower())[1]
+    return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def unique_arcname(name: str, used: set[str]) -> str:
+    """Devuelve ``name`` o ``name (2)``, ``name (3)``… si ya está en ``used``."""
+
+    candidate = name
+    stem, ext = os.path.splitext(name)
+    counter = 2
+    while candidate in used:
+        candidate = f"{stem} ({counter}){ext}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def iter_zip(
+    entries: Iterable[tuple[str, str]], *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Genera los bytes de un zip con ``entries`` (``(nombre_en_zip, ruta)``).
+
+    Los archivos que ya no existen en disco se omiten.
+    """
+
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as bundle:
+        for arcname, path in entries:
+            try:
+                stat = os.stat(path)
+                source = open(path, "rb")
+            except OSError:
+                continue
+            with source:
+                mtime = datetime.fromtimestamp(stat.st_mtime).timetuple()[:6]
+                info = zipfile.ZipInfo(arcname, max(mtime, _ZIP_EPOCH))
+                info.compress_type = compression_for(arcname)
+                info.file_size = stat.st_size
+                with bundle.open(info, "w", force_zip64=stat.st_size >= zipfile.ZIP64_LIMIT) as dest:
+                    for chunk in iter(lambda: source.read(chunk_size), b""):
+                        dest.write(chunk)
+                        if sink.pending >= chunk_size:
+                            yield sink.drain()
+            if sink.pending:
+                yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,44 @@
+"""store size, mimetype, categoria and sha256 on archivos"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251017_archivos_metadata"
+down_revision = "a76a13d31500"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "archivos" not in inspector.get_table_names():
+        op.create_table(
+            "archivos",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("tabla", sa.String(length=64), nullable=False),
+            sa.Column("registro_id", sa.Integer(), nullable=False),
+            sa.Column("filename", sa.String(length=255), nullable=False),
+            sa.Column("path", sa.String(length=500), nullable=False),
+            sa.Column("subido_en", sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        )
+
+    with op.batch_alter_table("archivos") as batch:
+        batch.add_column(sa.Column("size", sa.BigInteger(), nullable=True))
+        batch.add_column(sa.Column("mimetype", sa.String(length=128), nullable=True))
+        batch.add_column(sa.Column("categoria", sa.String(length=16), nullable=True))
+        batch.add_column(sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.create_index("ix_archivos_sha256", "archivos", ["sha256"])
+    op.create_index("ix_archivos_tabla_registro", "archivos", ["tabla", "registro_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_archivos_tabla_registro", table_name="archivos")
+    op.drop_index("ix_archivos_sha256", table_name="archivos")
+    with op.batch_alter_table("archivos") as batch:
+        batch.drop_column("sha256")
+        batch.drop_column("categoria")
+        batch.drop_column("mimetype")
+        batch.drop_column("size")
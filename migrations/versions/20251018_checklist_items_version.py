@@ -0,0 +1,38 @@
+"""add items_version to checklist_templates"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251018_checklist_items_version"
+down_revision = "20251017_archivos_metadata"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return False
+    return column in {c["name"] for c in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "checklist_templates" not in inspector.get_table_names():
+        return
+    if _has_column("checklist_templates", "items_version"):
+        return
+    with op.batch_alter_table("checklist_templates") as batch:
+        batch.add_column(
+            sa.Column("items_version", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade() -> None:
+    if not _has_column("checklist_templates", "items_version"):
+        return
+    with op.batch_alter_table("checklist_templates") as batch:
+        batch.drop_column("items_version")
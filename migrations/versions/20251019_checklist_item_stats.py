@@ -0,0 +1,40 @@
+"""create checklist_item_stats aggregate table"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251019_checklist_item_stats"
+down_revision = "20251019_sync_receipts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "checklist_item_stats" in inspector.get_table_names():
+        return
+    op.create_table(
+        "checklist_item_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("equipo_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fecha", sa.Date(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ok", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("fail", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("item_id", "equipo_id", "fecha", name="uq_checklist_item_stats_key"),
+    )
+    op.create_index(
+        "ix_checklist_item_stats_template_fecha",
+        "checklist_item_stats",
+        ["template_id", "fecha"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_checklist_item_stats_template_fecha", table_name="checklist_item_stats")
+    op.drop_table("checklist_item_stats")
@@ -0,0 +1,31 @@
+"""create sync_receipts for idempotent field sync"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251019_sync_receipts"
+down_revision = "20251018_checklist_items_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "sync_receipts" in inspector.get_table_names():
+        return
+    op.create_table(
+        "sync_receipts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("client_key", sa.String(length=64), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("record_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("client_key", name="uq_sync_receipts_client_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_receipts")
@@ -0,0 +1,33 @@
+"""create storage_usage accounting table"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251020_storage_usage"
+down_revision = "20251020_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "storage_usage" in inspector.get_table_names():
+        return
+    op.create_table(
+        "storage_usage",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("scope", sa.String(length=16), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("categoria", sa.String(length=16), nullable=False),
+        sa.Column("bytes", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("files", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("scope", "scope_id", "categoria", name="uq_storage_usage_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("storage_usage")
@@ -0,0 +1,59 @@
+"""trigram indexes for equipos/operadores lookups (pg_trgm or FTS5 trigram)"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20251021_lookup_trgm"
+down_revision = "20251021_search_index"
+branch_labels = None
+depends_on = None
+
+LOOKUPS = (
+    ("equipos", ("codigo", "tipo", "marca")),
+    ("operadores", ("nombre", "doc_id", "notas")),
+)
+
+
+def _expression(columns, prefix: str = "") -> str:
+    joined = " || ' ' || ".join(f"coalesce({prefix}{c}, '')" for c in columns)
+    return f"lower({joined})"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, columns in LOOKUPS:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_trgm ON {table} "
+                f"USING gin (({_expression(columns)}) gin_trgm_ops)"
+            )
+    elif dialect == "sqlite":
+        for table, columns in LOOKUPS:
+            fts = f"{table}_trgm"
+            insert_new = f"INSERT INTO {fts}(rowid, body) VALUES (new.id, {_expression(columns, 'new.')});"
+            delete_old = f"DELETE FROM {fts} WHERE rowid = old.id;"
+            op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(body, tokenize = 'trigram')")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END")
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END")
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+                f"AFTER UPDATE OF {', '.join(columns)} ON {table} "
+                f"BEGIN {delete_old} {insert_new} END"
+            )
+            op.execute(
+                f"INSERT OR REPLACE INTO {fts}(rowid, body) SELECT id, {_expression(columns)} FROM {table}"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, _ in LOOKUPS:
+        if dialect == "postgresql":
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_trgm")
+        elif dialect == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_trgm_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_trgm")
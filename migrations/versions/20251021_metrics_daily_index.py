@@ -0,0 +1,27 @@
+"""index metrics_daily by project, kpi and date"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251021_metrics_daily_index"
+down_revision = "20251020_storage_usage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {ix["name"] for ix in inspector.get_indexes("metrics_daily")}
+    if "ix_metrics_daily_project_kpi_date" not in existing:
+        op.create_index(
+            "ix_metrics_daily_project_kpi_date",
+            "metrics_daily",
+            ["project_id", "kpi_name", "date"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_metrics_daily_project_kpi_date", table_name="metrics_daily")
@@ -0,0 +1,76 @@
+"""full-text search indexes (GIN on PostgreSQL, FTS5 on SQLite)"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20251021_search_index"
+down_revision = "20251021_metrics_daily_index"
+branch_labels = None
+depends_on = None
+
+SOURCES = (
+    ("bitacoras", 1, "coalesce({p}text, '')"),
+    (
+        "partes_diarias",
+        2,
+        "coalesce({p}actividad, '') || ' ' || coalesce({p}incidencias, '') || ' ' || coalesce({p}notas, '')",
+    ),
+    ("checklist_answers", 3, "coalesce({p}comentario, '')"),
+)
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts "
+        "USING fts5(body, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    for table, code, body in SOURCES:
+        new_body = body.format(p="new.")
+        insert_new = (
+            f"INSERT INTO search_fts(rowid, body) "
+            f"SELECT new.id * 4 + {code}, {new_body} WHERE trim({new_body}) <> '';"
+        )
+        delete_old = f"DELETE FROM search_fts WHERE rowid = old.id * 4 + {code};"
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} "
+            f"BEGIN {insert_new} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete_old} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE ON {table} "
+            f"BEGIN {delete_old} {insert_new} END"
+        )
+        plain = body.format(p="")
+        op.execute(
+            f"INSERT OR REPLACE INTO search_fts(rowid, body) "
+            f"SELECT id * 4 + {code}, {plain} FROM {table} WHERE trim({plain}) <> ''"
+        )
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        _upgrade_sqlite()
+    elif dialect == "postgresql":
+        for table, _, body in SOURCES:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} "
+                f"USING gin (to_tsvector('spanish', {body.format(p='')}))"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table, _, _ in SOURCES:
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS search_{table}_{suffix}")
+        op.execute("DROP TABLE IF EXISTS search_fts")
+    elif dialect == "postgresql":
+        for table, _, _ in SOURCES:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_fts")
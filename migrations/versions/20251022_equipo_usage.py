@@ -0,0 +1,48 @@
+"""denormalized usage counters on equipos (hours, partes, incidencias, last parte)"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251022_equipo_usage"
+down_revision = "20251021_lookup_trgm"
+branch_labels = None
+depends_on = None
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("horas_trabajadas", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("partes_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("incidencias_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ultimo_parte", sa.Date(), nullable=True),
+    ]
+
+
+BACKFILL = """
+UPDATE equipos SET
+    horas_trabajadas = coalesce((SELECT sum(p.horas_trabajo) FROM partes_diarias p WHERE p.equipo_id = equipos.id), 0),
+    partes_count = (SELECT count(*) FROM partes_diarias p WHERE p.equipo_id = equipos.id),
+    incidencias_count = (
+        SELECT count(*) FROM partes_diarias p
+        WHERE p.equipo_id = equipos.id AND trim(coalesce(p.incidencias, '')) <> ''
+    ),
+    ultimo_parte = (SELECT max(p.fecha) FROM partes_diarias p WHERE p.equipo_id = equipos.id)
+"""
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("equipos")}
+    with op.batch_alter_table("equipos") as batch:
+        for column in _columns():
+            if column.name not in existing:
+                batch.add_column(column)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("equipos") as batch:
+        for column in reversed(_columns()):
+            batch.drop_column(column.name)
@@ -0,0 +1,34 @@
+"""index partes_diarias by equipo/operador, fecha and id for the detail history"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20251022_partes_history_index"
+down_revision = "20251022_equipo_usage"
+branch_labels = None
+depends_on = None
+
+# (índice nuevo, columna, índice de una columna que queda cubierto)
+INDEXES = (
+    ("ix_partes_diarias_equipo_fecha", "equipo_id", "ix_partes_diarias_equipo_id"),
+    ("ix_partes_diarias_operador_fecha", "operador_id", "ix_partes_diarias_operador_id"),
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {ix["name"] for ix in inspector.get_indexes("partes_diarias")}
+    for name, column, superseded in INDEXES:
+        if name not in existing:
+            op.create_index(name, "partes_diarias", [column, "fecha", "id"])
+        if superseded in existing:
+            op.drop_index(superseded, table_name="partes_diarias")
+
+
+def downgrade() -> None:
+    for name, column, superseded in INDEXES:
+        op.create_index(superseded, "partes_diarias", [column])
+        op.drop_index(name, table_name="partes_diarias")
@@ -0,0 +1,45 @@
+from datetime import date
+
+
+def _setup(db):
+    from app.models.checklist import ChecklistItem, ChecklistTemplate
+
+    t = ChecklistTemplate(nombre="Diario")
+    db.session.add(t)
+    db.session.flush()
+    casco = ChecklistItem(template_id=t.id, texto="Casco", tipo="bool", orden=1)
+    luces = ChecklistItem(template_id=t.id, texto="Luces", tipo="bool", orden=2)
+    db.session.add_all([casco, luces])
+    db.session.commit()
+    return t, casco, luces
+
+
+def test_stats_follow_submitted_runs(client, app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistItemStat
+    from app.services.checklist_stats import rebuild_stats
+
+    t, casco, luces = _setup(db)
+    today = date.today().isoformat()
+    for luces_ok in (False, False, True):
+        form = {"template_id": t.id, "fecha": today, f"item_{casco.id}": "on"}
+        if luces_ok:
+            form[f"item_{luces.id}"] = "on"
+        assert client.post("/checklists/ejecutar", data=form).status_code == 302
+
+    body = client.get(f"/checklists/templates/{t.id}/stats.json").get_json()
+    first, second = body["items"]
+    assert (first["texto"], first["answered"], first["fail"]) == ("Luces", 3, 2)
+    assert first["fail_rate"] == 66.7
+    assert (second["texto"], second["ok"], second["fail"]) == ("Casco", 3, 0)
+
+    incremental = sorted(
+        (s.item_id, s.answered, s.ok, s.fail) for s in ChecklistItemStat.query.all()
+    )
+    rebuild_stats()
+    rebuilt = sorted((s.item_id, s.answered, s.ok, s.fail) for s in ChecklistItemStat.query.all())
+    assert incremental == rebuilt
+
+    page = client.get(f"/checklists/templates/{t.id}/stats")
+    assert page.status_code == 200
+    assert "66.7%" in page.get_data(as_text=True)
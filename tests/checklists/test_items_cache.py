@@ -0,0 +1,87 @@
+from datetime import date
+
+from sqlalchemy import event
+
+
+def _template(db, n_items):
+    from app.models.checklist import ChecklistItem, ChecklistTemplate
+
+    t = ChecklistTemplate(nombre="Diario", norma="NOM-017-STPS")
+    db.session.add(t)
+    db.session.flush()
+    for i in range(n_items):
+        tipo = "bool" if i % 2 == 0 else "text"
+        db.session.add(ChecklistItem(template_id=t.id, texto=f"Ítem {i}", tipo=tipo, orden=i))
+    db.session.commit()
+    return t
+
+
+def test_ejecutar_bulk_inserts_answers(client, app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistAnswer, ChecklistRun
+
+    t = _template(db, 200)
+    items = t.items
+    form = {"template_id": t.id, "fecha": date.today().isoformat()}
+    for it in items:
+        form[f"item_{it.id}"] = "on" if it.orden % 4 == 0 else "respuesta"
+
+    inserts = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO CHECKLIST_ANSWERS"):
+            inserts.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        r = client.post("/checklists/ejecutar", data=form)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+
+    assert r.status_code == 302
+    assert len(inserts) == 1
+    run = ChecklistRun.query.one()
+    assert ChecklistAnswer.query.filter_by(run_id=run.id).count() == 200
+    assert run.pct_ok == 50.0
+
+
+def test_items_cache_is_versioned_on_edit(client, app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistItem
+    from app.services.checklist_cache import template_items
+
+    t = _template(db, 2)
+    version = t.items_version
+    assert [it.texto for it in template_items(t)] == ["Ítem 0", "Ítem 1"]
+
+    client.post(
+        f"/checklists/templates/{t.id}/items/add",
+        data={"texto": "Extintor", "tipo": "bool", "orden": 5},
+    )
+    db.session.refresh(t)
+    assert t.items_version > version
+    assert [it.texto for it in template_items(t)][-1] == "Extintor"
+
+    first = ChecklistItem.query.filter_by(template_id=t.id, orden=0).one()
+    client.post(f"/checklists/templates/{t.id}/items/{first.id}/delete")
+    db.session.refresh(t)
+    assert [it.texto for it in template_items(t)] == ["Ítem 1", "Extintor"]
+
+
+def test_items_version_is_incremented_by_the_database(app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistItem, ChecklistTemplate
+
+    t = _template(db, 1)
+    assert t.items_version is not None
+    stale = t.items_version
+    # Otro proceso ya subió la versión; esta sesión conserva el valor viejo.
+    db.session.execute(
+        db.update(ChecklistTemplate)
+        .where(ChecklistTemplate.id == t.id)
+        .values(items_version=stale + 5)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.add(ChecklistItem(template_id=t.id, texto="Nuevo", tipo="bool", orden=9))
+    db.session.commit()
+    assert t.items_version == stale + 6
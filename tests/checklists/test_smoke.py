@@ -30,7 +30,7 @@ def test_run_pdf_smoke(client, monkeypatch):
     db.session.add(
         ChecklistAnswer(
             run_id=run.id,
-            item_id=t.items.first().id,
+            item_id=t.items[0].id,
             valor_bool=True,
         )
     )
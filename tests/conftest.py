@@ -13,6 +13,7 @@ os.environ.setdefault("SECRET_KEY", "test")
 os.environ.setdefault("APP_ENV", "testing")
 
 from app import create_app, db  # noqa: E402
+from app.utils.cache import clear_all as clear_caches  # noqa: E402
 
 
 @pytest.fixture()
@@ -24,8 +25,16 @@ def app():
         yield app
         db.session.remove()
         db.drop_all()
+    clear_caches()
 
 
 @pytest.fixture()
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture()
+def admin_client(client):
+    with client.session_transaction() as sess:
+        sess["user"] = {"id": 1, "role": "admin"}
+    return client
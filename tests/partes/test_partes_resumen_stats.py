@@ -0,0 +1,50 @@
+from datetime import date
+
+
+def test_resumen_aggregates_respect_filters(client, monkeypatch):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    monkeypatch.setenv("DISABLE_SECURITY", "1")
+    db.session.add_all(
+        [
+            ParteDiaria(fecha=date(2025, 3, 1), horas_trabajo=2.0, incidencias="Fuga"),
+            ParteDiaria(fecha=date(2025, 3, 2), horas_trabajo=3.5, incidencias="  "),
+            ParteDiaria(fecha=date(2025, 3, 3), horas_trabajo=4.0, incidencias=None),
+            ParteDiaria(fecha=date(2024, 1, 1), horas_trabajo=9.0, incidencias="Fuera"),
+        ]
+    )
+    db.session.commit()
+
+    r = client.get("/partes/resumen?desde=2025-03-01&hasta=2025-03-31")
+    assert r.status_code == 200
+    html = r.data.decode("utf-8")
+    assert "9.50" in html
+
+    from app.blueprints.partes.routes import _resumen_stats
+
+    stats = _resumen_stats({"desde": date(2025, 3, 1), "hasta": None, "equipo_id": None})
+    assert stats == (3, 9.5, 1)
+
+
+def test_checklists_resumen_avg_is_filtered(client, monkeypatch):
+    from app.blueprints.checklists.routes import _resumen_stats
+    from app.extensions import db
+    from app.models.checklist import ChecklistRun, ChecklistTemplate
+
+    monkeypatch.setenv("DISABLE_SECURITY", "1")
+    t = ChecklistTemplate(nombre="Diario")
+    db.session.add(t)
+    db.session.flush()
+    db.session.add_all(
+        [
+            ChecklistRun(template_id=t.id, fecha=date(2025, 3, 1), pct_ok=50.0),
+            ChecklistRun(template_id=t.id, fecha=date(2025, 3, 2), pct_ok=100.0),
+            ChecklistRun(template_id=t.id, fecha=date(2024, 1, 1), pct_ok=0.0),
+        ]
+    )
+    db.session.commit()
+
+    assert _resumen_stats({"desde": date(2025, 1, 1), "hasta": None, "equipo_id": None}) == (2, 75.0)
+    r = client.get("/checklists/resumen.pdf?desde=2025-01-01")
+    assert r.status_code == 200
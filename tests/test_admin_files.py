@@ -0,0 +1,54 @@
+def _tree(root):
+    (root / "proyectos" / "obra-1").mkdir(parents=True)
+    (root / "proyectos" / "obra-1" / "plano.pdf").write_bytes(b"x" * 300)
+    (root / "proyectos" / "leeme.txt").write_bytes(b"y" * 20)
+    for i in range(5):
+        (root / f"f{i}.txt").write_bytes(b"z")
+
+
+def test_files_browser_lists_one_directory_per_page(admin_client, app, tmp_path):
+    _tree(tmp_path)
+    app.config["DATA_DIR"] = str(tmp_path)
+    from app.blueprints.admin import routes
+
+    routes.FILES_PER_PAGE = 3
+    try:
+        r = admin_client.get("/admin/files")
+        html = r.get_data(as_text=True)
+        assert r.status_code == 200
+        assert "proyectos/" in html and "f1.txt" in html
+        assert "plano.pdf" not in html  # los subdirectorios se expanden al navegar
+        assert "Página 1 de 2" in html
+
+        html = admin_client.get("/admin/files?page=2").get_data(as_text=True)
+        assert "f4.txt" in html and "proyectos/" not in html
+
+        html = admin_client.get("/admin/files?path=proyectos").get_data(as_text=True)
+        assert "obra-1/" in html and "leeme.txt" in html
+
+        r = admin_client.get("/admin/files?path=../../etc")
+        assert r.status_code == 302
+    finally:
+        routes.FILES_PER_PAGE = 100
+
+
+def test_size_index_built_by_worker_shows_directory_totals(admin_client, app, tmp_path):
+    from app.services import file_browser
+    from app.services.jobs import run_pending
+
+    _tree(tmp_path)
+    app.config["DATA_DIR"] = str(tmp_path)
+    assert file_browser.list_directory("")["indexed_at"] is None
+
+    admin_client.post("/admin/files/reindex")
+    run_pending()
+
+    listing = file_browser.list_directory("")
+    assert listing["dir_size"] == [325, 7]
+    proyectos = next(it for it in listing["items"] if it["name"] == "proyectos")
+    assert (proyectos["size"], proyectos["files"]) == (320, 2)
+
+    # Un archivo nuevo aparece sin esperar al índice (cambia el mtime del directorio).
+    (tmp_path / "nuevo.txt").write_text("n")
+    names = [it["name"] for it in file_browser.list_directory("")["items"]]
+    assert "nuevo.txt" in names
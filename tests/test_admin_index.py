@@ -0,0 +1,26 @@
+def test_admin_index_kpis_are_aggregated_and_projects_paginated(admin_client, app, monkeypatch):
+    from app.blueprints.admin import routes
+    from app.extensions import db
+    from app.models import Project
+
+    for i in range(5):
+        db.session.add(
+            Project(name=f"Obra {i}", progress=10.0 * i, budget=1000.0, spent=100.0 * i)
+        )
+    db.session.commit()
+    monkeypatch.setattr(routes, "PROJECTS_PER_PAGE", 2)
+    html = admin_client.get("/admin/").get_data(as_text=True)
+    assert "$5,000" in html and "$1,000" in html and "20.0%" in html
+    assert "Obra 0" in html and "Obra 2" not in html
+    assert "Página 1 de 3" in html
+
+    html = admin_client.get("/admin/?page=3").get_data(as_text=True)
+    assert "Obra 4" in html and "Obra 0" not in html
+
+    # Editar un proyecto invalida la caché de KPIs y de páginas.
+    project = Project.query.filter_by(name="Obra 4").one()
+    project.name = "Obra A"
+    project.spent = 1000.0
+    db.session.commit()
+    html = admin_client.get("/admin/?page=3").get_data(as_text=True)
+    assert "Obra A" in html and "$1,600" in html
@@ -0,0 +1,73 @@
+import hashlib
+import io
+import os
+
+
+def _upload(client, content, name="foto.jpg"):
+    return client.post(
+        "/archivos/upload",
+        data={"parte_id": "3", "file": (io.BytesIO(content), name)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_identical_uploads_share_one_sharded_blob(client, app, tmp_path):
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services.jobs import run_pending
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    content = os.urandom(4096)
+    sha = hashlib.sha256(content).hexdigest()
+
+    _upload(client, content, "a.jpg")
+    _upload(client, content, "b.jpg")
+
+    rows = ArchivoAdjunto.query.order_by(ArchivoAdjunto.id).all()
+    assert [r.filename for r in rows] == ["a.jpg", "b.jpg"]
+    expected = os.path.join(os.path.realpath(tmp_path), "blobs", sha[:2], sha[2:4], sha)
+    assert {r.path for r in rows} == {expected}
+
+    # Borrar una evidencia conserva el blob mientras la otra lo use.
+    os.utime(expected, (0, 0))
+    client.post(f"/archivos/{rows[0].id}/delete")
+    run_pending()
+    assert os.path.exists(expected)
+    client.post(f"/archivos/{rows[1].id}/delete")
+    assert os.path.exists(expected)  # el borrado lo hace el worker
+    run_pending()
+    assert not os.path.exists(expected)
+    assert not os.path.exists(os.path.dirname(expected))
+
+
+def test_storage_migrate_moves_flat_files_into_blobs(app, tmp_path):
+    from app.extensions import db
+    from app.models.parte_diaria import ArchivoAdjunto
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    same = b"mismo contenido"
+    paths = []
+    for i, content in enumerate([same, same, b"otro"]):
+        path = tmp_path / f"2025010100000{i}_foto.jpg"
+        path.write_bytes(content)
+        paths.append(str(path))
+        db.session.add(
+            ArchivoAdjunto(tabla="partes_diarias", registro_id=1, filename=path.name, path=str(path))
+        )
+    db.session.add(
+        ArchivoAdjunto(tabla="partes_diarias", registro_id=1, filename="x", path=str(tmp_path / "no"))
+    )
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["storage-migrate", "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "'migrated': 3" in result.output and "'missing': 1" in result.output
+
+    rows = ArchivoAdjunto.query.order_by(ArchivoAdjunto.id).limit(3).all()
+    assert rows[0].path == rows[1].path != rows[2].path
+    assert rows[0].sha256 == hashlib.sha256(same).hexdigest()
+    with open(rows[2].path, "rb") as fh:
+        assert fh.read() == b"otro"
+    assert not any(os.path.exists(p) for p in paths)
+
+    again = app.test_cli_runner().invoke(args=["storage-migrate"])
+    assert "'migrated': 0" in again.output and "'skipped': 3" in again.output
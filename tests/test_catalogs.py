@@ -0,0 +1,48 @@
+def test_catalog_endpoint_uses_etag_and_follows_writes(client, app):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+
+    db.session.add(Equipo(codigo="EXC-01", tipo="Excavadora"))
+    db.session.commit()
+
+    r = client.get("/api/v1/catalogs/equipos")
+    assert r.status_code == 200
+    assert r.get_json()["items"][0]["label"] == "EXC-01"
+    etag = r.headers["ETag"]
+    assert "max-age=60" in r.headers["Cache-Control"]
+
+    assert client.get("/api/v1/catalogs/equipos", headers={"If-None-Match": etag}).status_code == 304
+
+    db.session.add(Equipo(codigo="GRU-07", tipo="Grúa"))
+    db.session.commit()
+    r = client.get("/api/v1/catalogs/equipos", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    assert [i["label"] for i in r.get_json()["items"]] == ["GRU-07", "EXC-01"]
+
+    assert client.get("/api/v1/catalogs/nope").status_code == 404
+
+
+def test_forms_reuse_cached_catalogs(client, app):
+    from sqlalchemy import event
+
+    from app.extensions import db
+    from app.models.checklist import ChecklistTemplate
+
+    db.session.add(ChecklistTemplate(nombre="Diario", norma="NOM-031"))
+    db.session.commit()
+    assert "Diario (NOM-031)" in client.get("/checklists/ejecutar").get_data(as_text=True)
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _count)
+    try:
+        client.get("/checklists/ejecutar")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _count)
+    assert not any(
+        "FROM equipos" in s or "FROM operadores" in s or "FROM checklist_templates" in s
+        for s in statements
+    )
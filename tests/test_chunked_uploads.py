@@ -0,0 +1,56 @@
+import hashlib
+import os
+
+
+def _create(client, content, filename="inspeccion.mp4", parte_id=None):
+    r = client.post(
+        "/archivos/uploads",
+        json={"filename": filename, "length": len(content), "parte_id": parte_id},
+    )
+    assert r.status_code == 201
+    return r.headers["Location"]
+
+
+def test_chunked_upload_resumes_and_finalizes(client, app, tmp_path):
+    from app.extensions import db
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services import uploads
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    content = os.urandom(300_000)
+    url = _create(client, content, parte_id=7)
+
+    r = client.patch(url, data=content[:100_000], headers={"Upload-Offset": "0"})
+    assert r.headers["Upload-Offset"] == "100000"
+
+    # Un reintento con un desplazamiento viejo se rechaza e informa el correcto.
+    stale = client.patch(url, data=content[:100_000], headers={"Upload-Offset": "0"})
+    assert stale.status_code == 409
+    assert stale.headers["Upload-Offset"] == "100000"
+
+    # Otro worker: sin el hash en memoria se reconstruye desde disco.
+    uploads._digests.clear()
+    assert client.head(url).headers["Upload-Offset"] == "100000"
+    r = client.patch(url, data=content[100_000:], headers={"Upload-Offset": "100000"})
+    assert r.get_json()["complete"] is True
+
+    r = client.post(f"{url}/finalize")
+    assert r.status_code == 201
+    body = r.get_json()
+    assert body["sha256"] == hashlib.sha256(content).hexdigest()
+
+    adjunto = db.session.get(ArchivoAdjunto, body["id"])
+    assert (adjunto.tabla, adjunto.registro_id, adjunto.size) == ("partes_diarias", 7, 300_000)
+    with open(adjunto.path, "rb") as fh:
+        assert fh.read() == content
+    assert client.head(url).status_code == 404
+
+
+def test_chunked_upload_rejects_extra_bytes_and_bad_extension(client, app):
+    url = _create(client, b"12345", filename="foto.jpg")
+    r = client.patch(url, data=b"123456", headers={"Upload-Offset": "0"})
+    assert r.status_code == 413
+    assert client.head(url).headers["Upload-Offset"] == "0"
+
+    r = client.post("/archivos/uploads", json={"filename": "script.exe", "length": 10})
+    assert r.status_code == 400
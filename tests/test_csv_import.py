@@ -0,0 +1,130 @@
+import io
+
+
+def test_import_upserts_by_natural_key_and_reports_errors(app):
+    from app.models.equipo import Equipo
+    from app.services.catalogs import equipos_catalog
+    from app.services.csv_import import import_csv
+
+    assert equipos_catalog() == ()
+    report = import_csv(
+        "equipos",
+        io.StringIO(
+            "codigo;tipo;marca;horas_uso\n"
+            "EXC-01;Excavadora;CAT;1200,5\n"
+            "GRU-07;Grúa;;\n"
+            ";Draga;IHC;\n"
+            "DRA-09;Draga;IHC;mucho\n"
+            "EXC-01;Excavadora;Caterpillar;1300\n"
+            "DRA-10;Draga;IHC;nan\n"
+            "DRA-11;Draga;IHC;inf\n"
+            "DRA-12;Draga;IHC;-5\n"
+        ),
+        batch_size=2,
+    )
+    assert (report["rows"], report["inserted"], report["updated"], report["errors"]) == (8, 2, 1, 5)
+    assert [e["line"] for e in report["error_rows"]] == [4, 5, 7, 8, 9]
+    assert all("horas_uso" in e["error"] for e in report["error_rows"][1:])
+
+    exc = Equipo.query.filter_by(codigo="EXC-01").one()
+    assert (exc.marca, exc.horas_uso) == ("Caterpillar", 1300.0)
+    assert Equipo.query.filter_by(codigo="GRU-07").one().status == "activo"
+    # Las escrituras por lotes invalidan el catálogo de los formularios.
+    assert {o.codigo for o in equipos_catalog()} == {"EXC-01", "GRU-07"}
+
+    again = import_csv("equipos", io.StringIO("codigo,tipo\nEXC-01,Excavadora\n"))
+    assert (again["inserted"], again["updated"]) == (0, 1)
+    assert Equipo.query.filter_by(codigo="EXC-01").one().marca == "Caterpillar"
+
+
+def test_import_partes_resolves_references(app, tmp_path):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+    from app.models.operador import Operador
+    from app.models.parte_diaria import ParteDiaria
+
+    db.session.add_all([Equipo(codigo="EXC-01", tipo="Excavadora"), Operador(nombre="Ana", doc_id="D1")])
+    db.session.commit()
+    path = tmp_path / "partes.csv"
+    path.write_text(
+        "﻿fecha,equipo,operador,horas_trabajo,actividad\n"
+        "2025-01-02,EXC-01,D1,8,Dragado\n"
+        "03/01/2025,EXC-01,,,\"Carga,\nmultilínea\"\n"
+        "2025-01-04,NOPE,D1,4,x\n",
+        encoding="utf-8",
+    )
+    result = app.test_cli_runner().invoke(args=["import-csv", "partes", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "3 filas, 2 nuevas, 0 actualizadas, 1 con error" in result.output
+    assert "Línea 5: equipo desconocido" in result.output
+
+    partes = ParteDiaria.query.order_by(ParteDiaria.fecha).all()
+    assert [(p.equipo_id is not None, p.operador_id is not None, p.horas_trabajo) for p in partes] == [
+        (True, True, 8.0),
+        (True, False, 0.0),
+    ]
+    assert partes[1].actividad == "Carga,\nmultilínea"
+
+    bad = app.test_cli_runner().invoke(args=["import-csv", "operadores", str(path)])
+    assert bad.exit_code != 0 and "Faltan columnas obligatorias: doc_id, nombre" in bad.output
+
+
+def test_admin_import_endpoint(admin_client, app):
+    assert "Importar CSV" in admin_client.get("/admin/import").get_data(as_text=True)
+
+    data = {
+        "entity": "operadores",
+        "file": (io.BytesIO("doc_id,nombre\nD1,Ana Pérez\n".encode()), "ops.csv"),
+    }
+    r = admin_client.post("/admin/import?format=json", data=data, content_type="multipart/form-data")
+    assert r.get_json()["inserted"] == 1
+
+    r = admin_client.post(
+        "/admin/import?format=json",
+        data={"entity": "x", "file": (io.BytesIO(b"a\n1\n"), "x.csv")},
+        content_type="multipart/form-data",
+    )
+    assert r.status_code == 400 and "Entidad desconocida" in r.get_json()["error"]
+
+
+def test_blank_cells_keep_stored_values_on_update(app):
+    from app.models.equipo import Equipo
+    from app.services.csv_import import import_csv
+
+    import_csv("equipos", io.StringIO("codigo,tipo,marca,status,horas_uso\nEXC-01,Excavadora,CAT,baja,1200\n"))
+    report = import_csv(
+        "equipos",
+        io.StringIO(
+            "codigo,tipo,marca,status,horas_uso\n"
+            "EXC-01,Excavadora,,,\n"
+            "NEW-01,Grúa,,,\n"
+            "NEW-01,Grúa,Liebherr,,\n"
+            "NEW-01,Grúa,,,50\n"
+        ),
+    )
+    assert (report["inserted"], report["updated"], report["errors"]) == (1, 1, 0)
+
+    exc = Equipo.query.filter_by(codigo="EXC-01").one()
+    assert (exc.marca, exc.status, exc.horas_uso) == ("CAT", "baja", 1200.0)
+    # Las filas nuevas sí toman los defaults; repetidas, se combinan sus celdas.
+    new = Equipo.query.filter_by(codigo="NEW-01").one()
+    assert (new.marca, new.status, new.horas_uso) == ("Liebherr", "activo", 50.0)
+
+
+def test_duplicate_doc_id_in_database_is_a_row_error(app):
+    from app.extensions import db
+    from app.models.operador import Operador
+    from app.services.csv_import import import_csv
+
+    db.session.add_all([Operador(nombre="Ana", doc_id="D1"), Operador(nombre="Ana B.", doc_id="D1")])
+    db.session.commit()
+
+    report = import_csv("operadores", io.StringIO("doc_id,nombre\nD1,Ana Pérez\nD2,Luis\n"))
+    assert (report["inserted"], report["updated"], report["errors"]) == (1, 0, 1)
+    assert report["error_rows"] == [
+        {"line": 2, "error": "doc_id 'D1' corresponde a varios registros existentes"}
+    ]
+    assert sorted(o.nombre for o in Operador.query.filter_by(doc_id="D1")) == ["Ana", "Ana B."]
+
+    partes = import_csv("partes", io.StringIO("fecha,operador\n2025-01-02,D1\n"))
+    assert partes["errors"] == 1 and "ambiguo" in partes["error_rows"][0]["error"]
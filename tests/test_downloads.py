@@ -0,0 +1,45 @@
+import hashlib
+import io
+
+
+def _upload(client, app, tmp_path, content=b"0123456789" * 100):
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    client.post(
+        "/archivos/upload",
+        data={"file": (io.BytesIO(content), "acta.pdf")},
+        content_type="multipart/form-data",
+    )
+    from app.models.parte_diaria import ArchivoAdjunto
+
+    return ArchivoAdjunto.query.one(), content
+
+
+def test_download_supports_range_and_sha256_etag(client, app, tmp_path):
+    adjunto, content = _upload(client, app, tmp_path)
+    url = f"/archivos/{adjunto.id}/download"
+    etag = hashlib.sha256(content).hexdigest()
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.headers["ETag"] == f'"{etag}"'
+    assert "private" in full.headers["Cache-Control"]
+    assert "immutable" in full.headers["Cache-Control"]
+
+    partial = client.get(url, headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.data == content[10:20]
+
+    cached = client.get(url, headers={"If-None-Match": f'"{etag}"'})
+    assert cached.status_code == 304
+
+
+def test_download_offloads_to_nginx(client, app, tmp_path):
+    adjunto, _ = _upload(client, app, tmp_path)
+    app.config.update(FILE_OFFLOAD="x-accel", X_ACCEL_MAPPING=[f"{tmp_path}=/protected/"])
+
+    r = client.get(f"/archivos/{adjunto.id}/download")
+    assert r.status_code == 200
+    assert r.data == b""
+    sha = adjunto.sha256
+    assert r.headers["X-Accel-Redirect"] == f"/protected/blobs/{sha[:2]}/{sha[2:4]}/{sha}"
+    assert "acta.pdf" in r.headers["Content-Disposition"]
@@ -0,0 +1,98 @@
+import io
+from datetime import date
+
+
+def _usage(equipo_id):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+
+    db.session.expire_all()
+    eq = db.session.get(Equipo, equipo_id)
+    return (eq.horas_trabajadas, eq.partes_count, eq.incidencias_count, eq.ultimo_parte)
+
+
+def _equipos(*codigos):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+
+    equipos = [Equipo(codigo=c, tipo="Excavadora") for c in codigos]
+    db.session.add_all(equipos)
+    db.session.commit()
+    return [e.id for e in equipos]
+
+
+def test_orm_create_edit_delete_keep_counters(app):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    a, b = _equipos("EXC-01", "EXC-02")
+    assert _usage(a) == (0.0, 0, 0, None)
+
+    p1 = ParteDiaria(fecha=date(2025, 1, 2), equipo_id=a, horas_trabajo=8)
+    p2 = ParteDiaria(fecha=date(2025, 1, 5), equipo_id=a, horas_trabajo=4.5, incidencias="Fuga")
+    db.session.add_all([p1, p2])
+    db.session.commit()
+    assert _usage(a) == (12.5, 2, 1, date(2025, 1, 5))
+
+    # Editar horas e incidencias ajusta sólo la diferencia.
+    p1.horas_trabajo = 10
+    p1.incidencias = "  "
+    p2.incidencias = ""
+    db.session.commit()
+    assert _usage(a) == (14.5, 2, 0, date(2025, 1, 5))
+
+    # Mover el parte más reciente a otro equipo y a otra fecha.
+    p2.equipo_id = b
+    p2.fecha = date(2025, 2, 1)
+    db.session.commit()
+    assert _usage(a) == (10.0, 1, 0, date(2025, 1, 2))
+    assert _usage(b) == (4.5, 1, 0, date(2025, 2, 1))
+
+    db.session.delete(db.session.get(ParteDiaria, p1.id))
+    db.session.commit()
+    assert _usage(a) == (0.0, 0, 0, None)
+
+
+def test_bulk_writes_and_reconcile(app):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+    from app.services.csv_import import import_csv
+    from app.services.equipo_usage import reconcile_usage
+
+    (a,) = _equipos("EXC-01")
+    report = import_csv(
+        "partes",
+        io.StringIO(
+            "fecha,equipo,horas_trabajo,incidencias\n"
+            "2025-03-01,EXC-01,6,\n"
+            "2025-03-04,EXC-01,,Llanta ponchada\n"
+            "2025-03-02,,5,\n"
+        ),
+    )
+    assert report["inserted"] == 3
+    assert _usage(a) == (6.0, 2, 1, date(2025, 3, 4))
+    assert reconcile_usage() == {"equipos": 1, "corregidos": 0}
+
+    db.session.execute(db.update(Equipo).values(partes_count=99, ultimo_parte=None))
+    db.session.commit()
+    assert reconcile_usage(dry_run=True) == {"equipos": 1, "corregidos": 1}
+    assert _usage(a)[1] == 99
+
+    result = app.test_cli_runner().invoke(args=["equipos-usage-reconcile"])
+    assert result.exit_code == 0, result.output
+    assert "'corregidos': 1" in result.output
+    assert _usage(a) == (6.0, 2, 1, date(2025, 3, 4))
+
+
+def test_equipos_list_and_detail_show_usage(client):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    (a,) = _equipos("EXC-01")
+    db.session.add(ParteDiaria(fecha=date(2025, 4, 1), equipo_id=a, horas_trabajo=7.25))
+    db.session.commit()
+
+    html = client.get("/equipos/").get_data(as_text=True)
+    assert "Horas trabajadas" in html and "7.2" in html and "2025-04-01" in html
+    detalle = client.get(f"/equipos/{a}").get_data(as_text=True)
+    assert "Partes registrados: 1" in detalle
@@ -0,0 +1,55 @@
+import io
+import zipfile
+from datetime import date
+
+
+def _adjunto(tmp_path, tabla, registro_id, name, content):
+    from app.extensions import db
+    from app.models.parte_diaria import ArchivoAdjunto
+
+    path = tmp_path / f"{tabla}-{registro_id}-{len(content)}-{name}"
+    path.write_bytes(content)
+    db.session.add(ArchivoAdjunto(tabla=tabla, registro_id=registro_id, filename=name, path=str(path)))
+
+
+def test_zip_streams_parte_evidence_with_stored_images(client, app, tmp_path):
+    from app.extensions import db
+
+    text = b"linea de bitacora\n" * 500
+    _adjunto(tmp_path, "partes_diarias", 1, "foto.jpg", b"\xff\xd8" + b"x" * 5000)
+    _adjunto(tmp_path, "partes_diarias", 1, "foto.jpg", b"otra foto")
+    _adjunto(tmp_path, "partes_diarias", 1, "notas.txt", text)
+    _adjunto(tmp_path, "partes_diarias", 2, "ajeno.pdf", b"%PDF-1.4")
+    db.session.commit()
+
+    r = client.get("/archivos/zip?parte_id=1")
+    assert r.status_code == 200
+    assert r.mimetype == "application/zip"
+    assert r.is_streamed
+    assert "evidencias_parte_1.zip" in r.headers["Content-Disposition"]
+
+    bundle = zipfile.ZipFile(io.BytesIO(r.data))
+    assert bundle.testzip() is None
+    infos = {i.filename: i for i in bundle.infolist()}
+    assert set(infos) == {"parte_1/foto.jpg", "parte_1/foto (2).jpg", "parte_1/notas.txt"}
+    assert infos["parte_1/foto.jpg"].compress_type == zipfile.ZIP_STORED
+    assert infos["parte_1/notas.txt"].compress_type == zipfile.ZIP_DEFLATED
+    assert bundle.read("parte_1/notas.txt") == text
+
+
+def test_zip_by_date_range_and_requires_a_filter(client, app, tmp_path):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    db.session.add_all(
+        [ParteDiaria(id=1, fecha=date(2025, 1, 10)), ParteDiaria(id=2, fecha=date(2025, 3, 1))]
+    )
+    _adjunto(tmp_path, "partes_diarias", 1, "enero.pdf", b"%PDF-1")
+    _adjunto(tmp_path, "partes_diarias", 2, "marzo.pdf", b"%PDF-2")
+    db.session.commit()
+
+    assert client.get("/archivos/zip").status_code == 400
+
+    r = client.get("/archivos/zip?desde=2025-01-01&hasta=2025-01-31")
+    names = zipfile.ZipFile(io.BytesIO(r.data)).namelist()
+    assert names == ["parte_1/enero.pdf"]
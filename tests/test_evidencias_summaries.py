@@ -0,0 +1,78 @@
+from datetime import date
+
+
+def _make_partes(db, n):
+    from app.models.parte_diaria import ParteDiaria
+
+    partes = [ParteDiaria(fecha=date.today(), horas_trabajo=1.0) for _ in range(n)]
+    db.session.add_all(partes)
+    db.session.commit()
+    return partes
+
+
+def _attach(db, tabla, registro_id, filename, path, **meta):
+    from app.models.parte_diaria import ArchivoAdjunto
+
+    db.session.add(
+        ArchivoAdjunto(
+            tabla=tabla, registro_id=registro_id, filename=filename, path=path, **meta
+        )
+    )
+    db.session.commit()
+
+
+def test_evidencias_summaries_groups_by_registro(app, tmp_path):
+    from app.blueprints.archivos.helpers import PARTES_TABLA, evidencias_summaries
+    from app.extensions import db
+
+    p1, p2, p3 = _make_partes(db, 3)
+    blob = tmp_path / "foto.jpg"
+    blob.write_bytes(b"x" * 2048)
+    _attach(db, PARTES_TABLA, p1.id, "acta.PDF", str(tmp_path / "missing.pdf"))
+    _attach(db, PARTES_TABLA, p1.id, "foto.jpg", str(blob), size=2048, categoria="img")
+    _attach(db, PARTES_TABLA, p2.id, "otro.txt", str(tmp_path / "otro.txt"))
+    _attach(db, "checklist_runs", p3.id, "run.pdf", str(tmp_path / "run.pdf"))
+
+    summaries = evidencias_summaries(PARTES_TABLA, [p1.id, p2.id, p3.id])
+
+    assert summaries[p1.id]["total"] == 2
+    assert summaries[p1.id]["by_ext"] == {"pdf": 1, "img": 1}
+    assert summaries[p1.id]["bytes"] == 2048
+    assert summaries[p2.id]["total"] == 1
+    assert summaries[p2.id]["by_ext"] == {"pdf": 0, "img": 0}
+    assert summaries[p3.id]["total"] == 0
+    assert summaries[p3.id]["size_h"] == "0 B"
+
+
+def test_partes_index_renders_batched_badges(client, app, tmp_path):
+    from app.blueprints.archivos.helpers import PARTES_TABLA
+    from app.extensions import db
+
+    (parte,) = _make_partes(db, 1)
+    _attach(db, PARTES_TABLA, parte.id, "acta.pdf", str(tmp_path / "acta.pdf"))
+
+    html = client.get("/partes/").data.decode("utf-8")
+    assert "badge--alert" in html
+    assert "PDF 1" in html
+
+
+def test_backfill_fills_metadata_from_disk(app, tmp_path):
+    from app.blueprints.archivos.helpers import PARTES_TABLA
+    from app.extensions import db
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services.archivos_service import backfill_archivos_metadata
+
+    (parte,) = _make_partes(db, 1)
+    blob = tmp_path / "acta.pdf"
+    blob.write_bytes(b"%PDF-demo")
+    _attach(db, PARTES_TABLA, parte.id, "acta.pdf", str(blob))
+    _attach(db, PARTES_TABLA, parte.id, "perdido.png", str(tmp_path / "perdido.png"))
+
+    result = backfill_archivos_metadata(batch_size=1, workers=2)
+
+    assert result == {"updated": 1, "missing": 1}
+    adjunto = ArchivoAdjunto.query.filter_by(filename="acta.pdf").one()
+    assert adjunto.size == len(b"%PDF-demo")
+    assert adjunto.mimetype == "application/pdf"
+    assert adjunto.categoria == "pdf"
+    assert len(adjunto.sha256) == 64
@@ -0,0 +1,47 @@
+def _seed(db):
+    from app.models.equipo import Equipo
+    from app.models.operador import Operador
+
+    db.session.add_all(
+        [
+            Equipo(codigo="EXC-01", tipo="Excavadora", marca="Caterpillar"),
+            Equipo(codigo="GRU-07", tipo="Grúa", marca="Liebherr"),
+            Equipo(codigo="DRA-100", tipo="Draga", marca="IHC", modelo="EXCALIBUR"),
+            Operador(nombre="Ana Pérez", doc_id="PEAN800101", notas="Certificada en grúa"),
+            Operador(nombre="Luis Caterino", doc_id="CALU900202"),
+        ]
+    )
+    db.session.commit()
+
+
+def test_equipos_list_filters_through_trigram_index(client, app):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+
+    _seed(db)
+    html = client.get("/equipos/?q=cater").get_data(as_text=True)
+    assert "EXC-01" in html and "GRU-07" not in html
+
+    # Los triggers siguen las ediciones.
+    equipo = Equipo.query.filter_by(codigo="GRU-07").one()
+    equipo.marca = "Caterpillar"
+    db.session.commit()
+    assert "GRU-07" in client.get("/equipos/?q=CATER").get_data(as_text=True)
+
+    # Consultas cortas o con comodines recorren la tabla con la misma semántica.
+    assert "DRA-100" in client.get("/equipos/?q=ih").get_data(as_text=True)
+    assert "EXC-01" not in client.get("/equipos/?q=%25").get_data(as_text=True)
+
+
+def test_autocomplete_ranks_by_similarity(client, app):
+    from app.extensions import db
+
+    _seed(db)
+    hits = client.get("/equipos/autocomplete?q=exc").get_json()
+    assert hits[0]["label"].startswith("EXC-01")
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+    hits = client.get("/operadores/autocomplete?q=grúa").get_json()
+    assert [h["label"] for h in hits] == ["Ana Pérez · PEAN800101"]
+    assert client.get("/operadores/autocomplete?q=").get_json() == []
+    assert "Ana Pérez" in client.get("/operadores/?q=pean").get_data(as_text=True)
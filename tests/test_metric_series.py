@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+
+def _seed(db, days=400):
+    from app.models import MetricDaily, Project
+
+    project = Project(name="Serie")
+    db.session.add(project)
+    db.session.flush()
+    start = date(2024, 1, 1)
+    rows = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        rows.append({"project_id": project.id, "kpi_name": "progreso", "date": day, "value": float(i)})
+        if i % 2 == 0:
+            rows.append({"project_id": project.id, "kpi_name": "gasto", "date": day, "value": 10.0})
+    rows.append({"project_id": project.id, "kpi_name": "otro", "date": start, "value": 99.0})
+    db.session.bulk_insert_mappings(MetricDaily, rows)
+    db.session.commit()
+    return project
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    from app.utils.downsample import lttb_indices
+
+    ys = [0.0] * 100
+    ys[37] = 50.0
+    xs = list(range(100))
+    chosen = lttb_indices(xs, ys, 10)
+    assert len(chosen) == 10
+    assert chosen[0] == 0 and chosen[-1] == 99 and 37 in chosen
+    assert lttb_indices(xs[:5], ys[:5], 10) == [0, 1, 2, 3, 4]
+
+
+def test_series_endpoint_pivots_filters_and_downsamples(admin_client, app):
+    from app.extensions import db
+
+    project = _seed(db)
+
+    r = admin_client.get(
+        f"/admin/kpi/{project.id}/series.json?kpi=progreso,gasto&desde=2024-01-01&hasta=2024-01-10"
+    )
+    data = r.get_json()
+    assert r.status_code == 200
+    assert data["labels"][0] == "2024-01-01" and data["total"] == 10 and data["mode"] is None
+    assert data["series"]["progreso"][:3] == [0.0, 1.0, 2.0]
+    assert data["series"]["gasto"][:3] == [10.0, None, 10.0]
+    assert "otro" not in data["series"]
+
+    data = admin_client.get(f"/admin/kpi/{project.id}/series.json?points=50").get_json()
+    assert data["total"] == 400 and data["points"] == 50
+    assert len(data["series"]["gasto"]) == 50
+    assert data["labels"][0] == "2024-01-01" and data["series"]["progreso"][-1] == 399.0
+
+    data = admin_client.get(f"/admin/kpi/{project.id}/series.json?kpi=progreso&points=40&mode=avg").get_json()
+    assert data["points"] == 40 and data["series"]["progreso"][0] == 4.5
+
+    assert admin_client.get(f"/admin/kpi/{project.id}/series.json?mode=x").status_code == 400
+
+    legacy = admin_client.get(f"/admin/kpi/{project.id}.json").get_json()
+    # Forma original: ``gasto`` sólo trae sus propios días, sin huecos ``null``.
+    assert len(legacy["labels"]) == len(legacy["progreso"]) == 400
+    assert len(legacy["gasto"]) == 200 and None not in legacy["gasto"]
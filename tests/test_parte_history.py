@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+
+def _seed():
+    from app.extensions import db
+    from app.models.equipo import Equipo
+    from app.models.operador import Operador
+    from app.models.parte_diaria import ParteDiaria
+
+    equipo = Equipo(codigo="EXC-01", tipo="Excavadora")
+    operador = Operador(nombre="Ana", doc_id="D1")
+    db.session.add_all([equipo, operador])
+    db.session.flush()
+    today = date.today()
+    # Dos partes por día durante 100 días, el más reciente hoy.
+    db.session.add_all(
+        ParteDiaria(
+            fecha=today - timedelta(days=day),
+            equipo_id=equipo.id,
+            operador_id=operador.id if day % 2 == 0 else None,
+            horas_trabajo=1,
+        )
+        for day in range(100)
+        for _ in range(2)
+    )
+    db.session.commit()
+    return equipo.id, operador.id
+
+
+def test_keyset_pages_cover_history_once(app):
+    from app.services.parte_history import parse_cursor, recent_partes
+
+    equipo_id, _ = _seed()
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = recent_partes("equipo", equipo_id, before=cursor, limit=30)
+        seen += [(p.fecha, p.id) for p in rows]
+        pages += 1
+        if cursor is None:
+            break
+        assert parse_cursor(str(cursor)) == cursor
+    assert pages == 7
+    assert len(seen) == len(set(seen)) == 200
+    assert seen == sorted(seen, reverse=True)
+    assert parse_cursor("basura") is None
+
+
+def test_window_totals_in_one_query(app):
+    from app.services.parte_history import window_totals
+
+    equipo_id, operador_id = _seed()
+    assert window_totals("equipo", equipo_id) == [
+        {"dias": 7, "horas": 14.0, "partes": 14},
+        {"dias": 30, "horas": 60.0, "partes": 60},
+        {"dias": 90, "horas": 180.0, "partes": 180},
+    ]
+    assert [w["partes"] for w in window_totals("operador", operador_id)] == [8, 30, 90]
+
+
+def test_detail_pages_render_history(client):
+    equipo_id, operador_id = _seed()
+
+    first = client.get(f"/equipos/{equipo_id}").get_data(as_text=True)
+    assert "Últimos 30 días" in first and "Partes anteriores" in first
+    assert first.count("<td>Ana</td>") == 10
+
+    today = date.today()
+    page = client.get(f"/equipos/{equipo_id}?antes={today.isoformat()}_1")
+    assert page.status_code == 200
+
+    detalle = client.get(f"/operadores/{operador_id}").get_data(as_text=True)
+    assert "Ana" in detalle and "EXC-01" in detalle
+    assert client.get("/operadores/").get_data(as_text=True).count(f"/operadores/{operador_id}\"") == 1
+
+
+def test_deleting_equipo_detaches_partes_without_loading_them(app):
+    from app.extensions import db
+    from app.models.equipo import Equipo
+    from app.models.parte_diaria import ParteDiaria
+
+    equipo_id, _ = _seed()
+    db.session.delete(db.session.get(Equipo, equipo_id))
+    db.session.commit()
+    assert ParteDiaria.query.filter(ParteDiaria.equipo_id.is_not(None)).count() == 0
+    assert ParteDiaria.query.count() == 200
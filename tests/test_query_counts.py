@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+VIEWS = [
+    "/partes/",
+    "/partes/new",
+    "/partes/resumen",
+    "/partes/resumen.pdf",
+    "/checklists/templates",
+    "/checklists/runs",
+    "/checklists/resumen",
+    "/checklists/resumen.pdf",
+    "/checklists/ejecutar",
+]
+
+
+@contextmanager
+def _count_queries(engine):
+    statements = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def _seed(db, n):
+    from app.models.checklist import ChecklistItem, ChecklistRun, ChecklistTemplate
+    from app.models.equipo import Equipo
+    from app.models.operador import Operador
+    from app.models.parte_diaria import ParteDiaria
+
+    start = Equipo.query.count()
+    for i in range(start, start + n):
+        equipo = Equipo(codigo=f"EQ-{i}", tipo="excavadora")
+        operador = Operador(nombre=f"Operador {i}")
+        template = ChecklistTemplate(nombre=f"Plantilla {i}")
+        db.session.add_all([equipo, operador, template])
+        db.session.flush()
+        db.session.add(ChecklistItem(template_id=template.id, texto="Casco", orden=1))
+        db.session.add(
+            ParteDiaria(
+                fecha=date.today(),
+                equipo_id=equipo.id,
+                operador_id=operador.id,
+                horas_trabajo=1,
+            )
+        )
+        db.session.add(ChecklistRun(template_id=template.id, fecha=date.today(), pct_ok=100))
+    db.session.commit()
+
+
+def _queries_for(client, db, url):
+    client.get(url)  # calienta cachés de catálogos
+    with _count_queries(db.engine) as statements:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return len(statements)
+
+
+@pytest.mark.parametrize("url", VIEWS)
+def test_view_query_count_does_not_grow_with_rows(client, app, url):
+    from app.extensions import db
+
+    _seed(db, 2)
+    few = _queries_for(client, db, url)
+    _seed(db, 8)
+    many = _queries_for(client, db, url)
+    assert many == few, f"{url}: {few} -> {many} consultas"
+
+
+def test_run_view_query_count_is_constant(client, app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistRun
+
+    _seed(db, 3)
+    run = ChecklistRun.query.first()
+    assert _queries_for(client, db, f"/checklists/run/{run.id}") <= 6
@@ -0,0 +1,65 @@
+import io
+import zipfile
+from datetime import date
+
+
+def _make_runs(db, n):
+    from app.models.checklist import ChecklistItem, ChecklistRun, ChecklistTemplate
+
+    t = ChecklistTemplate(nombre="Diario", norma="NOM-017")
+    db.session.add(t)
+    db.session.flush()
+    db.session.add(ChecklistItem(template_id=t.id, texto="Casco", tipo="bool", orden=1))
+    runs = [ChecklistRun(template_id=t.id, fecha=date(2025, 1, i + 1), pct_ok=100.0) for i in range(n)]
+    db.session.add_all(runs)
+    db.session.commit()
+    return runs
+
+
+def test_render_batch_in_process_pool(app):
+    from app.extensions import db
+    from app.services.report_batch import iter_report_jobs, render_batch
+
+    runs = _make_runs(db, 3)
+    out = io.BytesIO()
+    seen = []
+
+    result = render_batch(
+        iter_report_jobs("checklist"), out, fmt="zip", workers=2, window=2, progress=seen.append
+    )
+
+    assert result == {"count": 3, "format": "zip"}
+    assert len(seen) == 3
+    names = zipfile.ZipFile(out).namelist()
+    assert names == [f"checklist_{r.id}.pdf" for r in runs]
+
+
+def test_runs_lote_endpoint_filters_by_date(client, app):
+    from app.extensions import db
+
+    _make_runs(db, 3)
+    app.config["REPORTS_BATCH_WORKERS"] = 1
+
+    response = client.get("/checklists/runs/lote?desde=2025-01-02")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == 2
+
+
+def test_lote_endpoint_rejects_oversized_batches(client, app):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    app.config["REPORTS_BATCH_MAX"] = 0
+    db.session.add(ParteDiaria(fecha=date.today(), horas_trabajo=1.0))
+    db.session.commit()
+
+    assert client.get("/partes/lote").status_code == 400
+
+
+def test_lote_endpoint_rejects_pdf_format(client, app):
+    assert app.config["REPORTS_BATCH_WORKERS"] == 2
+    response = client.get("/partes/lote?formato=pdf")
+    assert response.status_code == 400
+    assert b"Formato no soportado" in response.data
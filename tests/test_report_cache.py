@@ -0,0 +1,47 @@
+from datetime import date
+
+
+def _cached_files(app, prefix):
+    from app.services.report_cache import cache_dir
+
+    with app.test_request_context():
+        return sorted(p.name for p in cache_dir().glob(f"{prefix}*.pdf"))
+
+
+def test_parte_pdf_is_cached_and_invalidated_on_edit(client, app):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    parte = ParteDiaria(fecha=date.today(), horas_trabajo=1.0, actividad="Zanja")
+    db.session.add(parte)
+    db.session.commit()
+    prefix = f"parte_{parte.id}_"
+
+    first = client.get(f"/partes/{parte.id}/pdf")
+    second = client.get(f"/partes/{parte.id}/pdf")
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    (cached,) = _cached_files(app, prefix)
+
+    parte.actividad = "Relleno"
+    db.session.commit()
+    third = client.get(f"/partes/{parte.id}/pdf")
+    assert third.status_code == 200
+    (refreshed,) = _cached_files(app, prefix)
+    assert refreshed != cached
+
+
+def test_evict_keeps_cache_under_limit(tmp_path):
+    import os
+
+    from app.services.report_cache import evict
+
+    for i in range(4):
+        path = tmp_path / f"parte_{i}_v.pdf"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (i, i))
+
+    removed = evict(tmp_path, max_bytes=250, keep=tmp_path / "parte_0_v.pdf")
+
+    assert removed == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["parte_0_v.pdf", "parte_3_v.pdf"]
@@ -0,0 +1,103 @@
+from datetime import date
+
+
+def _seed(db):
+    from app.models import Bitacora, Project
+    from app.models.checklist import ChecklistAnswer, ChecklistItem, ChecklistRun, ChecklistTemplate
+    from app.models.parte_diaria import ParteDiaria
+
+    project = Project(name="Obra Sur")
+    template = ChecklistTemplate(nombre="Diario")
+    db.session.add_all([project, template])
+    db.session.flush()
+    item = ChecklistItem(template_id=template.id, texto="Extintor", tipo="bool", orden=1)
+    run = ChecklistRun(fecha=date(2025, 5, 2), template_id=template.id)
+    db.session.add_all([item, run])
+    db.session.flush()
+    db.session.add_all(
+        [
+            Bitacora(project_id=project.id, date=date(2025, 5, 1), text="Fuga hidráulica en grúa norte"),
+            Bitacora(project_id=project.id, date=date(2025, 5, 3), text="Sin novedades"),
+            ParteDiaria(fecha=date(2025, 5, 2), actividad="Excavación", incidencias="fuga de aceite"),
+            ChecklistAnswer(run_id=run.id, item_id=item.id, valor_bool=False, comentario="Fuga leve en manguera"),
+        ]
+    )
+    db.session.commit()
+
+
+def test_search_ranks_across_sources_and_follows_edits(client, app):
+    from app.extensions import db
+    from app.models.parte_diaria import ParteDiaria
+
+    _seed(db)
+
+    data = client.get("/search/?q=fuga&format=json").get_json()
+    assert data["total"] == 3
+    assert {hit["kind"] for hit in data["items"]} == {"bitacora", "parte", "checklist"}
+    assert all("fuga" in hit["fragmento"].lower() for hit in data["items"])
+
+    # Sin distinguir acentos, por prefijo y filtrando por origen.
+    data = client.get("/search/?q=hidraul&format=json").get_json()
+    assert [hit["kind"] for hit in data["items"]] == ["bitacora"]
+    data = client.get("/search/?q=fuga&tipo=parte&format=json").get_json()
+    assert data["total"] == 1 and data["items"][0]["url"].startswith("/partes/")
+
+    page = client.get("/search/?q=fuga&per_page=2&page=2&format=json").get_json()
+    assert page["pages"] == 2 and len(page["items"]) == 1
+
+    parte = ParteDiaria.query.one()
+    parte.incidencias = "ninguna"
+    db.session.commit()
+    assert client.get("/search/?q=fuga&format=json").get_json()["total"] == 2
+    db.session.delete(parte)
+    db.session.commit()
+    assert client.get("/search/?q=excavacion&format=json").get_json()["total"] == 0
+
+    html = client.get("/search/?q=fuga").get_data(as_text=True)
+    assert "2 resultados" in html and "Checklist #" in html
+
+
+def test_search_reindex_cli(app):
+    from app.extensions import db
+
+    _seed(db)
+    db.session.execute(db.text("DELETE FROM search_fts"))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["search-reindex"])
+    assert "4 filas" in result.output
+
+
+def test_like_fallback_for_other_engines(app):
+    from app.extensions import db
+    from app.services.search import SOURCES, _like_hits
+
+    _seed(db)
+    codes = [s.code for s in SOURCES]
+    total, hits = _like_hits(["fuga"], codes, 10, 0)
+    assert total == 3 and {kind for kind, _, _ in hits} == {"bitacora", "parte", "checklist"}
+    total, hits = _like_hits(["fuga", "zzz"], codes, 10, 0)
+    assert (total, hits) == (0, [])
+
+
+def test_viewer_search_skips_bitacoras(client, app):
+    from app.extensions import db
+    from app.models.user import User
+
+    _seed(db)
+    user = User(username="visor", email="visor@example.com", role="viewer")
+    db.session.add(user)
+    db.session.commit()
+    app.config.update(LOGIN_DISABLED=False, AUTH_SIMPLE=True)
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(user.id)
+        sess["user"] = {"id": user.id, "role": "viewer"}
+
+    data = client.get("/search/?q=fuga&format=json").get_json()
+    assert data["total"] == 2
+    assert "bitacora" not in {hit["kind"] for hit in data["items"]}
+    assert client.get("/search/?q=hidraul&tipo=bitacora&format=json").get_json()["total"] == 0
+    assert 'value="bitacora"' not in client.get("/search/?q=fuga").get_data(as_text=True)
+
+    with client.session_transaction() as sess:
+        sess["user"] = {"id": user.id, "role": "supervisor"}
+    assert client.get("/search/?q=hidraul&format=json").get_json()["total"] == 1
@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+
+def _blob(store, content, age=None):
+    path = store.path_for(hashlib.sha256(content).hexdigest())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(content)
+    if age is not None:
+        os.utime(path, (age, age))
+    return path
+
+
+def test_collect_orphans_merges_disk_and_db_in_hash_order(app, tmp_path):
+    from app.extensions import db
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services.storage_gc import collect_orphans
+    from app.storage.blobs import get_blob_store
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    store = get_blob_store()
+    kept = [_blob(store, f"evidencia {i}".encode(), age=0) for i in range(5)]
+    orphans = [_blob(store, f"huérfano {i}".encode(), age=0) for i in range(3)]
+    recent = _blob(store, b"subida en curso")
+    with open(orphans[0] + ".thumb.jpg", "wb") as fh:
+        fh.write(b"thumb")
+    os.utime(orphans[0] + ".thumb.jpg", (0, 0))
+    with open(os.path.join(os.path.dirname(kept[0]), "LEEME"), "w") as fh:
+        fh.write("?")
+    for path in kept:
+        db.session.add(
+            ArchivoAdjunto(
+                tabla="partes_diarias",
+                registro_id=1,
+                filename="x.jpg",
+                path=path,
+                sha256=os.path.basename(path),
+            )
+        )
+    db.session.commit()
+
+    report = collect_orphans(dry_run=True)
+    assert report["orphans"] == 4 and report["recent"] == 1 and report["unknown"] == 1
+    assert all(os.path.exists(p) for p in orphans)
+
+    report = collect_orphans()
+    assert report["reclaimed_bytes"] == report["orphan_bytes"] > 0
+    assert not any(os.path.exists(p) for p in orphans)
+    assert not os.path.exists(orphans[0] + ".thumb.jpg")
+    assert all(os.path.exists(p) for p in kept + [recent])
+
+
+def test_storage_gc_cli_reports(app, tmp_path):
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    result = app.test_cli_runner().invoke(args=["storage-gc", "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert "'orphans': 0" in result.output
+
+
+def test_collect_orphans_skips_non_local_store(app, monkeypatch):
+    from app.services import storage_gc
+
+    monkeypatch.setattr(storage_gc, "get_blob_store", lambda: object())
+    report = storage_gc.collect_orphans()
+    assert report["skipped"] == 1 and report["scanned"] == 0
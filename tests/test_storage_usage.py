@@ -0,0 +1,101 @@
+import io
+
+
+def _scanned_project(tmp_path):
+    from app.extensions import db
+    from app.models import Project
+    from app.models.folder import Folder
+    from app.services.scanner import scan_folder_record
+
+    root = tmp_path / "obra"
+    root.mkdir()
+    (root / "plano.pdf").write_bytes(b"%PDF" + b"x" * 296)
+    (root / "foto.jpg").write_bytes(b"y" * 50)
+    (root / "notas.txt").write_bytes(b"z" * 10)
+
+    project = Project(name="Obra Norte")
+    db.session.add(project)
+    db.session.flush()
+    folder = Folder(project_id=project.id, logical_path="/obra", fs_path=str(root))
+    db.session.add(folder)
+    db.session.commit()
+    scan_folder_record(folder)
+    return project, folder
+
+
+def test_scanner_fills_project_and_folder_usage(app, tmp_path):
+    from app.models.storage_usage import StorageUsage
+    from app.services.file_browser import list_directory
+    from app.services.storage_usage import rebuild_usage
+
+    project, folder = _scanned_project(tmp_path)
+
+    rows = {
+        (r.scope, r.categoria): (r.bytes, r.files)
+        for r in StorageUsage.query.filter(StorageUsage.scope_id.in_([project.id, folder.id]))
+    }
+    assert rows[("project", "pdf")] == (300, 1)
+    assert rows[("project", "img")] == (50, 1)
+    assert rows[("folder", "otro")] == (10, 1)
+
+    # El explorador toma el tamaño de la carpeta registrada sin recorrerla.
+    app.config["DATA_DIR"] = str(tmp_path)
+    item = list_directory("")["items"][0]
+    assert (item["name"], item["size"], item["files"]) == ("obra", 360, 3)
+
+    before = sorted((r.scope, r.scope_id, r.categoria, r.bytes) for r in StorageUsage.query)
+    rebuild_usage()
+    assert sorted((r.scope, r.scope_id, r.categoria, r.bytes) for r in StorageUsage.query) == before
+
+
+def test_evidence_usage_follows_uploads_and_deletes(client, app, tmp_path):
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services.storage_usage import usage_summary
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    for name, size in (("a.jpg", 100), ("b.pdf", 40)):
+        client.post(
+            "/archivos/upload",
+            data={"parte_id": "1", "file": (io.BytesIO(b"q" * size), name)},
+            content_type="multipart/form-data",
+        )
+    evidencias = usage_summary()["evidencias"]
+    assert (evidencias["bytes"], evidencias["files"]) == (140, 2)
+
+    row = ArchivoAdjunto.query.filter_by(filename="a.jpg").one()
+    client.post(f"/archivos/{row.id}/delete")
+    evidencias = usage_summary()["evidencias"]
+    assert (evidencias["bytes"], evidencias["files"]) == (40, 1)
+    assert evidencias["by_categoria"]["img"] == {"bytes": 0, "files": 0}
+
+
+def test_usage_in_admin_index_and_metrics(admin_client, app, tmp_path):
+    _scanned_project(tmp_path)
+
+    html = admin_client.get("/admin/").get_data(as_text=True)
+    assert "Almacenamiento" in html and "Obra Norte" in html
+
+    body = admin_client.get("/metrics").get_data(as_text=True)
+    assert 'storage_usage_bytes{categoria="pdf",scope="project"' in body
+
+
+def test_refresh_gauges_zeroes_removed_series(app):
+    import warnings
+
+    from app.extensions import db
+    from app.metrics import storage_usage_bytes
+    from app.models.storage_usage import StorageUsage
+    from app.services.storage_usage import refresh_gauges
+
+    db.session.add(StorageUsage(scope="project", scope_id=77, categoria="pdf", bytes=10, files=1))
+    db.session.commit()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        refresh_gauges()
+    assert storage_usage_bytes.labels("project", "77", "pdf")._value.get() == 10
+    assert storage_usage_bytes.labels("project", "77", "img")._value.get() == 0
+
+    StorageUsage.query.filter_by(scope_id=77).delete()
+    db.session.commit()
+    refresh_gauges()
+    assert storage_usage_bytes.labels("project", "77", "pdf")._value.get() == 0
@@ -0,0 +1,114 @@
+def _template(db):
+    from app.models.checklist import ChecklistItem, ChecklistTemplate
+
+    t = ChecklistTemplate(nombre="Diario")
+    db.session.add(t)
+    db.session.flush()
+    db.session.add_all(
+        [
+            ChecklistItem(template_id=t.id, texto="Casco", tipo="bool", orden=1),
+            ChecklistItem(template_id=t.id, texto="Extintor", tipo="bool", orden=2),
+            ChecklistItem(template_id=t.id, texto="Horómetro", tipo="text", orden=3),
+        ]
+    )
+    db.session.commit()
+    return t
+
+
+def test_sync_batch_is_idempotent(client, app):
+    from app.extensions import db
+    from app.models.checklist import ChecklistAnswer, ChecklistRun
+    from app.models.parte_diaria import ParteDiaria
+
+    t = _template(db)
+    casco, extintor, horometro = t.items
+    payload = {
+        "partes": [
+            {"key": "tab1-p1", "fecha": "2025-10-01", "horas_trabajo": 8, "actividad": "Zanja"},
+            {"key": "tab1-p2", "fecha": "2025-10-01", "equipo_id": 999},
+        ],
+        "checklists": [
+            {
+                "key": "tab1-c1",
+                "template_id": t.id,
+                "fecha": "2025-10-01",
+                "answers": [
+                    {"item_id": casco.id, "valor_bool": True},
+                    {"item_id": horometro.id, "comentario": "1520 h"},
+                ],
+            }
+        ],
+    }
+
+    r = client.post("/api/v1/sync", json=payload)
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["summary"] == {"created": 2, "duplicate": 0, "error": 1}
+    statuses = {res["key"]: res for res in body["results"]}
+    assert statuses["tab1-p2"]["error"] == "equipo_id no existe"
+
+    run = db.session.get(ChecklistRun, statuses["tab1-c1"]["id"])
+    assert run.pct_ok == 50.0
+    answers = {a.item_id: a for a in ChecklistAnswer.query.filter_by(run_id=run.id)}
+    assert answers[extintor.id].valor_bool is False
+    assert answers[horometro.id].comentario == "1520 h"
+
+    again = client.post("/api/v1/sync", json=payload).get_json()
+    assert again["summary"] == {"created": 0, "duplicate": 2, "error": 1}
+    assert ParteDiaria.query.count() == 1
+    assert ChecklistRun.query.count() == 1
+
+
+def test_sync_rejects_oversized_batch(client, app):
+    app.config["SYNC_BATCH_MAX"] = 1
+    payload = {"partes": [{"key": "a", "fecha": "2025-10-01"}, {"key": "b", "fecha": "2025-10-01"}]}
+    r = client.post("/api/v1/sync", json=payload)
+    assert r.status_code == 400
+
+
+def test_sync_reports_non_integer_ids_per_record(client, app):
+    from app.extensions import db
+
+    t = _template(db)
+    payload = {
+        "partes": [
+            {"key": "p-ok", "fecha": "2025-10-01"},
+            {"key": "p-eq", "fecha": "2025-10-01", "equipo_id": {"id": 1}},
+        ],
+        "checklists": [
+            {"key": "c-tpl", "template_id": [t.id], "fecha": "2025-10-01"},
+            {
+                "key": "c-item",
+                "template_id": t.id,
+                "fecha": "2025-10-01",
+                "answers": [{"item_id": [1], "valor_bool": True}],
+            },
+        ],
+    }
+
+    r = client.post("/api/v1/sync", json=payload)
+    assert r.status_code == 200
+    errors = {res["key"]: res.get("error") for res in r.get_json()["results"]}
+    assert errors["p-ok"] is None
+    assert errors["p-eq"] == "equipo_id no existe"
+    assert errors["c-tpl"] == "template_id no existe"
+    assert "no pertenece a la plantilla" in errors["c-item"]
+
+
+def test_sync_rejects_non_finite_hours(client, app):
+    from app.models.parte_diaria import ParteDiaria
+
+    # ``get_json`` acepta NaN/Infinity, así que se envía el JSON tal cual.
+    body = (
+        '{"partes": ['
+        '{"key": "p-nan", "fecha": "2025-10-01", "horas_trabajo": NaN},'
+        '{"key": "p-inf", "fecha": "2025-10-01", "horas_trabajo": Infinity},'
+        '{"key": "p-ok", "fecha": "2025-10-01", "horas_trabajo": 2.5}'
+        "]}"
+    )
+    r = client.post("/api/v1/sync", data=body, content_type="application/json")
+    assert r.status_code == 200
+    results = {res["key"]: res for res in r.get_json()["results"]}
+    assert results["p-nan"]["error"] == results["p-inf"]["error"] == "horas_trabajo debe ser un número >= 0"
+    assert results["p-ok"]["status"] == "created"
+    assert [p.horas_trabajo for p in ParteDiaria.query.all()] == [2.5]
@@ -0,0 +1,67 @@
+import io
+
+from PIL import Image
+
+
+def _jpeg(size=(1600, 1200)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, "red").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def test_upload_enqueues_thumbnail_and_worker_serves_it(client, app, tmp_path):
+    from app.models.job import Job
+    from app.models.parte_diaria import ArchivoAdjunto
+    from app.services.jobs import run_pending
+
+    app.config["UPLOAD_DIR"] = str(tmp_path)
+    content = _jpeg()
+    for name in ("a.jpg", "b.jpg"):
+        client.post(
+            "/archivos/upload",
+            data={"file": (io.BytesIO(content), name)},
+            content_type="multipart/form-data",
+        )
+
+    # Mismo contenido, mismo blob: basta una tarea.
+    assert [j.kind for j in Job.query.all()] == ["thumbnail"]
+    adjunto = ArchivoAdjunto.query.first()
+    assert client.get(f"/archivos/{adjunto.id}/thumb").status_code == 404
+
+    assert run_pending() == 1
+    assert Job.query.one().status == "done"
+
+    r = client.get(f"/archivos/{adjunto.id}/thumb")
+    assert r.status_code == 200
+    assert r.mimetype == "image/jpeg"
+    assert "inline" in r.headers["Content-Disposition"]
+    assert "immutable" in r.headers["Cache-Control"]
+    assert len(r.data) < len(content)
+    assert max(Image.open(io.BytesIO(r.data)).size) <= 320
+    assert b"/thumb" in client.get("/archivos/").data
+
+
+def test_failed_job_is_retried_then_marked_failed(app):
+    from app.extensions import db
+    from app.models.job import Job
+    from app.services import jobs
+
+    calls = []
+
+    @jobs.handler("test-boom")
+    def _boom(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    jobs.enqueue("test-boom", {"n": 1})
+    db.session.commit()
+
+    for _ in range(jobs.MAX_ATTEMPTS):
+        db.session.query(Job).update({"run_after": Job.created_at})
+        db.session.commit()
+        jobs.run_pending()
+
+    job = Job.query.one()
+    assert (job.status, job.attempts, len(calls)) == ("failed", jobs.MAX_ATTEMPTS, jobs.MAX_ATTEMPTS)
+    assert "boom" in job.error
+    jobs._handlers.pop("test-boom")
@@ -1,8 +1,8 @@
-"""Entrada de referencia para tareas en segundo plano.
+"""Worker de tareas en segundo plano.
 
-Este worker inicializa la aplicación Flask y mantiene un bucle de espera que
-puedes reemplazar por la lógica de tu cola de tareas preferida (Celery, RQ,
-Dramatiq, etc.).
+Inicializa la aplicación Flask y procesa la cola ``jobs`` (ver
+``app.services.jobs``); cuando no hay tareas espera ``WORKER_POLL_INTERVAL``
+segundos antes de volver a consultar.
 """
 
 from __future__ import annotations
@@ -14,6 +14,10 @@ import time
 from types import FrameType
 
 from app import create_app
+from app.services import file_browser as _file_browser  # noqa: F401 - registra sus tareas
+from app.services import storage_gc as _storage_gc  # noqa: F401 - registra sus tareas
+from app.services import thumbnails as _thumbnails  # noqa: F401 - registra la tarea "thumbnail"
+from app.services.jobs import run_pending
 
 # Flag global para terminar el bucle principal con señales SIGTERM/SIGINT.
 _SHUTDOWN_REQUESTED = False
@@ -31,17 +35,24 @@ def main() -> int:
     """Punto de entrada del worker."""
 
     app = create_app()
-    interval = int(os.getenv("WORKER_HEARTBEAT_INTERVAL", "30"))
+    interval = int(os.getenv("WORKER_POLL_INTERVAL", os.getenv("WORKER_HEARTBEAT_INTERVAL", "5")))
 
     with app.app_context():
         logger = app.logger.getChild("worker")
-        logger.info("Worker inicializado; heartbeat cada %s segundos", interval)
+        logger.info("Worker inicializado; consulta la cola cada %s segundos", interval)
 
         signal.signal(signal.SIGTERM, _handle_shutdown)
         signal.signal(signal.SIGINT, _handle_shutdown)
 
         while not _SHUTDOWN_REQUESTED:
-            logger.debug("Heartbeat del worker: en espera de tareas")
+            try:
+                processed = run_pending()
+            except Exception:  # noqa: BLE001 - el worker no debe morir por una tarea
+                logger.exception("Error procesando la cola de tareas")
+                processed = 0
+            if processed:
+                logger.debug("Tareas procesadas: %s", processed)
+                continue
             time.sleep(interval)
 
         logger.info("Worker apagado correctamente")